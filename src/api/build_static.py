@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+import pathlib
+from mimetypes import guess_type
+from typing import Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from src.compilation.artifact_store import artifact_store
+from src.compilation.compile_cache import file_digest, precompressed_digest, precompressed_siblings
+
+
+"""/build static mount: precompressed variants, content-hash ETags and immutable caching for content-addressed files."""
+
+
+IMMUTABLE_PREFIXES = ("voice_cache/",)  # build-relative directories whose file names are content hashes
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"  # world artifacts keep their names across recompiles, so clients revalidate with the ETag
+
+
+def _accepted_codings(accept_encoding: str) -> set[str]:  # content-codings the client accepts (q=0 entries excluded)
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0.0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _negotiated_variant(full_path: pathlib.Path, stat_result: os.stat_result, digest: str, request_headers: Headers) -> Tuple[str | None, pathlib.Path, os.stat_result]:
+    if "range" in request_headers:  # byte ranges always address the identity representation
+        return None, full_path, stat_result
+    if not digest or precompressed_digest(full_path) != digest:  # siblings compressed from other bytes, or none at all
+        return None, full_path, stat_result
+    accepted = _accepted_codings(request_headers.get("accept-encoding", ""))
+    for coding, sibling in precompressed_siblings(full_path).items():
+        if coding not in accepted:
+            continue
+        try:
+            return coding, sibling, sibling.stat()
+        except OSError:
+            continue
+    return None, full_path, stat_result
+
+
+class BuildStaticFiles(StaticFiles):
+    def file_response(
+        self,
+        full_path: os.PathLike[str] | str,
+        stat_result: os.stat_result,
+        scope,
+        status_code: int = 200,
+    ) -> Response:
+        path = pathlib.Path(full_path)
+        request_headers = Headers(scope=scope)
+        digest = file_digest(path)
+        coding, served_path, served_stat = _negotiated_variant(path, stat_result, digest, request_headers)
+        artifact_store(self.directory or ".").touch(path)  # serving counts as access for size-capped collection
+        try:
+            relative = path.relative_to(pathlib.Path(self.directory or ".").resolve()).as_posix()
+        except ValueError:
+            relative = path.name
+        headers = {
+            "cache-control": IMMUTABLE_CACHE_CONTROL if relative.startswith(IMMUTABLE_PREFIXES) else REVALIDATE_CACHE_CONTROL,
+            "vary": "Accept-Encoding",
+        }
+        if digest:
+            headers["etag"] = f'"{digest}-{coding}"' if coding else f'"{digest}"'  # each representation gets its own strong validator
+        if coding:
+            headers["content-encoding"] = coding
+        response = FileResponse(
+            served_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=guess_type(path.name)[0] or "application/octet-stream",
+            stat_result=served_stat,
+        )
+        if digest:  # pointers relink to older blobs, so the mtime can move backward; If-Modified-Since must not answer for the content ETag
+            del response.headers["last-modified"]
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+
+"""In-process job store backing the streaming /plan_and_compile mode."""
+
+
+JOB_STAGES = ("design_brief", "intent", "selection", "placement", "compile", "manifest")  # emitted in this order on success
+RESULT_EVENT = "result"  # terminal event carrying the same payload the synchronous endpoint returns
+DEFAULT_MAX_WORKERS = 8  # generations executing at once; further submissions queue instead of spawning threads
+DEFAULT_JOB_TTL_S = 900.0  # finished jobs stay readable this long so a reconnecting headset can replay events
+
+
+def _new_job_id() -> str:
+    return f"job_{uuid.uuid4().hex[:12]}"
+
+
+def format_sse_event(event: Dict[str, Any]) -> str:  # one Server-Sent Events frame; `id` lets clients resume via Last-Event-ID
+    return (
+        f"id: {event['seq']}\n"
+        f"event: {event['event']}\n"
+        f"data: {json.dumps(event, sort_keys=True)}\n\n"
+    )
+
+
+@dataclass
+class PlanJob:
+    job_id: str
+    status: str = "queued"  # queued -> running -> succeeded | failed
+    created_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    result: Optional[Dict[str, Any]] = None
+    waiters: List[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = field(default_factory=list)
+
+    @property
+    def done(self) -> bool:
+        return self.status in {"succeeded", "failed"}
+
+
+class PlanJobStore:
+    """Runs plan-and-compile submissions on a bounded worker pool and fans out stage events.
+
+    Workers publish events from their own threads; async stream consumers are
+    woken through their event loop, so an open stream costs no thread.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[..., Dict[str, Any]],
+        *,
+        max_workers: int | None = None,
+        ttl_s: float = DEFAULT_JOB_TTL_S,
+    ) -> None:
+        self._runner = runner
+        self._max_workers = max_workers or int(os.getenv("JUNIORIS_JOB_WORKERS", DEFAULT_MAX_WORKERS))
+        self._executor: ThreadPoolExecutor | None = None
+        self._ttl_s = ttl_s
+        self._jobs: Dict[str, PlanJob] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:  # created lazily so importing the server never starts threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="plan_job")
+        return self._executor
+
+    def submit(self, **run_kwargs: Any) -> PlanJob:
+        job = PlanJob(job_id=_new_job_id())
+        with self._lock:
+            self._prune_locked()
+            self._jobs[job.job_id] = job
+        self._pool().submit(self._run, job, run_kwargs)
+        return job
+
+    def get(self, job_id: str) -> PlanJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def snapshot(self, job: PlanJob) -> Dict[str, Any]:  # polling view for clients that cannot hold a stream open
+        with self._lock:
+            completed = [event["event"] for event in job.events if event["event"] in JOB_STAGES]
+            return {
+                "job_id": job.job_id,
+                "status": job.status,
+                "completed_stages": completed,
+                "event_count": len(job.events),
+                "result": job.result,
+            }
+
+    def events_since(self, job: PlanJob, cursor: int) -> tuple[List[Dict[str, Any]], bool]:
+        with self._lock:
+            return list(job.events[max(cursor, 0):]), job.done
+
+    async def stream(self, job: PlanJob, cursor: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+        with self._lock:
+            job.waiters.append((loop, wake))
+        try:
+            while True:
+                wake.clear()
+                events, done = self.events_since(job, cursor)
+                for event in events:
+                    cursor = event["seq"] + 1
+                    yield event
+                if done:
+                    return
+                await wake.wait()
+        finally:
+            with self._lock:
+                job.waiters.remove((loop, wake))
+
+    def _publish(self, job: PlanJob, event_name: str, fields: Dict[str, Any]) -> None:
+        with self._lock:
+            event = {
+                **fields,
+                "event": event_name,
+                "job_id": job.job_id,
+                "seq": len(job.events),
+                "elapsed_ms": round((time.monotonic() - job.created_at) * 1000.0, 1),
+            }
+            job.events.append(event)
+            waiters = list(job.waiters)
+        for loop, wake in waiters:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:  # consumer loop already closed; its stream is gone
+                pass
+
+    def _run(self, job: PlanJob, run_kwargs: Dict[str, Any]) -> None:
+        with self._lock:
+            job.status = "running"
+        try:
+            result = self._runner(**run_kwargs, progress=lambda stage, fields: self._publish(job, stage, fields))
+        except Exception:
+            result = {
+                "ok": False,
+                "error_code": "internal_error",
+                "errors": [{"path": "$.job", "message": "unhandled job exception"}],
+            }
+        with self._lock:
+            job.result = result
+            job.status = "succeeded" if result.get("ok") else "failed"
+            job.finished_at = time.monotonic()
+        self._publish(job, RESULT_EVENT, {"status": job.status, "result": result})
+
+    def _prune_locked(self) -> None:
+        now = time.monotonic()
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self._ttl_s
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
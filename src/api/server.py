@@ -1,13 +1,24 @@
 from __future__ import annotations  # enable PEP 604 union syntax in older Pythons
 
-import json
+import hashlib
+import os
 import pathlib
+import time
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
+from src.api.jobs import PlanJobStore, format_sse_event
+from src.api.single_flight import SingleFlight, request_key
+from src.compilation.artifact_store import artifact_store
+from src.compilation.compile_cache import write_precompressed
 from src.compilation.phase0 import compile_phase0
+from src.compilation.phase0_binary import PHASE0_BINARY_VERSION
+from src.compilation.serialization import encode_artifact
+from src.llm.transport import as_bounded_int, close_http_clients
 from src.planning.planner import plan_worldspec
+from src.planning.utils import ProgressCallback, emit_progress, normalize_bool
 from src.contracts.runtime import resolve_stylekit_runtime_payload
 from src.runtime.decor_plan import build_runtime_decor_plan, build_runtime_scene_context
 from src.voice.service import build_chatter_plan, build_tts_artifact, maybe_play_local_audio
@@ -15,6 +26,12 @@ from src.voice.service import build_chatter_plan, build_tts_artifact, maybe_play
 BUILD_ROOT = pathlib.Path("build")  # default output directory for compiled world artifacts
 PORTAL_READY_PHASE = "phase0"  # Unity opens portal once this phase is available
 API_CONTRACT_VERSION = "0.2"  # client-checked version; bump on breaking response changes
+MANIFEST_MODES = ("inline", "reference")  # "reference" leaves phase0_data out of the manifest; clients fetch phase0_url instead
+MANIFEST_FILENAMES = {"inline": "manifest.json", "reference": "manifest.reference.json"}  # one file per mode so neither overwrites the other
+LATENCY_BUDGET_ENV = "JUNIORIS_LATENCY_BUDGET_MS"  # end-to-end target per request; 0 (default) never spends time on layout refinement
+REFINE_RESERVE_S = 0.5  # kept back from the remaining budget for compile, manifest and response work
+REFINE_MAX_S = 2.0  # refinement returns diminishing gains past this, however much budget is left
+REFINE_MIN_S = 0.05  # less than this cannot finish a useful number of moves, so the greedy layout ships as is
 _ERROR_RECOVERABLE = {  # whether the client may show a "try again" UX for each error class
     "invalid_request": True,
     "planner_failed": True,
@@ -31,6 +48,7 @@ _ERROR_RETRYABLE = {  # whether automatic retry is meaningful for each error cla
     "manifest_failed": True,
     "internal_error": False,
 }
+_GENERATION_FLIGHTS = SingleFlight()  # concurrent identical submissions share one planner/compiler run
 
 
 def _utc_now_iso() -> str:  # compact UTC timestamp for manifest and response headers
@@ -141,6 +159,32 @@ def _phase0_manifest_payload(
     return f"/build/{world_id}/{phase0_filename}", compile_result.get("phase0_data")
 
 
+def _phase0_reference(compile_result: Dict[str, Any]) -> Dict[str, Any]:  # content hash and size of the phase0 artifact a reference manifest points at
+    phase0_json = compile_result.get("phase0_json")
+    if not isinstance(phase0_json, bytes):
+        phase0_artifact = compile_result.get("phase0_artifact")
+        try:
+            phase0_json = pathlib.Path(phase0_artifact).read_bytes() if phase0_artifact else None
+        except OSError:
+            phase0_json = None
+    if phase0_json is None:
+        phase0_json = encode_artifact(compile_result.get("phase0_data") or {})
+    return {"phase0_sha256": hashlib.sha256(phase0_json).hexdigest(), "phase0_size_bytes": len(phase0_json)}
+
+
+def _phase0_binary_manifest_entry(world_id: str, compile_result: Dict[str, Any]) -> Dict[str, Any] | None:  # where the binary phase0 lives and how to verify it; None when it was not written
+    payload = compile_result.get("phase0_binary")
+    phase0_binary_artifact = compile_result.get("phase0_binary_artifact")
+    if not isinstance(payload, bytes) or not phase0_binary_artifact:
+        return None
+    return {
+        "url": f"/build/{world_id}/{pathlib.Path(phase0_binary_artifact).name}",
+        "format_version": PHASE0_BINARY_VERSION,
+        "sha256": hashlib.sha256(payload).hexdigest(),
+        "size_bytes": len(payload),
+    }
+
+
 def _write_manifest(
     build_root: pathlib.Path,
     world_id: str,
@@ -152,12 +196,13 @@ def _write_manifest(
     semantic_path_status: Optional[str] = None,
     intent_spec: Optional[Dict[str, Any]] = None,
     scene_program: Optional[Dict[str, Any]] = None,
+    manifest_mode: str = "inline",
 ) -> pathlib.Path:
     # Keep the manifest narrow and runtime-focused so Unity does not need to
     # understand the full backend planner/compiler internals.
     world_dir = build_root / world_id
     world_dir.mkdir(parents=True, exist_ok=True)
-    manifest_path = world_dir / "manifest.json"
+    manifest_path = world_dir / MANIFEST_FILENAMES[manifest_mode]
 
     phase0_artifact = compile_result.get("phase0_artifact")
     phase0_filename = pathlib.Path(phase0_artifact).name if phase0_artifact else "phase0.json"
@@ -226,8 +271,29 @@ def _write_manifest(
         "skybox": stylekit_payload.get("skybox"),
     }
     manifest_payload["runtime_polish"] = stylekit_payload.get("runtime_polish", {})
-
-    manifest_path.write_text(json.dumps(manifest_payload, indent=2, sort_keys=True), encoding="utf-8")
+    phase0_binary = _phase0_binary_manifest_entry(world_id, compile_result)
+    if phase0_binary is not None:
+        manifest_payload["phase0_binary"] = phase0_binary
+
+    if manifest_mode == "reference":
+        # The headset downloads phase0.json separately; the manifest keeps the
+        # portal essentials (safe_spawn, readiness, stylekit) plus what it
+        # needs to verify the artifact it fetches.
+        del manifest_payload["phase0_data"]
+        manifest_payload["manifest_mode"] = "reference"
+        manifest_payload.update(_phase0_reference(compile_result))
+        manifest_bytes = encode_artifact(manifest_payload)
+        artifact_store(build_root).put(manifest_path, manifest_bytes)
+        write_precompressed(manifest_path, manifest_bytes, write=artifact_store(build_root).put)
+        return manifest_path
+
+    # phase0_data was already encoded for phase0.json; reuse those bytes rather
+    # than serializing the largest subtree a second time.
+    phase0_json = compile_result.get("phase0_json")
+    embedded = {"phase0_data": phase0_json} if isinstance(phase0_json, bytes) else None
+    manifest_bytes = encode_artifact(manifest_payload, embedded=embedded)
+    artifact_store(build_root).put(manifest_path, manifest_bytes)
+    write_precompressed(manifest_path, manifest_bytes, write=artifact_store(build_root).put)
     return manifest_path
 
 
@@ -349,6 +415,10 @@ def _planner_error_response(
     )
 
 
+def _manifest_url(world_id: str, manifest_path: pathlib.Path) -> str:  # the URL of the manifest file this request wrote, whichever mode it used
+    return f"/build/{world_id}/{manifest_path.name}"
+
+
 def _success_response(
     *,
     request_id: str,
@@ -365,7 +435,7 @@ def _success_response(
         "request_id": request_id,
         "trace_id": trace_id,
         "world_id": world_id,
-        "manifest_url": f"/build/{world_id}/manifest.json",
+        "manifest_url": _manifest_url(world_id, manifest_path),
         "manifest_path": str(manifest_path),
         "portal_ready_at_phase": PORTAL_READY_PHASE,
         "readiness": readiness,
@@ -378,14 +448,31 @@ def _success_response(
     return response
 
 
+def _refine_budget_seconds(normalized_prefs: Dict[str, Any], request_started: float) -> float | None:  # spare latency after planning, handed to layout refinement; None skips it
+    budget_ms = as_bounded_int(
+        normalized_prefs.get("latency_budget_ms", os.getenv(LATENCY_BUDGET_ENV, 0)),
+        default=0,
+        min_value=0,
+        max_value=120000,
+    )
+    if budget_ms <= 0:
+        return None
+    remaining = budget_ms / 1000.0 - (time.monotonic() - request_started) - REFINE_RESERVE_S
+    if remaining < REFINE_MIN_S:  # the LLM stages used up the slack
+        return None
+    return min(remaining, REFINE_MAX_S)
+
+
 def run_plan_and_compile(
     prompt_text: str,
     optional_seed: Optional[int] = None,
     user_prefs: Optional[Dict[str, Any]] = None,
     build_root: pathlib.Path | str = BUILD_ROOT,
+    progress: ProgressCallback | None = None,
 ) -> Dict[str, Any]:
     # Request-scoped ids start here so every downstream artifact and error
     # response can be traced back to one submission.
+    request_started = time.monotonic()  # the latency budget counts from arrival, not from when compile starts
     request_id = _new_request_id()
     trace_id = _new_trace_id()
     request_error = _validated_request(prompt_text, optional_seed, request_id, trace_id)
@@ -394,11 +481,62 @@ def run_plan_and_compile(
     prompt = (prompt_text or "").strip()
 
     normalized_prefs: Dict[str, Any] = user_prefs if isinstance(user_prefs, dict) else {}  # guard against None so downstream code can always index into prefs
+    if normalized_prefs.get("manifest_mode", "inline") not in MANIFEST_MODES:
+        return _invalid_request_error(
+            request_id,
+            trace_id,
+            "Unsupported manifest mode.",
+            "$.user_prefs.manifest_mode",
+            f"manifest_mode must be one of {', '.join(MANIFEST_MODES)}",
+        )
+    if not normalize_bool(normalized_prefs.get("single_flight"), default=True):
+        return _plan_and_compile_once(
+            prompt,
+            optional_seed,
+            normalized_prefs,
+            build_root,
+            progress,
+            request_id=request_id,
+            trace_id=trace_id,
+            request_started=request_started,
+        )
+
+    # Duplicates that arrive while an identical request is in flight wait for
+    # it and reuse its result under their own request/trace ids.
+    result, shared = _GENERATION_FLIGHTS.run(
+        request_key(prompt, optional_seed, normalized_prefs, build_root),
+        lambda fan_out: _plan_and_compile_once(
+            prompt,
+            optional_seed,
+            normalized_prefs,
+            build_root,
+            fan_out,
+            request_id=request_id,
+            trace_id=trace_id,
+            request_started=request_started,
+        ),
+        progress,
+    )
+    if shared:
+        result = {**result, "request_id": request_id, "trace_id": trace_id, "deduplicated": True}
+    return result
 
+
+def _plan_and_compile_once(
+    prompt: str,
+    optional_seed: Optional[int],
+    normalized_prefs: Dict[str, Any],
+    build_root: pathlib.Path | str,
+    progress: ProgressCallback | None,
+    *,
+    request_id: str,
+    trace_id: str,
+    request_started: float,
+) -> Dict[str, Any]:
     try:
         # The planner owns semantic selection; compile_phase0 only sees a
         # validated WorldSpec contract.
-        planner_result = plan_worldspec(prompt, seed=optional_seed, user_prefs=normalized_prefs)
+        planner_result = plan_worldspec(prompt, seed=optional_seed, user_prefs=normalized_prefs, progress=progress)
     except Exception:
         return _error(
             "internal_error",
@@ -422,7 +560,13 @@ def run_plan_and_compile(
         )
 
     try:
-        compile_result = compile_phase0(worldspec, build_root=build_root, write_artifact=True)  # run the deterministic placer and write phase0 JSON to disk
+        compile_result = compile_phase0(  # run the deterministic placer and write phase0 JSON to disk
+            worldspec,
+            build_root=build_root,
+            write_artifact=True,
+            refine_budget_seconds=_refine_budget_seconds(normalized_prefs, request_started),
+            use_cache=normalize_bool(normalized_prefs.get("compile_cache"), default=False),
+        )
     except Exception:
         return _error(
             "internal_error",
@@ -440,6 +584,12 @@ def run_plan_and_compile(
         )
 
     world_id = str(compile_result["world_id"])
+    emit_progress(
+        progress,
+        "compile",
+        world_id=world_id,
+        teleportable_surfaces=compile_result.get("teleportable_surfaces", 0),
+    )
     try:
         manifest_path = _write_manifest(
             pathlib.Path(build_root),
@@ -452,6 +602,7 @@ def run_plan_and_compile(
             semantic_path_status=planner_result.get("semantic_path_status") if isinstance(planner_result.get("semantic_path_status"), str) else None,
             intent_spec=planner_result.get("intent_spec") if isinstance(planner_result.get("intent_spec"), dict) else None,
             scene_program=planner_result.get("scene_program") if isinstance(planner_result.get("scene_program"), dict) else None,
+            manifest_mode=str(normalized_prefs.get("manifest_mode", "inline")),
         )
     except OSError as exc:
         return _error(
@@ -469,6 +620,8 @@ def run_plan_and_compile(
             trace_id,
             [{"path": "$.manifest", "message": "unhandled manifest exception"}],
         )
+    emit_progress(progress, "manifest", world_id=world_id, manifest_url=_manifest_url(world_id, manifest_path))
+    artifact_store(build_root).collect_in_background()  # keeps long-running servers under the build size cap
     return _success_response(
         request_id=request_id,
         trace_id=trace_id,
@@ -479,19 +632,53 @@ def run_plan_and_compile(
     )
 
 
+PLAN_JOBS = PlanJobStore(lambda **kwargs: run_plan_and_compile(**kwargs))  # late-bound so tests can patch module globals
+
+
+def submit_plan_and_compile_job(
+    prompt_text: str,
+    optional_seed: Optional[int] = None,
+    user_prefs: Optional[Dict[str, Any]] = None,
+    build_root: pathlib.Path | str = BUILD_ROOT,
+) -> Dict[str, Any]:
+    # Validation runs up front so malformed submissions fail immediately
+    # instead of surfacing only on the event stream.
+    request_error = _validated_request(prompt_text, optional_seed, _new_request_id(), _new_trace_id())
+    if request_error is not None:
+        return request_error
+    job = PLAN_JOBS.submit(
+        prompt_text=prompt_text,
+        optional_seed=optional_seed,
+        user_prefs=user_prefs,
+        build_root=build_root,
+    )
+    return {
+        "api_contract_version": API_CONTRACT_VERSION,
+        "ok": True,
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/plan_and_compile/jobs/{job.job_id}",
+        "events_url": f"/plan_and_compile/jobs/{job.job_id}/events",
+    }
+
+
 try:  # FastAPI imports are optional so the planner can be used as a library without a server
     from fastapi import FastAPI
+    from fastapi import Request
     from fastapi.responses import JSONResponse
     from fastapi.responses import Response
-    from fastapi.staticfiles import StaticFiles
+    from fastapi.responses import StreamingResponse
     from pydantic import BaseModel, Field
+    from src.api.build_static import BuildStaticFiles
 except ImportError:  # pragma: no cover - optional dependency for API serving
     FastAPI = None
     BaseModel = object
     Field = None
     JSONResponse = None
+    Request = None
     Response = None
-    StaticFiles = None
+    StreamingResponse = None
+    BuildStaticFiles = None
     app = None  # prevents NameError if this module is imported but never served
 
 
@@ -515,9 +702,14 @@ if FastAPI is not None:
         play_local: bool = False
 
 
-    app = FastAPI(title="JuniorIS Planner/Compiler API", version=API_CONTRACT_VERSION)
+    @asynccontextmanager
+    async def _lifespan(_app):  # pooled LLM connections close with the server instead of leaking at exit
+        yield
+        close_http_clients()
+
+    app = FastAPI(title="JuniorIS Planner/Compiler API", version=API_CONTRACT_VERSION, lifespan=_lifespan)
     BUILD_ROOT.mkdir(parents=True, exist_ok=True)
-    app.mount("/build", StaticFiles(directory=str(BUILD_ROOT), check_dir=True), name="build")  # serve compiled artifacts directly over HTTP for Unity client
+    app.mount("/build", BuildStaticFiles(directory=str(BUILD_ROOT), check_dir=True), name="build")  # serve compiled artifacts directly over HTTP for Unity client; see src/api/build_static.py
 
     @app.get("/healthz")  # lightweight liveness probe for load-balancer or CI checks
     def healthz():
@@ -552,12 +744,18 @@ if FastAPI is not None:
             content={"ok": False, "error_code": "invalid_request", "message": "The request payload was invalid.", "details": exc.errors()},
         )
 
+    def _prefs_with_manifest_mode(payload: PlanAndCompileRequest, manifest: Optional[str]) -> Dict[str, Any]:  # ?manifest=reference overrides user_prefs.manifest_mode
+        prefs = dict(payload.user_prefs or {})
+        if manifest is not None:
+            prefs["manifest_mode"] = manifest
+        return prefs
+
     @app.post("/plan_and_compile")  # main endpoint: turns a prompt into a playable world
-    def plan_and_compile(payload: PlanAndCompileRequest):
+    def plan_and_compile(payload: PlanAndCompileRequest, manifest: Optional[str] = None):
         result = run_plan_and_compile(
             prompt_text=payload.prompt_text,
             optional_seed=payload.optional_seed,
-            user_prefs=payload.user_prefs,
+            user_prefs=_prefs_with_manifest_mode(payload, manifest),
         )
 
         if result.get("ok"):
@@ -566,6 +764,56 @@ if FastAPI is not None:
         status_code = _status_code_for_error(result.get("error_code"))
         return JSONResponse(content=result, status_code=status_code)
 
+    @app.post("/plan_and_compile/jobs", status_code=202)  # job mode: returns at once, progress arrives on the event stream
+    def plan_and_compile_job(payload: PlanAndCompileRequest, manifest: Optional[str] = None):
+        result = submit_plan_and_compile_job(
+            prompt_text=payload.prompt_text,
+            optional_seed=payload.optional_seed,
+            user_prefs=_prefs_with_manifest_mode(payload, manifest),
+        )
+        if result.get("ok"):
+            return JSONResponse(content=result, status_code=202)
+        return JSONResponse(content=result, status_code=_status_code_for_error(result.get("error_code")))
+
+    def _unknown_job(job_id: str):
+        return JSONResponse(
+            content=_error(
+                "invalid_request",
+                "Unknown or expired job.",
+                _new_request_id(),
+                _new_trace_id(),
+                [{"path": "$.job_id", "message": f"no job with id '{job_id}'"}],
+            ),
+            status_code=404,
+        )
+
+    @app.get("/plan_and_compile/jobs/{job_id}")
+    def plan_and_compile_job_status(job_id: str):
+        job = PLAN_JOBS.get(job_id)
+        if job is None:
+            return _unknown_job(job_id)
+        return PLAN_JOBS.snapshot(job)
+
+    @app.get("/plan_and_compile/jobs/{job_id}/events")  # Server-Sent Events: one frame per finished stage, then `result`
+    async def plan_and_compile_job_events(job_id: str, request: Request):
+        job = PLAN_JOBS.get(job_id)
+        if job is None:
+            return _unknown_job(job_id)
+        try:
+            cursor = int(request.headers.get("last-event-id", "-1")) + 1  # resume after the last frame the client saw
+        except ValueError:
+            cursor = 0
+
+        async def event_frames():
+            async for event in PLAN_JOBS.stream(job, cursor):
+                yield format_sse_event(event)
+
+        return StreamingResponse(
+            event_frames(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     @app.post("/voice/chatter_plan")
     def voice_chatter_plan(payload: VoiceChatterPlanRequest):
         prompt = (payload.prompt_text or "").strip()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, List
+
+from src.planning.utils import ProgressCallback, emit_progress
+
+
+"""Collapses concurrent identical generation requests onto one computation."""
+
+
+NON_SEMANTIC_PREF_KEYS = {"single_flight"}  # prefs that never change the generated world
+
+
+def request_key(
+    prompt_text: str,
+    optional_seed: Any,
+    user_prefs: Dict[str, Any],
+    build_root: Any,
+) -> str:  # whitespace-normalized prompt + seed + canonical prefs + output root
+    material = {
+        "prompt": " ".join(str(prompt_text or "").split()),
+        "seed": optional_seed,
+        "user_prefs": {key: value for key, value in user_prefs.items() if key not in NON_SEMANTIC_PREF_KEYS},
+        "build_root": str(build_root),
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Dict[str, Any] | None = None
+        self.error: BaseException | None = None
+        self.events: List[tuple[str, Dict[str, Any]]] = []
+        self.listeners: List[ProgressCallback] = []
+        self.followers = 0
+
+
+class SingleFlight:
+    """Keyed in-process single-flight group.
+
+    The first caller for a key runs the computation; callers that arrive while
+    it is in flight block until it finishes and receive the same result. Stage
+    progress from the leader is replayed to followers as they join.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+
+    def run(
+        self,
+        key: str,
+        compute: Callable[[ProgressCallback], Dict[str, Any]],
+        progress: ProgressCallback | None = None,
+    ) -> tuple[Dict[str, Any], bool]:  # returns (result, shared) where shared marks a follower
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+            else:
+                flight.followers += 1
+                for stage, fields in flight.events:  # replay under the lock so live events cannot overtake it
+                    emit_progress(progress, stage, **fields)
+            if progress is not None:
+                flight.listeners.append(progress)
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return dict(flight.result or {}), True
+
+        def fan_out(stage: str, fields: Dict[str, Any]) -> None:
+            with self._lock:
+                flight.events.append((stage, fields))
+                listeners = list(flight.listeners)
+            for listener in listeners:
+                emit_progress(listener, stage, **fields)
+
+        try:
+            flight.result = compute(fan_out)
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+        return flight.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import pathlib
+import threading
 from dataclasses import dataclass, field
 from typing import Any, Dict, List
 
@@ -19,6 +21,7 @@ class PackRegistry:
     assets_by_id: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # asset_id -> {pack_id, asset} lookup
     tags_index: Dict[str, List[str]] = field(default_factory=dict)  # pack_id -> tag list for search filtering
     errors: List[Dict[str, str]] = field(default_factory=list)  # accumulated loading/validation errors
+    fingerprint: str = ""  # sha256 over manifest paths and contents; changes whenever any pack changes
 
     def search_packs(self, tags: List[str]) -> List[str]:  # find packs whose tags fully contain the query set
         if not tags:
@@ -53,42 +56,52 @@ def _format_error_path(path_parts: List[Any]) -> str:  # converts jsonschema pat
     return out
 
 
-def load_pack_registry(
-    packs_root: str | pathlib.Path = "packs",
-    schema_path: str | pathlib.Path = DEFAULT_SCHEMA_PATH,
-) -> PackRegistry:
-    packs_dir = pathlib.Path(packs_root)
-    schema_file = pathlib.Path(schema_path)
-    schema = _load_schema(schema_file)  # validate every manifest against the pack schema
-    validator = Draft7Validator(schema)
-
-    registry = PackRegistry()
-
-    if not packs_dir.exists():
-        registry.errors.append(
-            {"path": str(packs_dir), "message": "packs directory does not exist"}
+@dataclass
+class _ManifestEntry:  # one parsed + validated pack.json, reused until its mtime or size changes
+    stat_key: tuple[int, int]
+    content_sha256: str
+    manifest: Dict[str, Any] | None
+    errors: List[Dict[str, str]]
+
+
+_MANIFEST_CACHE: Dict[str, _ManifestEntry] = {}  # manifest path -> last parse result
+_REGISTRY_CACHE: Dict[tuple[str, str], tuple[tuple[Any, ...], PackRegistry]] = {}  # (packs root, schema) -> (stat signature, registry)
+_CACHE_LOCK = threading.Lock()
+
+
+def _load_manifest(manifest_path: pathlib.Path, validator: Draft7Validator, stat_key: tuple[int, int]) -> _ManifestEntry:
+    raw = manifest_path.read_bytes()
+    content_sha256 = hashlib.sha256(raw).hexdigest()
+    try:
+        manifest = json.loads(raw.decode("utf-8"))
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        return _ManifestEntry(stat_key, content_sha256, None, [{"path": str(manifest_path), "message": f"invalid JSON: {exc}"}])
+
+    schema_errors = sorted(validator.iter_errors(manifest), key=lambda e: list(e.path))
+    if schema_errors:
+        return _ManifestEntry(
+            stat_key,
+            content_sha256,
+            None,
+            [
+                {
+                    "path": f"{manifest_path}:{_format_error_path(list(err.path))}",
+                    "message": err.message,
+                }
+                for err in schema_errors
+            ],
         )
-        return registry
+    return _ManifestEntry(stat_key, content_sha256, manifest, [])
 
-    manifest_paths = sorted(packs_dir.glob("**/pack.json"))  # sorted for deterministic registration order
-    for manifest_path in manifest_paths:
-        try:
-            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError as exc:
-            registry.errors.append(
-                {"path": str(manifest_path), "message": f"invalid JSON: {exc}"}
-            )
-            continue
 
-        schema_errors = sorted(validator.iter_errors(manifest), key=lambda e: list(e.path))
-        if schema_errors:
-            for err in schema_errors:
-                registry.errors.append(
-                    {
-                        "path": f"{manifest_path}:{_format_error_path(list(err.path))}",
-                        "message": err.message,
-                    }
-                )
+def _assemble_registry(entries: List[tuple[pathlib.Path, _ManifestEntry]], packs_dir: pathlib.Path) -> PackRegistry:
+    registry = PackRegistry()
+    fingerprint = hashlib.sha256()
+    for manifest_path, entry in entries:  # sorted for deterministic registration order
+        fingerprint.update(f"{manifest_path.relative_to(packs_dir).as_posix()}:{entry.content_sha256}\n".encode("utf-8"))
+        registry.errors.extend(entry.errors)
+        manifest = entry.manifest
+        if manifest is None:
             continue
 
         pack_id = manifest["pack_id"]  # guaranteed present after schema validation
@@ -125,4 +138,62 @@ def load_pack_registry(
                 "asset": asset,
             }
 
+    registry.fingerprint = fingerprint.hexdigest()
+    return registry
+
+
+def clear_pack_registry_cache() -> None:  # forces the next load to re-read every manifest
+    with _CACHE_LOCK:
+        _MANIFEST_CACHE.clear()
+        _REGISTRY_CACHE.clear()
+
+
+def load_pack_registry(
+    packs_root: str | pathlib.Path = "packs",
+    schema_path: str | pathlib.Path = DEFAULT_SCHEMA_PATH,
+    use_cache: bool = True,
+) -> PackRegistry:
+    # The returned registry is shared process-wide when use_cache is set, so
+    # callers must treat it as read-only. Only manifests whose mtime or size
+    # changed since the last call are re-parsed and re-validated.
+    packs_dir = pathlib.Path(packs_root)
+    schema_file = pathlib.Path(schema_path)
+    schema = _load_schema(schema_file)  # validate every manifest against the pack schema
+    validator = Draft7Validator(schema)
+
+    if not packs_dir.exists():
+        registry = PackRegistry()
+        registry.errors.append(
+            {"path": str(packs_dir), "message": "packs directory does not exist"}
+        )
+        return registry
+
+    manifest_stats = []
+    for manifest_path in sorted(packs_dir.glob("**/pack.json")):
+        try:
+            stat = manifest_path.stat()
+        except OSError:
+            continue
+        manifest_stats.append((manifest_path, (stat.st_mtime_ns, stat.st_size)))
+    signature = tuple((str(path), stat_key) for path, stat_key in manifest_stats)
+    cache_key = (str(packs_dir.resolve()), str(schema_file.resolve()))
+
+    with _CACHE_LOCK:
+        if use_cache:
+            cached = _REGISTRY_CACHE.get(cache_key)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+
+        entries = []
+        for manifest_path, stat_key in manifest_stats:
+            path_key = str(manifest_path.resolve())
+            entry = _MANIFEST_CACHE.get(path_key) if use_cache else None
+            if entry is None or entry.stat_key != stat_key:
+                entry = _load_manifest(manifest_path, validator, stat_key)
+                _MANIFEST_CACHE[path_key] = entry
+            entries.append((manifest_path, entry))
+
+        registry = _assemble_registry(entries, packs_dir)
+        if use_cache:
+            _REGISTRY_CACHE[cache_key] = (signature, registry)
     return registry
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import pathlib
+import shutil
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from src.compilation.compile_cache import write_if_changed
+
+
+"""Content-addressed store behind build/: blobs by sha256, per-world hard-link pointers, size-capped LRU collection."""
+
+
+BLOBS_DIRNAME = "blobs"  # build/blobs/<sha[:2]>/<sha>; never served by name, only through world pointers
+VOICE_CACHE_DIRNAME = "voice_cache"
+MAX_BYTES_ENV = "JUNIORIS_BUILD_MAX_BYTES"  # 0 disables collection
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+GC_GRACE_S = 300.0  # entries and blobs touched this recently are never collected, which covers compiles still in progress
+GC_INTERVAL_S = 60.0  # background collections start at most this often
+TOUCH_INTERVAL_S = 60.0  # serving refreshes an entry's access time at most this often
+
+
+def _atomic_write(path: pathlib.Path, payload: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    staging.write_bytes(payload)
+    os.replace(staging, path)
+
+
+class ArtifactStore:
+    """Writes build artifacts atomically and deduplicates identical payloads across worlds.
+
+    Each artifact path (build/<world_id>/phase0.json, build/voice_cache/<key>.mp3, ...)
+    is a hard link to build/blobs/<sha256>, so readers see either the old or the new
+    file and identical payloads share one inode. Entry access times (world directory
+    or voice file mtime) drive least-recently-used collection under max_bytes.
+    Pointers are shared, so artifacts must be replaced through put, never edited in place.
+    """
+
+    def __init__(self, root: str | pathlib.Path, *, max_bytes: int | None = None) -> None:
+        self.root = pathlib.Path(root)
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv(MAX_BYTES_ENV, DEFAULT_MAX_BYTES))
+        self._gc_lock = threading.Lock()  # one collection at a time
+        self._schedule_lock = threading.Lock()
+        self._gc_thread: threading.Thread | None = None
+        self._last_gc = 0.0
+
+    def blob_path(self, digest: str) -> pathlib.Path:  # two-level fan-out keeps directories small
+        return self.root / BLOBS_DIRNAME / digest[:2] / digest
+
+    def _ensure_blob(self, blob: pathlib.Path, payload: bytes) -> None:
+        try:
+            if blob.stat().st_size == len(payload) and blob.read_bytes() == payload:
+                return
+        except OSError:
+            pass
+        _atomic_write(blob, payload)  # missing, or edited in place through a pointer: store a fresh inode
+
+    def put(self, path: str | pathlib.Path, payload: bytes) -> bool:  # points path at the blob for payload; False when it already held exactly these bytes
+        target = pathlib.Path(path)
+        self.touch(target, force=True)
+        try:
+            if target.stat().st_size == len(payload) and target.read_bytes() == payload:
+                return False
+        except OSError:
+            pass
+        blob = self.blob_path(hashlib.sha256(payload).hexdigest())
+        staging = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        for _ in range(2):
+            self._ensure_blob(blob, payload)
+            try:
+                os.link(blob, staging)
+            except FileExistsError:
+                staging.unlink(missing_ok=True)
+                continue
+            except FileNotFoundError:  # a concurrent collection swept the blob between the check and the link
+                continue
+            except OSError:  # no hard links on this filesystem: fall back to a private atomic copy
+                break
+            os.replace(staging, target)
+            self.touch(target, force=True)
+            return True
+        write_if_changed(target, payload)
+        self.touch(target, force=True)
+        return True
+
+    def _entry_for(self, path: pathlib.Path) -> pathlib.Path | None:  # the unit collection evicts: a world directory or one voice file
+        try:
+            parts = path.resolve().relative_to(self.root.resolve()).parts
+        except (OSError, ValueError):
+            return None
+        if len(parts) >= 2 and parts[0].startswith("world_"):
+            return self.root / parts[0]
+        if len(parts) == 2 and parts[0] == VOICE_CACHE_DIRNAME:
+            return self.root / parts[0] / parts[1]
+        return None
+
+    def touch(self, path: str | pathlib.Path, *, force: bool = False) -> None:  # marks the entry owning path as just used
+        entry = self._entry_for(pathlib.Path(path))
+        if entry is None:
+            return
+        try:
+            if not force and time.time() - entry.stat().st_mtime < TOUCH_INTERVAL_S:
+                return
+            os.utime(entry)
+        except OSError:
+            pass
+
+    def _entries(self) -> Tuple[List[Tuple[float, pathlib.Path, List[Tuple[int, int]]]], Dict[Tuple[int, int], int]]:  # (last access, entry, file inodes) per collectable entry, plus inode sizes
+        entries: List[Tuple[float, pathlib.Path, List[Tuple[int, int]]]] = []
+        sizes: Dict[Tuple[int, int], int] = {}
+        candidates = [path for path in self.root.glob("world_*") if path.is_dir()]
+        candidates.extend(path for path in (self.root / VOICE_CACHE_DIRNAME).glob("*") if path.is_file())
+        for entry in candidates:
+            try:
+                accessed = entry.stat().st_mtime
+            except OSError:
+                continue
+            files = [entry] if entry.is_file() else [path for path in entry.rglob("*") if path.is_file()]
+            inodes = []
+            for path in files:
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                inodes.append((stat.st_dev, stat.st_ino))
+                sizes[(stat.st_dev, stat.st_ino)] = stat.st_size
+            entries.append((accessed, entry, inodes))
+        return entries, sizes
+
+    def _sweep_orphans(self, now: float, *, any_age: bool = False) -> int:  # deletes blobs no pointer links to any more; returns bytes freed
+        freed = 0
+        for blob in (self.root / BLOBS_DIRNAME).glob("*/*"):
+            try:
+                stat = blob.stat()
+            except OSError:
+                continue
+            staging = blob.name.startswith(".")  # a put still writing, or one that crashed; only stale ones go
+            if stat.st_nlink != 1 or ((staging or not any_age) and now - stat.st_mtime < GC_GRACE_S):
+                continue
+            blob.unlink(missing_ok=True)
+            freed += stat.st_size
+        return freed
+
+    def collect(self, max_bytes: int | None = None, *, now: float | None = None) -> Dict[str, Any]:  # evicts least-recently-used entries until the store fits max_bytes
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        now = time.time() if now is None else now
+        with self._gc_lock:
+            entries, sizes = self._entries()
+            references: Dict[Tuple[int, int], int] = {}
+            for _, _, inodes in entries:
+                for inode in inodes:
+                    references[inode] = references.get(inode, 0) + 1
+            freed = self._sweep_orphans(now)
+            total = sum(sizes.values())
+            removed = 0
+            for accessed, entry, inodes in sorted(entries, key=lambda item: (item[0], str(item[1]))):
+                if limit <= 0 or total <= limit or now - accessed < GC_GRACE_S:
+                    break
+                if entry.is_dir():
+                    shutil.rmtree(entry, ignore_errors=True)
+                else:
+                    entry.unlink(missing_ok=True)
+                removed += 1
+                for inode in inodes:
+                    references[inode] -= 1
+                    if references[inode] == 0:  # last pointer gone; its blob goes in the sweep below
+                        total -= sizes[inode]
+                        freed += sizes[inode]
+            if removed:
+                self._sweep_orphans(now, any_age=True)  # blobs orphaned just now; their bytes are already counted in freed
+            self._last_gc = time.monotonic()
+        return {"ok": True, "removed_entries": removed, "freed_bytes": freed, "total_bytes": total, "max_bytes": limit}
+
+    def collect_in_background(self) -> bool:  # starts a daemon collection unless one is running or ran recently; True when started
+        if self.max_bytes <= 0:
+            return False
+        with self._schedule_lock:
+            if self._gc_thread is not None and self._gc_thread.is_alive():
+                return False
+            if self._last_gc and time.monotonic() - self._last_gc < GC_INTERVAL_S:
+                return False
+            self._last_gc = time.monotonic()
+            self._gc_thread = threading.Thread(target=self.collect, name="artifact_gc", daemon=True)
+            self._gc_thread.start()
+        return True
+
+
+_STORES: Dict[str, ArtifactStore] = {}  # resolved build root -> store
+_STORES_LOCK = threading.Lock()
+
+
+def artifact_store(root: str | pathlib.Path) -> ArtifactStore:  # one store per build root so background collections never overlap
+    key = str(pathlib.Path(root).resolve())
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = _STORES[key] = ArtifactStore(root)
+    return store
+
+
+def _main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m src.compilation.artifact_store", description="Collect least-recently-used build artifacts down to a size cap.")
+    parser.add_argument("--build-root", default="build", help="build directory to collect")
+    parser.add_argument("--max-bytes", type=int, default=None, help=f"size cap (default: ${MAX_BYTES_ENV} or {DEFAULT_MAX_BYTES})")
+    args = parser.parse_args(argv)
+
+    root = pathlib.Path(args.build_root)
+    if not root.is_dir():
+        print(f"Directory not found: {root}", file=sys.stderr)
+        return 2
+    report = artifact_store(root).collect(args.max_bytes)
+    print(f"OK: removed {report['removed_entries']} entries, freed {report['freed_bytes']} bytes; {report['total_bytes']} of {report['max_bytes']} bytes in use")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
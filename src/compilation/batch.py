@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Tuple
+
+from src.catalog.pack_registry import load_pack_registry
+from src.compilation.compile_cache import write_if_changed
+from src.compilation.phase0 import compile_phase0
+from src.placement.semantic_taxonomy import compiled_semantic_taxonomy
+from src.planning.assets import planner_asset_index
+
+
+"""Batch phase0 compilation of WorldSpec JSONL across a process pool."""
+
+
+SUMMARY_FILENAME = "batch_summary.jsonl"  # written under the build root, one line per input world in input order
+
+
+def read_worldspec_lines(path: str | pathlib.Path) -> List[Tuple[int, Dict[str, Any] | None, str]]:  # (line number, worldspec or None, parse error) per non-blank line
+    entries: List[Tuple[int, Dict[str, Any] | None, str]] = []
+    with pathlib.Path(path).open(encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                payload = json.loads(line)
+            except json.JSONDecodeError as exc:
+                entries.append((line_number, None, f"invalid JSON: {exc.msg}"))
+                continue
+            if isinstance(payload, dict) and isinstance(payload.get("worldspec"), dict):  # accept {"worldspec": {...}} envelopes as well as bare specs
+                payload = payload["worldspec"]
+            if not isinstance(payload, dict):
+                entries.append((line_number, None, "line is not a JSON object"))
+                continue
+            entries.append((line_number, payload, ""))
+    return entries
+
+
+def _warm_worker() -> None:  # loads the registry, planner pool and taxonomy once per worker so every world reuses them
+    load_pack_registry()
+    planner_asset_index()
+    compiled_semantic_taxonomy()
+
+
+def _world_summary(line_number: int, result: Dict[str, Any], elapsed_ms: float) -> Dict[str, Any]:
+    phase0_data = result.get("phase0_data") if isinstance(result.get("phase0_data"), dict) else {}
+    audit = (phase0_data.get("substitution_report") or {}).get("placement_audit") or {}
+    spawn_meta = phase0_data.get("safe_spawn_meta") or {}
+    return {
+        "line": line_number,
+        "world_id": result.get("world_id"),
+        "ok": bool(result.get("ok")),
+        "elapsed_ms": round(elapsed_ms, 2),
+        "placed_count": len(phase0_data.get("placements") or []),
+        "overlap_count": int(audit.get("overlap_count") or 0),
+        "spawn_attempts": spawn_meta.get("attempts"),
+        "phase0_artifact": result.get("phase0_artifact"),
+        "errors": list(result.get("errors") or []),
+    }
+
+
+def _compile_job(job: Tuple[int, Dict[str, Any] | None, str, str, bool]) -> Dict[str, Any]:
+    line_number, worldspec, parse_error, build_root, use_cache = job
+    if worldspec is None:
+        return _world_summary(line_number, {"ok": False, "errors": [{"path": "$", "message": parse_error}]}, 0.0)
+    started = time.perf_counter()
+    try:
+        result = compile_phase0(worldspec, build_root=build_root, write_artifact=True, use_cache=use_cache)
+    except Exception as exc:  # one bad world must not take the rest of the batch down
+        result = {"ok": False, "errors": [{"path": "$", "message": f"unhandled compile exception: {type(exc).__name__}: {exc}"}]}
+    summary = _world_summary(line_number, result, (time.perf_counter() - started) * 1000.0)
+    if "compile_cache" in result:
+        summary["compile_cache"] = result["compile_cache"]
+    return summary
+
+
+def compile_batch(  # compiles every entry (in a warm process pool when allowed) and writes the per-world summary under build_root
+    entries: Iterable[Tuple[int, Dict[str, Any] | None, str]],
+    build_root: str | pathlib.Path = "build",
+    max_workers: int | None = None,
+    use_cache: bool = False,
+) -> Dict[str, Any]:
+    root = pathlib.Path(build_root)
+    jobs = [(line_number, worldspec, parse_error, str(root), use_cache) for line_number, worldspec, parse_error in entries]
+    workers = max(1, min(len(jobs), max_workers if max_workers is not None else (os.cpu_count() or 1)))
+    started = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as pool:
+            summaries = list(pool.map(_compile_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        _warm_worker()
+        summaries = [_compile_job(job) for job in jobs]
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+    root.mkdir(parents=True, exist_ok=True)
+    summary_path = root / SUMMARY_FILENAME
+    write_if_changed(summary_path, "".join(json.dumps(summary, sort_keys=True) + "\n" for summary in summaries).encode("utf-8"))
+    ok_count = sum(1 for summary in summaries if summary["ok"])
+    return {
+        "ok": ok_count == len(summaries),
+        "world_count": len(summaries),
+        "ok_count": ok_count,
+        "failed_count": len(summaries) - ok_count,
+        "workers": workers,
+        "elapsed_ms": round(elapsed_ms, 2),
+        "summary_path": str(summary_path),
+        "worlds": summaries,
+    }
+
+
+def _main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m src.compilation.batch", description="Compile WorldSpec JSONL to phase0 artifacts.")
+    parser.add_argument("worldspecs", help="JSONL file with one WorldSpec (or {\"worldspec\": ...}) per line")
+    parser.add_argument("--build-root", default="build", help="directory that receives <world_id>/phase0.json and the batch summary")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: one per CPU; 1 compiles inline)")
+    parser.add_argument("--cache", action="store_true", help="reuse artifacts compiled from the same worldspec, catalog and compiler version")
+    args = parser.parse_args(argv)
+
+    input_path = pathlib.Path(args.worldspecs)
+    if not input_path.exists():
+        print(f"File not found: {input_path}", file=sys.stderr)
+        return 2
+
+    report = compile_batch(read_worldspec_lines(input_path), build_root=args.build_root, max_workers=args.workers, use_cache=args.cache)
+    for summary in report["worlds"]:
+        status = "OK" if summary["ok"] else "FAILED"
+        detail = "; ".join(str(error.get("message")) for error in summary["errors"][:2]) if summary["errors"] else ""
+        print(
+            f"{status} line {summary['line']} {summary['world_id'] or '-'} "
+            f"{summary['elapsed_ms']:.1f}ms placed={summary['placed_count']} overlaps={summary['overlap_count']} "
+            f"spawn_attempts={summary['spawn_attempts']}" + (f" {detail}" if detail else "")
+        )
+    print(
+        f"{report['ok_count']}/{report['world_count']} worlds compiled with {report['workers']} workers "
+        f"in {report['elapsed_ms'] / 1000.0:.2f}s; summary at {report['summary_path']}"
+    )
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
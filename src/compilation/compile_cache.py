@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import pathlib
+import threading
+from typing import Any, Callable, Dict
+
+from src.catalog.pack_registry import PackRegistry
+from src.catalog.style_material_pool import DEFAULT_POOL_PATH as STYLE_MATERIAL_POOL_PATH
+from src.compilation.serialization import encode_artifact
+from src.planning.asset_features import taxonomy_fingerprint
+
+try:  # brotli is optional; without it only .gz siblings are written
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency for precompressed artifacts
+    brotli = None
+
+
+"""Opt-in reuse of phase0 artifacts whose inputs have not changed since they were written."""
+
+
+COMPILER_VERSION = "phase0-2"  # bump whenever compile_phase0 output changes for the same inputs
+CACHE_META_FILENAME = "phase0.meta.json"  # sits next to phase0.json and records what that artifact was compiled from
+PRECOMPRESS_MIN_BYTES = 1024  # smaller artifacts are served as-is; compression headers would eat most of the saving
+
+_FILE_DIGESTS: Dict[str, tuple[tuple[int, int], str]] = {}  # resolved path -> (mtime_ns/size, sha256)
+_FILE_DIGESTS_LOCK = threading.Lock()
+
+
+def file_digest(path: pathlib.Path) -> str:  # sha256 of a data file, recomputed only when its inode, mtime or size changes; "" when missing
+    try:
+        stat = path.stat()
+    except OSError:
+        return ""
+    stat_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)  # artifact pointers are swapped to other inodes that can carry older mtimes
+    cache_key = str(path.resolve())
+    with _FILE_DIGESTS_LOCK:
+        cached = _FILE_DIGESTS.get(cache_key)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+    try:
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return ""
+    with _FILE_DIGESTS_LOCK:
+        _FILE_DIGESTS[cache_key] = (stat_key, digest)
+    return digest
+
+
+def catalog_fingerprint(registry: PackRegistry, planner_pool_fingerprint: str) -> str:  # every on-disk catalog input the compiler reads, folded into one hash
+    parts = (
+        f"packs:{registry.fingerprint}",
+        f"planner_pool:{planner_pool_fingerprint}",
+        f"taxonomy:{taxonomy_fingerprint()}",
+        f"style_materials:{file_digest(pathlib.Path(STYLE_MATERIAL_POOL_PATH))}",
+    )
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def compile_cache_key(worldspec_payload: str, catalog: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "compiler_version": COMPILER_VERSION,
+        "worldspec_sha256": hashlib.sha256(worldspec_payload.encode("utf-8")).hexdigest(),
+        "catalog_fingerprint": catalog,
+        "options": options,
+    }
+
+
+def load_cached_compile(world_dir: pathlib.Path, cache_key: Dict[str, Any]) -> Dict[str, Any] | None:  # the stored artifact and result metadata when the key matches and the artifact is intact
+    try:
+        meta = json.loads((world_dir / CACHE_META_FILENAME).read_text(encoding="utf-8"))
+        raw = (world_dir / "phase0.json").read_bytes()
+    except (OSError, json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(meta, dict) or meta.get("cache_key") != cache_key:
+        return None
+    if meta.get("phase0_sha256") != hashlib.sha256(raw).hexdigest():  # artifact edited or half-written since the meta was stored
+        return None
+    try:
+        phase0_data = json.loads(raw.decode("utf-8"))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return {"meta": meta, "phase0_data": phase0_data, "phase0_json": raw}
+
+
+def write_if_changed(path: pathlib.Path, payload: bytes) -> bool:  # atomically replaces path unless it already holds exactly these bytes; True when written
+    try:
+        if path.stat().st_size == len(payload) and path.read_bytes() == payload:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    staging.write_bytes(payload)
+    os.replace(staging, path)
+    return True
+
+
+def precompressed_siblings(path: pathlib.Path) -> Dict[str, pathlib.Path]:  # content-coding -> sibling path, in server preference order
+    siblings = {"br": path.with_name(f"{path.name}.br")} if brotli is not None else {}
+    siblings["gzip"] = path.with_name(f"{path.name}.gz")
+    return siblings
+
+
+def precompressed_source(path: pathlib.Path) -> pathlib.Path:  # records the sha256 of the bytes the siblings were compressed from
+    return path.with_name(f"{path.name}.precompressed")
+
+
+def precompressed_digest(path: pathlib.Path) -> str:  # identity sha256 the current siblings belong to; "" when unknown
+    try:
+        return precompressed_source(path).read_text(encoding="ascii").strip()
+    except (OSError, ValueError):
+        return ""
+
+
+def write_precompressed(  # .gz (and .br) siblings of path, tagged with the sha256 of payload so readers can tell they match
+    path: pathlib.Path,
+    payload: bytes,
+    write: Callable[[pathlib.Path, bytes], bool] = write_if_changed,
+) -> None:
+    siblings = precompressed_siblings(path)
+    source = precompressed_source(path)
+    if len(payload) < PRECOMPRESS_MIN_BYTES:
+        for stale in (source, *siblings.values()):
+            stale.unlink(missing_ok=True)
+        return
+    digest = hashlib.sha256(payload).hexdigest()
+    if precompressed_digest(path) == digest and all(sibling.exists() for sibling in siblings.values()):
+        return
+    # Freshness is by content, not mtime: artifact pointers are hard links to
+    # blobs, so returning to earlier bytes brings back an older mtime. The
+    # record goes first and comes back last, so a reader never pairs a
+    # sibling with bytes it was not compressed from.
+    source.unlink(missing_ok=True)
+    for coding, sibling in siblings.items():
+        compressed = brotli.compress(payload) if coding == "br" else gzip.compress(payload, compresslevel=9, mtime=0)
+        write(sibling, compressed)
+    write(source, digest.encode("ascii"))
+
+
+def store_compile_meta(world_dir: pathlib.Path, cache_key: Dict[str, Any], phase0_bytes: bytes, result: Dict[str, Any]) -> None:
+    meta = {
+        "cache_key": cache_key,
+        "phase0_sha256": hashlib.sha256(phase0_bytes).hexdigest(),
+        "world_id": result.get("world_id"),
+        "teleportable_surfaces": result.get("teleportable_surfaces"),
+    }
+    write_if_changed(world_dir / CACHE_META_FILENAME, encode_artifact(meta))
@@ -1,15 +1,25 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import math
 import pathlib
-from functools import lru_cache
+import time
 from collections import Counter
 from typing import Any, Dict, List, Tuple
 
 from src.catalog.pack_registry import load_pack_registry
+from src.compilation.artifact_store import artifact_store
+from src.compilation.compile_cache import (
+    catalog_fingerprint,
+    compile_cache_key,
+    load_cached_compile,
+    store_compile_meta,
+    write_precompressed,
+)
+from src.compilation.serialization import artifact_json_mode, canonical_json, encode_artifact
+from src.compilation.phase0_binary import PHASE0_BINARY_FILENAME, encode_phase0_binary
 from src.compilation.phase0_placement import (
+    FloorOverlapIndex,
     _apply_face_to_corrections,
     _compiled_input,
     _constraint_type,
@@ -19,9 +29,11 @@ from src.compilation.phase0_placement import (
     _resolve_face_to_target,
     _safe_vec3,
 )
+from src.compilation.phase0_refinement import refine_layout
 from src.catalog.style_material_pool import load_style_material_pool_by_id
-from src.planning.assets import collect_assets, load_planner_pool
-from src.runtime.safe_spawn import find_safe_spawn
+from src.planning.assets import collect_assets, planner_asset_index
+from src.runtime.reachability import analyze_reachability
+from src.runtime.safe_spawn import DEFAULT_SPAWN_ENGINE, SPAWN_ENGINES
 from src.catalog.stylekit_registry import load_stylekit_registry
 from src.selection.substitution import resolve_asset_or_substitute
 from src.world.validation import validate_worldspec
@@ -29,14 +41,27 @@ from src.world.templates import build_template_geometry
 
 
 def _stable_json_payload(data: Dict[str, Any]) -> str:
-    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
+    return canonical_json(data)
 
 
-def _build_world_id(worldspec: Dict[str, Any]) -> str:
-    digest = hashlib.sha256(_stable_json_payload(worldspec).encode("utf-8")).hexdigest()
+def _world_id_for_payload(worldspec_payload: str) -> str:  # world id from an already-encoded canonical worldspec
+    digest = hashlib.sha256(worldspec_payload.encode("utf-8")).hexdigest()
     return f"world_{digest[:10]}"
 
 
+def _build_world_id(worldspec: Dict[str, Any]) -> str:
+    return _world_id_for_payload(_stable_json_payload(worldspec))
+
+
+def _write_phase0_binary(world_dir: pathlib.Path, phase0_data: Dict[str, Any], result: Dict[str, Any]) -> None:  # phase0.bin next to phase0.json, advertised through the manifest
+    payload = encode_phase0_binary(phase0_data)
+    store = artifact_store(world_dir.parent)
+    store.put(world_dir / PHASE0_BINARY_FILENAME, payload)
+    write_precompressed(world_dir / PHASE0_BINARY_FILENAME, payload, write=store.put)
+    result["phase0_binary_artifact"] = str(world_dir / PHASE0_BINARY_FILENAME)
+    result["phase0_binary"] = payload
+
+
 def _compile_failure(
     *,
     world_id: str | None,
@@ -57,13 +82,8 @@ def _compile_failure(
     return result
 
 
-@lru_cache(maxsize=1)
-def _approved_planner_asset_ids() -> frozenset[str]:  # quick check lookup to prevent malicious or non-indexed assets from slipping past LLM validation
-    return frozenset(
-        str(asset.get("asset_id", "")).strip()
-        for asset in load_planner_pool()
-        if isinstance(asset, dict) and asset.get("asset_id")
-    )
+def _approved_planner_asset_ids() -> Dict[str, Dict[str, Any]]:  # quick check lookup to prevent malicious or non-indexed assets from slipping past LLM validation
+    return planner_asset_index().by_id
 
 
 def _substitution_entry(  # structures the normalized audit record for exactly why an asset was chosen by the engine
@@ -156,6 +176,7 @@ def _placement_report(
     substitution_entries: List[Dict[str, Any]],
     rejected_candidate_counts: Counter[str],
     overlap_repair: Dict[str, Any],
+    refinement: Dict[str, Any] | None = None,
 ) -> Dict[str, Any]:
     overlap_pairs = _floor_overlap_pairs(compiled)
     relation_failures: List[Dict[str, Any]] = []
@@ -239,39 +260,13 @@ def _placement_report(
             "group_layout_failure_count": len(group_layout_failures),
             "group_layout_failures": group_layout_failures,
             "face_to_score_by_placement": face_to_scores,
+            "refinement": refinement,
         },
     }
 
 
 def _floor_overlap_pairs(compiled: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    pairs: List[Dict[str, Any]] = []
-    for left_index, left in enumerate(compiled):
-        if _constraint_type(left) in {"wall", "surface", "ceiling"}:
-            continue
-        left_radius = float(((left.get("geometry_profile") or {}).get("footprint_radius")) or 0.0)
-        left_pos = (left.get("transform") or {}).get("pos") or [0.0, 0.0, 0.0]
-        if left_radius <= 0.0:
-            continue
-        for right in compiled[left_index + 1 :]:
-            if _constraint_type(right) in {"wall", "surface", "ceiling"}:
-                continue
-            right_radius = float(((right.get("geometry_profile") or {}).get("footprint_radius")) or 0.0)
-            if right_radius <= 0.0:
-                continue
-            right_pos = (right.get("transform") or {}).get("pos") or [0.0, 0.0, 0.0]
-            distance = math.dist((left_pos[0], left_pos[2]), (right_pos[0], right_pos[2]))
-            if distance < (left_radius + right_radius):
-                pairs.append(
-                    {
-                        "left": str(left.get("asset_id") or ""),
-                        "right": str(right.get("asset_id") or ""),
-                        "left_placement_id": str(left.get("placement_id") or ""),
-                        "right_placement_id": str(right.get("placement_id") or ""),
-                        "distance": round(distance, 3),
-                        "threshold": round(left_radius + right_radius, 3),
-                    }
-                )
-    return pairs
+    return FloorOverlapIndex(compiled).overlap_pairs()
 
 
 def _overlap_trim_priority(placement: Dict[str, Any]) -> int:
@@ -286,21 +281,23 @@ def _overlap_trim_priority(placement: Dict[str, Any]) -> int:
 
 def _trim_residual_overlap_clutter(compiled: List[Dict[str, Any]], dimensions: Dict[str, float]) -> Dict[str, Any]:
     aggregate_repair = {"repair_passes": 0, "repaired_pairs": 0, "group_repairs_applied": 0, "group_members_adjusted": 0}
+    overlap_index = FloorOverlapIndex(compiled)
     for _ in range(8):
-        pairs = _floor_overlap_pairs(compiled)
-        candidate_ids = {pid for pair in pairs for pid in (pair["left_placement_id"], pair["right_placement_id"])}
+        pairs = overlap_index.overlap_pairs()
+        pair_counts = Counter(pid for pair in pairs for pid in {pair["left_placement_id"], pair["right_placement_id"]})
         candidates = [
             placement for placement in compiled
-            if str(placement.get("placement_id") or "") in candidate_ids and _overlap_trim_priority(placement) < 99
+            if str(placement.get("placement_id") or "") in pair_counts and _overlap_trim_priority(placement) < 99
         ]
         if not pairs or not candidates:
             break
         victim = min(candidates, key=lambda placement: (
             _overlap_trim_priority(placement),
-            -sum(str(placement.get("placement_id") or "") in {pair["left_placement_id"], pair["right_placement_id"]} for pair in pairs),
+            -pair_counts[str(placement.get("placement_id") or "")],
         ))
         compiled.remove(victim)
-        repair = _repair_overlaps(compiled, dimensions)
+        overlap_index.discard(victim)
+        repair = _repair_overlaps(compiled, dimensions, overlap_index)
         for key in aggregate_repair:
             aggregate_repair[key] += int(repair.get(key) or 0)
     return aggregate_repair
@@ -314,6 +311,8 @@ def _compile_placements(
     seed: int,
     placement_intent: Dict[str, Any] | None = None,
     placement_mode: str = "scene_graph_solver",
+    scene_program: Dict[str, Any] | None = None,
+    refine_deadline: float | None = None,
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     compiled_inputs: List[Dict[str, Any]] = []
     substitution_entries: List[Dict[str, Any]] = []
@@ -386,8 +385,11 @@ def _compile_placements(
     trim_repair = _trim_residual_overlap_clutter(compiled_inputs, dimensions)
     for key in ("repair_passes", "repaired_pairs", "group_repairs_applied", "group_members_adjusted"):
         overlap_repair[key] = int(overlap_repair.get(key) or 0) + int(trim_repair.get(key) or 0)
+    refinement = None
+    if refine_deadline is not None:
+        refinement = refine_layout(compiled_inputs, dimensions, scene_program or {}, deadline=refine_deadline, seed=seed)
     _apply_face_to_corrections(compiled_inputs)
-    del seed, placement_intent
+    del placement_intent
     compiled = compiled_inputs
     return compiled, _placement_report(
         compiled=compiled,
@@ -396,6 +398,7 @@ def _compile_placements(
         substitution_entries=substitution_entries,
         rejected_candidate_counts=rejected_candidate_counts,
         overlap_repair=overlap_repair,
+        refinement=refinement,
     )
 
 
@@ -523,11 +526,45 @@ def compile_phase0(  # main compiler entry-point: worldspec -> placed, resolved,
     worldspec: Dict[str, Any],
     build_root: str | pathlib.Path = "build",
     write_artifact: bool = True,
+    refine_budget_seconds: float | None = None,
+    use_cache: bool = False,
 ) -> Dict[str, Any]:
+    started = time.monotonic()
     validation = validate_worldspec(worldspec)
     if not validation["ok"]:
         return _compile_failure(world_id=None, errors=validation["errors"])
 
+    worldspec_payload = _stable_json_payload(worldspec)  # encoded once; feeds both the world id and the cache key
+    world_id = _world_id_for_payload(worldspec_payload)
+    room_theme = _derive_room_theme(worldspec)
+    cache_key = None
+    if use_cache and write_artifact:
+        # A stored artifact is reused only when it was compiled from the same
+        # worldspec, catalog files and compiler version.
+        cache_key = compile_cache_key(
+            worldspec_payload,
+            catalog_fingerprint(load_pack_registry(), planner_asset_index().fingerprint),
+            # Refinement is anytime, so whether it ran matters but its budget,
+            # which the API derives from each request's spare latency, does not.
+            {"refine": bool(refine_budget_seconds and refine_budget_seconds > 0.0), "room_theme": room_theme, "json_mode": artifact_json_mode()},
+        )
+        cached = load_cached_compile(pathlib.Path(build_root) / world_id, cache_key)
+        if cached is not None:
+            phase0_data = cached["phase0_data"]
+            result = {
+                "ok": True,
+                "world_id": world_id,
+                "phase0_artifact": str(pathlib.Path(build_root) / world_id / "phase0.json"),
+                "teleportable_surfaces": cached["meta"].get("teleportable_surfaces"),
+                "errors": [],
+                "phase0_data": phase0_data,
+                "phase0_json": cached["phase0_json"],
+                "safe_spawn": phase0_data.get("safe_spawn"),
+                "compile_cache": "hit",
+            }
+            _write_phase0_binary(pathlib.Path(build_root) / world_id, phase0_data, result)
+            return result
+
     template_id = str(worldspec.get("template_id", ""))
     try:
         template = build_template_geometry(template_id)
@@ -544,11 +581,17 @@ def compile_phase0(  # main compiler entry-point: worldspec -> placed, resolved,
     raw_placements = raw_placements if isinstance(raw_placements, list) else []
     pack_ids = worldspec.get("pack_ids")
     pack_ids = pack_ids if isinstance(pack_ids, list) else []
-    room_theme = _derive_room_theme(worldspec)
     planner_policy = worldspec.get("planner_policy") if isinstance(worldspec.get("planner_policy"), dict) else {}
     placement_mode = str(planner_policy.get("placement_mode") or "scene_graph_solver")
+    spawn_engine = str(planner_policy.get("spawn_engine") or DEFAULT_SPAWN_ENGINE)
+    if spawn_engine not in SPAWN_ENGINES:
+        spawn_engine = DEFAULT_SPAWN_ENGINE
+    if refine_budget_seconds is None and isinstance(planner_policy.get("refine_budget_ms"), (int, float)):
+        refine_budget_seconds = float(planner_policy["refine_budget_ms"]) / 1000.0
+    refine_deadline = started + refine_budget_seconds if refine_budget_seconds and refine_budget_seconds > 0.0 else None
     placement_intent = worldspec.get("placement_intent") if isinstance(worldspec.get("placement_intent"), dict) else {}
     placement_plan = worldspec.get("placement_plan") if isinstance(worldspec.get("placement_plan"), dict) else {}
+    scene_context = worldspec.get("scene_context") if isinstance(worldspec.get("scene_context"), dict) else {}
     placements, substitution_report = _compile_placements(
         raw_placements,
         dimensions,
@@ -557,9 +600,10 @@ def compile_phase0(  # main compiler entry-point: worldspec -> placed, resolved,
         int(worldspec.get("seed", 0)),
         placement_intent=placement_intent,
         placement_mode=placement_mode,
+        scene_program=scene_context,
+        refine_deadline=refine_deadline,
     )
 
-    world_id = _build_world_id(worldspec)
     phase0_data = {
         "phase": "phase0",
         "world_id": world_id,
@@ -599,7 +643,7 @@ def compile_phase0(  # main compiler entry-point: worldspec -> placed, resolved,
             phase0_data=phase0_data,
         )
 
-    spawn_result = find_safe_spawn(phase0_data)
+    spawn_result = SPAWN_ENGINES[spawn_engine](phase0_data)
     if not spawn_result["ok"]:
         return _compile_failure(
             world_id=world_id,
@@ -611,26 +655,34 @@ def compile_phase0(  # main compiler entry-point: worldspec -> placed, resolved,
     phase0_data["safe_spawn"] = spawn_result["spawn"]
     phase0_data["safe_spawn_meta"] = {
         "attempts": spawn_result["attempts"],
+        "clearance": spawn_result["clearance"],
+        "engine": spawn_engine,
         "player_capsule_height": 1.70,
         "player_capsule_radius": 0.25,
     }
+    if "cells_evaluated" in spawn_result:
+        phase0_data["safe_spawn_meta"]["cells_evaluated"] = spawn_result["cells_evaluated"]
+    phase0_data["reachability"] = analyze_reachability(phase0_data)
 
-    artifact_path = None
-    if write_artifact:
-        output_path = pathlib.Path(build_root) / world_id / "phase0.json"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(
-            json.dumps(phase0_data, indent=2, sort_keys=True),
-            encoding="utf-8",
-        )
-        artifact_path = str(output_path)
-
-    return {
+    result = {
         "ok": True,
         "world_id": world_id,
-        "phase0_artifact": artifact_path,
+        "phase0_artifact": None,
         "teleportable_surfaces": _count_teleportable_surfaces(template),
         "errors": [],
         "phase0_data": phase0_data,
         "safe_spawn": spawn_result["spawn"],
     }
+    if write_artifact:
+        output_path = pathlib.Path(build_root) / world_id / "phase0.json"
+        payload = encode_artifact(phase0_data)
+        store = artifact_store(build_root)
+        store.put(output_path, payload)  # recompiling an unchanged world leaves the artifact (and its mtime) alone
+        write_precompressed(output_path, payload, write=store.put)
+        result["phase0_artifact"] = str(output_path)
+        result["phase0_json"] = payload  # the manifest splices these bytes instead of re-encoding phase0_data
+        _write_phase0_binary(output_path.parent, phase0_data, result)
+        if cache_key is not None:
+            store_compile_meta(output_path.parent, cache_key, payload, result)
+            result["compile_cache"] = "miss"
+    return result
@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import json
+import struct
+from typing import Any, Dict, List, Tuple
+
+
+"""Versioned binary form of phase0 for clients that should not parse the full JSON before opening the portal.
+
+Layout (little-endian):
+  header        magic "JIP0", u16 version, u16 reserved, u32 string_count, u32 tag_index_count,
+                u32 node_count, u32 placement_count, u32 tail_length
+  string table  u32 byte length per string, then the UTF-8 bytes back to back
+  tag index     u32 string index per tag; records point at runs of it
+  world         one fixed record: phase ids, template id and dimensions, safe_spawn (see _WORLD_FIELDS)
+  nodes         one fixed record per template node (see _NODE_FIELDS)
+  placements    one fixed record per placement, geometry profile included (see _PLACEMENT_FIELDS)
+  tail          compact JSON: diagnostics (reports, reachability, policy) plus any value a record cannot hold exactly
+
+Every record starts with u32 presence bits, one per field in declaration order; a clear bit means the
+field is absent or lives in the tail. String slots hold NULL_STRING for None. Everything the portal
+needs sits in the fixed sections, so a client can stop reading at the tail.
+"""
+
+
+PHASE0_BINARY_FILENAME = "phase0.bin"
+PHASE0_BINARY_MAGIC = b"JIP0"
+PHASE0_BINARY_VERSION = 3  # bump on any layout change; decoders reject versions they do not know
+NULL_STRING = 0xFFFFFFFF  # string slot value for None
+
+_HEADER = struct.Struct("<4sHHIIIII")
+_SLOTS = {  # field kind -> (struct format, slot values written when the field is not in the record)
+    "str": ("I", (NULL_STRING,)),
+    "f32": ("f", (0.0,)),
+    "vec2": ("2f", (0.0, 0.0)),
+    "vec3": ("3f", (0.0, 0.0, 0.0)),
+    "bool": ("?", (False,)),
+    "strs": ("2I", (0, 0)),  # run (offset, count) in the tag index
+    "null": ("", ()),  # marks a None value; needs no slot
+}
+
+_WORLD_FIELDS = (
+    ("phase", "str"),
+    ("world_id", "str"),
+    ("worldspec_version", "str"),
+    ("template.template_id", "str"),
+    ("template.dimensions.width", "f32"),
+    ("template.dimensions.length", "f32"),
+    ("template.dimensions.height", "f32"),
+    ("safe_spawn", "null"),
+    ("safe_spawn.pos", "vec3"),
+    ("safe_spawn.rot", "vec3"),
+)
+_NODE_FIELDS = (
+    ("id", "str"),
+    ("kind", "str"),
+    ("size", "vec2"),  # planes
+    ("size", "vec3"),  # boxes
+    ("position", "vec3"),
+    ("rotation", "vec3"),
+    ("collider", "bool"),
+    ("teleportable", "bool"),
+    ("surface_material.surface_role", "str"),  # what the renderer binds; display names and tag lists stay in the tail
+    ("surface_material.material_id", "str"),
+    ("surface_material.material_path", "str"),
+    ("surface_material.preview_texture_asset_path", "str"),
+    ("surface_material.preview_color_hex", "str"),
+)
+_PLACEMENT_FIELDS = (
+    ("placement_id", "str"),
+    ("asset_id", "str"),
+    ("requested_asset_id", "str"),
+    ("role", "str"),
+    ("resolution_type", "str"),
+    ("substitution_reason", "str"),
+    ("mode", "str"),
+    ("label", "str"),
+    ("group_id", "str"),
+    ("group_layout", "str"),
+    ("zone_preference", "str"),
+    ("tags", "strs"),
+    ("constraint", "null"),
+    ("constraint.type", "str"),
+    ("constraint.target", "str"),
+    ("constraint.relation", "str"),
+    ("target_height", "f32"),
+    ("front_yaw_offset_degrees", "f32"),
+    ("vertical_origin_offset_meters", "f32"),
+    ("geometry_profile.footprint_radius", "f32"),
+    ("geometry_profile.wall_clearance", "f32"),
+    ("geometry_profile.preferred_near_distance", "f32"),
+    ("geometry_profile.footprint_area", "f32"),
+    ("geometry_profile.collision_padding_class", "str"),
+    ("geometry_profile.placement_role", "str"),
+    ("geometry_profile.bounds_source", "str"),
+    ("transform.pos", "vec3"),
+    ("transform.rot", "vec3"),
+    ("transform.scale", "vec3"),
+)
+
+
+def _float32(value: float) -> float:  # the value a client reading the float32 slot sees, widened back to a Python float
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+
+def _exact_float32(value: Any) -> bool:  # only floats that survive the float32 round trip go into records; the rest stay exact in the tail
+    if type(value) is not float:
+        return False
+    try:
+        return _shortest_float32(_float32(value)) == value
+    except OverflowError:
+        return False
+
+
+def _shortest_float32(value: float) -> float:  # shortest decimal that packs to the same float32, so 0.123 decodes as 0.123 rather than 0.12300000339746475
+    packed = struct.pack("<f", value)
+    for digits in range(1, 10):
+        candidate = float(f"{value:.{digits}g}")
+        if struct.pack("<f", candidate) == packed:
+            return candidate
+    return value
+
+
+def _fits(kind: str, value: Any) -> bool:  # whether value round-trips exactly through a slot of this kind
+    if kind == "str":
+        return value is None or isinstance(value, str)
+    if kind == "f32":
+        return _exact_float32(value)
+    if kind in ("vec2", "vec3"):
+        return isinstance(value, list) and len(value) == int(kind[3]) and all(_exact_float32(item) for item in value)
+    if kind == "bool":
+        return type(value) is bool
+    if kind == "strs":
+        return isinstance(value, list) and all(isinstance(item, str) for item in value)
+    return value is None
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.strings: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+
+class _RecordCodec:
+    """Fixed-layout record over dotted field paths; whatever a record cannot hold exactly is handed back as extras."""
+
+    def __init__(self, fields: Tuple[Tuple[str, str], ...]) -> None:
+        if len(fields) > 32:
+            raise ValueError("a record holds at most 32 fields")
+        self.fields = tuple((tuple(path.split(".")), kind) for path, kind in fields)
+        self.struct = struct.Struct("<I" + "".join(_SLOTS[kind][0] for _, kind in self.fields))
+
+    def pack(self, record: Dict[str, Any], strings: _StringTable, tag_index: List[int]) -> Tuple[bytes, Dict[str, Any]]:  # fixed record plus the fields left for the tail
+        extras = _copy_dicts(record)
+        present = 0
+        slots: List[Any] = []
+        consumed: List[Tuple[str, ...]] = []
+        for bit, (path, kind) in enumerate(self.fields):
+            found, value = _lookup(record, path)
+            if not (found and _fits(kind, value)):
+                slots.extend(_SLOTS[kind][1])
+                continue
+            present |= 1 << bit
+            _remove(extras, path)
+            consumed.append(path)
+            if kind == "str":
+                slots.append(NULL_STRING if value is None else strings.intern(value))
+            elif kind == "strs":
+                slots.extend((len(tag_index), len(value)))
+                tag_index.extend(strings.intern(item) for item in value)
+            elif kind.startswith("vec"):
+                slots.extend(value)
+            elif kind != "null":
+                slots.append(value)
+        for path in consumed:  # nested dicts emptied by packing are rebuilt on decode, so they leave the tail too
+            for depth in range(len(path) - 1, 0, -1):
+                found, parent = _lookup(extras, path[:depth])
+                if not (found and parent == {}):
+                    break
+                _remove(extras, path[:depth])
+        return self.struct.pack(present, *slots), extras
+
+    def unpack(self, payload: bytes, offset: int, strings: List[str], tag_index: Tuple[int, ...]) -> Dict[str, Any]:
+        values = self.struct.unpack_from(payload, offset)
+        present = values[0]
+        record: Dict[str, Any] = {}
+        slot = 1
+        for bit, (path, kind) in enumerate(self.fields):
+            width = len(_SLOTS[kind][1])
+            raw = values[slot:slot + width]
+            slot += width
+            if not present & (1 << bit):
+                continue
+            if kind == "str":
+                value: Any = None if raw[0] == NULL_STRING else strings[raw[0]]
+            elif kind == "strs":
+                value = [strings[index] for index in tag_index[raw[0]:raw[0] + raw[1]]]
+            elif kind == "f32":
+                value = _shortest_float32(raw[0])
+            elif kind.startswith("vec"):
+                value = [_shortest_float32(item) for item in raw]
+            elif kind == "bool":
+                value = raw[0]
+            else:
+                value = None
+            _assign(record, path, value)
+        return record
+
+
+def _copy_dicts(value: Any) -> Any:  # copies nested dicts so packing can drop keys; lists and leaves are shared
+    if isinstance(value, dict):
+        return {key: _copy_dicts(item) for key, item in value.items()}
+    return value
+
+
+def _lookup(record: Any, path: Tuple[str, ...]) -> Tuple[bool, Any]:
+    for key in path:
+        if not isinstance(record, dict) or key not in record:
+            return False, None
+        record = record[key]
+    return True, record
+
+
+def _remove(record: Dict[str, Any], path: Tuple[str, ...]) -> None:
+    for key in path[:-1]:
+        record = record[key]
+    del record[path[-1]]
+
+
+def _assign(record: Dict[str, Any], path: Tuple[str, ...], value: Any) -> None:
+    for key in path[:-1]:
+        record = record.setdefault(key, {})
+    record[path[-1]] = value
+
+
+def _merge(record: Dict[str, Any], extras: Dict[str, Any]) -> Dict[str, Any]:  # lays tail extras back over a decoded record
+    for key, value in extras.items():
+        if isinstance(value, dict) and isinstance(record.get(key), dict):
+            _merge(record[key], value)
+        else:
+            record[key] = value
+    return record
+
+
+_WORLD = _RecordCodec(_WORLD_FIELDS)
+_NODE = _RecordCodec(_NODE_FIELDS)
+_PLACEMENT = _RecordCodec(_PLACEMENT_FIELDS)
+
+
+def _packable(items: Any) -> bool:
+    return isinstance(items, list) and all(isinstance(item, dict) for item in items)
+
+
+def encode_phase0_binary(phase0_data: Dict[str, Any]) -> bytes:
+    strings = _StringTable()
+    tag_index: List[int] = []
+    world = dict(phase0_data)
+    template = world.get("template")
+    nodes = template.get("nodes") if isinstance(template, dict) else None
+    pack_nodes = _packable(nodes)
+    if pack_nodes:
+        world["template"] = {key: value for key, value in template.items() if key != "nodes"}
+    placements = world.get("placements")
+    pack_placements = _packable(placements)
+    if pack_placements:
+        del world["placements"]
+
+    world_record, world_extras = _WORLD.pack(world, strings, tag_index)
+    node_records: List[bytes] = []
+    node_extras: List[Dict[str, Any]] = []
+    for node in nodes if pack_nodes else []:
+        record, extras = _NODE.pack(node, strings, tag_index)
+        node_records.append(record)
+        node_extras.append(extras)
+    placement_records: List[bytes] = []
+    placement_extras: List[Dict[str, Any]] = []
+    for placement in placements if pack_placements else []:
+        record, extras = _PLACEMENT.pack(placement, strings, tag_index)
+        placement_records.append(record)
+        placement_extras.append(extras)
+
+    tail = json.dumps(
+        {
+            "phase0": world_extras,
+            "node_extras": node_extras if pack_nodes else None,
+            "placement_extras": placement_extras if pack_placements else None,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    encoded_strings = [value.encode("utf-8") for value in strings.strings]
+    parts = [
+        _HEADER.pack(
+            PHASE0_BINARY_MAGIC,
+            PHASE0_BINARY_VERSION,
+            0,
+            len(encoded_strings),
+            len(tag_index),
+            len(node_records),
+            len(placement_records),
+            len(tail),
+        ),
+        struct.pack(f"<{len(encoded_strings)}I", *(len(value) for value in encoded_strings)),
+        *encoded_strings,
+        struct.pack(f"<{len(tag_index)}I", *tag_index),
+        world_record,
+        *node_records,
+        *placement_records,
+        tail,
+    ]
+    return b"".join(parts)
+
+
+def decode_phase0_binary(payload: bytes) -> Dict[str, Any]:  # reference decoder; returns the same phase0_data the JSON artifact holds
+    if len(payload) < _HEADER.size:
+        raise ValueError("phase0 binary is truncated")
+    magic, version, _reserved, string_count, tag_index_count, node_count, placement_count, tail_length = _HEADER.unpack_from(payload, 0)
+    if magic != PHASE0_BINARY_MAGIC:
+        raise ValueError("not a phase0 binary artifact")
+    if version != PHASE0_BINARY_VERSION:
+        raise ValueError(f"unsupported phase0 binary version {version}")
+
+    offset = _HEADER.size
+    try:
+        lengths = struct.unpack_from(f"<{string_count}I", payload, offset)
+        offset += 4 * string_count
+        strings: List[str] = []
+        for length in lengths:
+            strings.append(payload[offset:offset + length].decode("utf-8"))
+            offset += length
+        tag_index = struct.unpack_from(f"<{tag_index_count}I", payload, offset)
+    except struct.error as exc:
+        raise ValueError("phase0 binary is truncated") from exc
+    offset += 4 * tag_index_count
+    world_offset = offset
+    nodes_offset = world_offset + _WORLD.struct.size
+    placements_offset = nodes_offset + _NODE.struct.size * node_count
+    offset = placements_offset + _PLACEMENT.struct.size * placement_count
+    if offset + tail_length != len(payload):
+        raise ValueError("phase0 binary length does not match its header")
+    tail = json.loads(payload[offset:].decode("utf-8"))
+
+    phase0_data = _merge(_WORLD.unpack(payload, world_offset, strings, tag_index), tail["phase0"])
+    if tail["node_extras"] is not None:
+        phase0_data["template"]["nodes"] = [
+            _merge(_NODE.unpack(payload, nodes_offset + position * _NODE.struct.size, strings, tag_index), extras)
+            for position, extras in enumerate(tail["node_extras"])
+        ]
+    if tail["placement_extras"] is not None:
+        phase0_data["placements"] = [
+            _merge(_PLACEMENT.unpack(payload, placements_offset + position * _PLACEMENT.struct.size, strings, tag_index), extras)
+            for position, extras in enumerate(tail["placement_extras"])
+        ]
+    return phase0_data
@@ -4,6 +4,8 @@ import math
 from typing import Any, Dict, List
 
 from src.placement.geometry import geometry_profile_from_asset, semantic_role_key
+from src.placement.occupancy import PointGrid
+from src.planning.asset_features import precomputed_asset_features
 from src.runtime.realization_registry import resolve_target_height_meters
 
 def _safe_vec3(values: Any, default: List[float]) -> List[float]:
@@ -254,74 +256,185 @@ def _targets_asset(source: Dict[str, Any], target: Dict[str, Any]) -> bool:
     }
 
 
-def _repair_overlaps(compiled_inputs: List[Dict[str, Any]], dimensions: Dict[str, float]) -> Dict[str, Any]:  # iterative multi-pass constraint solver that continuously pushes intersecting objects out of bounds
-    repaired_pairs = 0
-    max_passes = 8
-    _apply_face_to_corrections(compiled_inputs)
+NON_FLOOR_CONSTRAINTS = {"wall", "surface", "ceiling"}
+REPAIR_CLEARANCE = 0.05  # extra gap the repair pass leaves between pushed-apart footprints
+
+
+class FloorOverlapIndex:
+    """Floor footprints of a placement list, hashed for overlap queries.
 
-    for pass_index in range(max_passes):
-        changed = False
-        for left_index, left in enumerate(compiled_inputs):
-            if _constraint_type(left) in {"wall", "surface", "ceiling"}:
+    Keeps a spatial grid of footprint centers and the current set of
+    overlapping pairs (centers closer than the summed radii), both refreshed
+    per moved placement instead of rescanned. Placements are addressed by
+    their position in the list the index was built from, so pair order stays
+    the list order even after discard().
+    """
+
+    def __init__(self, placements: List[Dict[str, Any]]) -> None:
+        self._placements = list(placements)
+        self._ordinal = {id(placement): index for index, placement in enumerate(self._placements)}
+        self._radius: Dict[int, float] = {}
+        self._grid = PointGrid()
+        self._overlaps: Dict[int, set[int]] = {}
+        for index, placement in enumerate(self._placements):
+            if _constraint_type(placement) in NON_FLOOR_CONSTRAINTS:
                 continue
-            left_profile = left.get("geometry_profile") if isinstance(left.get("geometry_profile"), dict) else {}
-            left_radius = float(left_profile.get("footprint_radius") or 0.0)
-            left_transform = left.get("transform") if isinstance(left.get("transform"), dict) else {}
-            left_pos = left_transform.get("pos") if isinstance(left_transform.get("pos"), list) else None
-            if left_radius <= 0.0 or not isinstance(left_pos, list):
+            radius = float(((placement.get("geometry_profile") or {}).get("footprint_radius")) or 0.0)
+            if radius <= 0.0:
                 continue
-
-            for right in compiled_inputs[left_index + 1 :]:
-                if _constraint_type(right) in {"wall", "surface", "ceiling"}:
-                    continue
-                right_profile = right.get("geometry_profile") if isinstance(right.get("geometry_profile"), dict) else {}
-                right_radius = float(right_profile.get("footprint_radius") or 0.0)
-                right_transform = right.get("transform") if isinstance(right.get("transform"), dict) else {}
-                right_pos = right_transform.get("pos") if isinstance(right_transform.get("pos"), list) else None
-                if right_radius <= 0.0 or not isinstance(right_pos, list):
-                    continue
-
-                minimum_distance = left_radius + right_radius + 0.05
-                if _distance_xz(left_pos, right_pos) >= minimum_distance:
-                    continue
-
-                moving = right
-                anchor = left
-                if _targets_asset(left, right) and not _targets_asset(right, left):
-                    moving = left
-                    anchor = right
-
-                anchor_transform = anchor.get("transform") if isinstance(anchor.get("transform"), dict) else {}
-                moving_transform = moving.get("transform") if isinstance(moving.get("transform"), dict) else {}
-                anchor_position = anchor_transform.get("pos") if isinstance(anchor_transform.get("pos"), list) else [0.0, 0.0, 0.0]
-                moving_position = moving_transform.get("pos") if isinstance(moving_transform.get("pos"), list) else [0.0, 0.0, 0.0]
-                repaired_position = _push_apart(
-                    anchor_pos=anchor_position,
-                    moving_pos=moving_position,
-                    min_distance=minimum_distance,
+            self._radius[index] = radius
+            position = self._position(index)
+            self._grid.insert(index, float(position[0]), float(position[2]))
+            self._overlaps[index] = set()
+        self._max_radius = max(self._radius.values(), default=0.0)
+        for index in self._radius:
+            self._refresh_overlaps(index)
+
+    def _position(self, index: int) -> List[float]:
+        return (self._placements[index].get("transform") or {}).get("pos") or [0.0, 0.0, 0.0]
+
+    def _neighbors(self, index: int, position: List[float], margin: float = 0.0) -> List[int]:
+        reach = self._radius[index] + self._max_radius + margin
+        return [other for other in self._grid.near(float(position[0]), float(position[2]), reach) if other != index]
+
+    def _refresh_overlaps(self, index: int) -> None:
+        for other in self._overlaps[index]:
+            self._overlaps[other].discard(index)
+        position = self._position(index)
+        overlapping = {
+            other
+            for other in self._neighbors(index, position)
+            if _distance_xz(position, self._position(other)) < self._radius[index] + self._radius[other]
+        }
+        self._overlaps[index] = overlapping
+        for other in overlapping:
+            self._overlaps[other].add(index)
+
+    def moved(self, placement: Dict[str, Any]) -> None:  # re-hash one placement after its transform changed
+        index = self._ordinal[id(placement)]
+        if index not in self._grid:
+            return
+        position = self._position(index)
+        self._grid.insert(index, float(position[0]), float(position[2]))
+        self._refresh_overlaps(index)
+
+    def discard(self, placement: Dict[str, Any]) -> None:
+        index = self._ordinal.get(id(placement))
+        if index is None or index not in self._grid:
+            return
+        self._grid.remove(index)
+        for other in self._overlaps.pop(index):
+            self._overlaps[other].discard(index)
+
+    def overlap_pairs(self) -> List[Dict[str, Any]]:  # same records and order as a full left/right scan of the list
+        pairs: List[Dict[str, Any]] = []
+        for left_index in sorted(self._overlaps):
+            left = self._placements[left_index]
+            left_pos = self._position(left_index)
+            for right_index in sorted(other for other in self._overlaps[left_index] if other > left_index):
+                right = self._placements[right_index]
+                threshold = self._radius[left_index] + self._radius[right_index]
+                pairs.append(
+                    {
+                        "left": str(left.get("asset_id") or ""),
+                        "right": str(right.get("asset_id") or ""),
+                        "left_placement_id": str(left.get("placement_id") or ""),
+                        "right_placement_id": str(right.get("placement_id") or ""),
+                        "distance": round(_distance_xz(left_pos, self._position(right_index)), 3),
+                        "threshold": round(threshold, 3),
+                    }
                 )
-                clamped_position = _clamp_floor_position(repaired_position, dimensions)
-                offset = moving.get("vertical_origin_offset_meters")
-                if isinstance(offset, (int, float)) and float(offset) != 0.0:
-                    clamped_position[1] = round(float(repaired_position[1]), 3)
-                moving_transform["pos"] = clamped_position
-                repaired_pairs += 1
-                changed = True
-
-        if not changed:
-            return {
-                "repair_passes": pass_index,
-                "repaired_pairs": repaired_pairs,
-                "group_repairs_applied": 0,
-                "group_members_adjusted": 0,
-            }
-
-    return {
-        "repair_passes": max_passes,
-        "repaired_pairs": repaired_pairs,
-        "group_repairs_applied": 0,
-        "group_members_adjusted": 0,
-    }
+        return pairs
+
+    def _repairable(self, index: int) -> bool:
+        transform = self._placements[index].get("transform")
+        return isinstance(transform, dict) and isinstance(transform.get("pos"), list)
+
+    def repair(self, dimensions: Dict[str, float], max_passes: int = 8) -> Dict[str, Any]:
+        # Pairwise push-apart in list order, each pass seeing the moves made
+        # earlier in it. A pair whose placements have not moved since it was
+        # last checked cannot start overlapping, so every pass only visits
+        # pairs touching a placement that moved in the previous pass or
+        # earlier in this one; the first pass starts from the pairs that
+        # already sit inside the clearance.
+        repairable = [index for index in sorted(self._radius) if index in self._grid and self._repairable(index)]
+        repairable_set = set(repairable)
+        dirty: set[int] = set()
+        for index in repairable:
+            position = self._position(index)
+            for other in self._neighbors(index, position, REPAIR_CLEARANCE):
+                if other > index and other in repairable_set:
+                    if _distance_xz(position, self._position(other)) < self._radius[index] + self._radius[other] + REPAIR_CLEARANCE:
+                        dirty.update((index, other))
+
+        repaired_pairs = 0
+        for pass_index in range(max_passes):
+            moved: set[int] = set()
+            for left_index in repairable:
+                if not dirty:
+                    break
+                left = self._placements[left_index]
+                left_pos = left["transform"]["pos"]
+                left_dirty = left_index in dirty
+                candidates = [
+                    other
+                    for other in self._neighbors(left_index, left_pos, REPAIR_CLEARANCE)
+                    if other > left_index and other in repairable_set and (left_dirty or other in dirty)
+                ]
+                for right_index in sorted(candidates):
+                    right = self._placements[right_index]
+                    minimum_distance = self._radius[left_index] + self._radius[right_index] + REPAIR_CLEARANCE
+                    if _distance_xz(left_pos, right["transform"]["pos"]) >= minimum_distance:
+                        continue
+
+                    moving = right
+                    anchor = left
+                    if _targets_asset(left, right) and not _targets_asset(right, left):
+                        moving = left
+                        anchor = right
+
+                    repaired_position = _push_apart(
+                        anchor_pos=anchor["transform"]["pos"],
+                        moving_pos=moving["transform"]["pos"],
+                        min_distance=minimum_distance,
+                    )
+                    clamped_position = _clamp_floor_position(repaired_position, dimensions)
+                    offset = moving.get("vertical_origin_offset_meters")
+                    if isinstance(offset, (int, float)) and float(offset) != 0.0:
+                        clamped_position[1] = round(float(repaired_position[1]), 3)
+                    moving["transform"]["pos"] = clamped_position
+                    self.moved(moving)
+                    moving_index = self._ordinal[id(moving)]
+                    moved.add(moving_index)
+                    dirty.add(moving_index)
+                    repaired_pairs += 1
+
+            if not moved:
+                return {
+                    "repair_passes": pass_index,
+                    "repaired_pairs": repaired_pairs,
+                    "group_repairs_applied": 0,
+                    "group_members_adjusted": 0,
+                }
+            dirty = moved
+
+        return {
+            "repair_passes": max_passes,
+            "repaired_pairs": repaired_pairs,
+            "group_repairs_applied": 0,
+            "group_members_adjusted": 0,
+        }
+
+
+def _repair_overlaps(  # iterative multi-pass constraint solver that continuously pushes intersecting objects out of bounds
+    compiled_inputs: List[Dict[str, Any]],
+    dimensions: Dict[str, float],
+    overlap_index: FloorOverlapIndex | None = None,
+) -> Dict[str, Any]:
+    _apply_face_to_corrections(compiled_inputs)
+    if overlap_index is None:
+        overlap_index = FloorOverlapIndex(compiled_inputs)
+    return overlap_index.repair(dimensions)
 
 
 def _compiled_input(  # joins final geometric clamping with the substitution profile as the core phase0 representation record
@@ -339,7 +452,8 @@ def _compiled_input(  # joins final geometric clamping with the substitution pro
     dimensions: Dict[str, float],
     asset_record: Dict[str, Any],
 ) -> Dict[str, Any]:
-    role = str(placement.get("role") or semantic_role_key(asset_record))
+    features = precomputed_asset_features(asset_record)
+    role = str(placement.get("role") or (features["role_key"] if features is not None else semantic_role_key(asset_record)))
     normalized_scale = _normalized_role_scale(scale, asset_record, role)
     geometry_profile = geometry_profile_from_asset(asset_record, scale=normalized_scale)
     if not geometry_profile and isinstance(placement.get("geometry_profile"), dict):
@@ -365,6 +479,7 @@ def _compiled_input(  # joins final geometric clamping with the substitution pro
         "constraint": placement.get("constraint"),
         "group_id": placement.get("group_id"),
         "group_layout": placement.get("group_layout"),
+        "zone_preference": placement.get("zone_preference"),
         "target_height": round(resolve_target_height_meters(asset_record, role), 4),
         "front_yaw_offset_degrees": float(
             placement.get("front_yaw_offset_degrees")
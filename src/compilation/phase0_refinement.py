@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import math
+import random
+import time
+from typing import Any, Dict, List, Sequence
+
+from src.compilation.phase0_placement import (
+    NON_FLOOR_CONSTRAINTS,
+    REPAIR_CLEARANCE,
+    _clamp_floor_position,
+    _constraint_relation,
+    _constraint_type,
+    _distance_xz,
+    _face_alignment_score,
+    _resolve_face_to_target,
+)
+from src.placement.scene_solver import CLEARANCE_CAP, _clearance_score, _focal_score, _safe_text, _walkway_penalty, _zone_score
+from src.placement.scene_solver_defaults import EDGE_BIASED_ROLES
+
+
+"""Anytime hill-climbing refinement of compiled floor layouts."""
+
+
+REFINE_MAX_ITERATIONS = 4000  # hard cap so a generous budget still ends deterministically
+REFINE_INITIAL_STEP = 0.5  # meters; first move radius, halved after a run of rejected proposals
+REFINE_MIN_STEP = 0.05  # below this the search counts as converged
+REFINE_YAW_STEP = 15.0  # degrees a proposal may turn a free-standing object
+NEAR_SLACK = 0.25  # a near-constrained pair may drift this much further apart than it started
+
+
+def _footprint_radius(placement: Dict[str, Any]) -> float:
+    return float(((placement.get("geometry_profile") or {}).get("footprint_radius")) or 0.0)
+
+
+class _LayoutObjective:
+    """Solver scoring terms over compiled placements, evaluated per object.
+
+    An object's term is the solver's clearance, zone, focal and walkway score
+    at its current transform plus its face_to alignment. The zone is the
+    placement's solver zone_preference and the walkway and focal terms read
+    the worldspec scene_context, which carries the solver's circulation fields. Moving one object
+    only changes its own term, the terms of objects near its old or new
+    position (clearance), and the terms of objects facing it.
+    """
+
+    def __init__(self, compiled_inputs: List[Dict[str, Any]], dimensions: Dict[str, float], scene_program: Dict[str, Any]) -> None:
+        self.placements = compiled_inputs
+        self.dimensions = dimensions
+        self.scene_program = scene_program
+        self.floor = [
+            placement
+            for placement in compiled_inputs
+            if _constraint_type(placement) not in NON_FLOOR_CONSTRAINTS
+            and _footprint_radius(placement) > 0.0
+            and isinstance((placement.get("transform") or {}).get("pos"), list)
+        ]
+        self.max_radius = max((_footprint_radius(placement) for placement in self.floor), default=0.0)
+        self.targets = {id(placement): _resolve_face_to_target(placement, compiled_inputs) for placement in self.floor}
+        self.facing: Dict[int, List[Dict[str, Any]]] = {}
+        for placement in self.floor:
+            target = self.targets[id(placement)]
+            if target is not None and _constraint_relation(placement) == "face_to":
+                self.facing.setdefault(id(target), []).append(placement)
+
+    def term(self, placement: Dict[str, Any]) -> float:
+        transform = placement["transform"]
+        position = transform["pos"]
+        yaw = float((transform.get("rot") or [0.0, 0.0, 0.0])[1])
+        role = str(placement.get("role") or "").strip().lower()
+        radius = _footprint_radius(placement)
+        others = [other for other in self.floor if other is not placement]
+        zone = _safe_text(placement.get("zone_preference")) or ("edge" if role in EDGE_BIASED_ROLES else "center")  # hand-written worldspecs carry no solver zone
+        score = 2.5 * _clearance_score(position, radius, others, skip_group_id=str(placement.get("group_id") or "").strip().lower())
+        score += 1.5 * _zone_score(position, zone, self.dimensions)
+        score += _focal_score(position, yaw, role, self.scene_program, self.dimensions)
+        score -= _walkway_penalty(position, role, self.scene_program, self.dimensions)
+        target = self.targets[id(placement)]
+        if target is not None and _constraint_relation(placement) == "face_to":
+            score += _face_alignment_score(placement, target) or 0.0
+        return score
+
+    def total(self) -> float:
+        return sum(self.term(placement) for placement in self.floor)
+
+    def affected(self, placement: Dict[str, Any], positions: Sequence[Sequence[float]]) -> List[Dict[str, Any]]:
+        reach = _footprint_radius(placement) + self.max_radius + CLEARANCE_CAP
+        touched = [placement]
+        for other in self.floor:
+            if other is placement:
+                continue
+            other_pos = other["transform"]["pos"]
+            if any(_distance_xz(position, other_pos) <= reach for position in positions):
+                touched.append(other)
+        for source in self.facing.get(id(placement), []):
+            if source is not placement and source not in touched:
+                touched.append(source)
+        return touched
+
+
+def _near_links(objective: _LayoutObjective) -> List[tuple[Dict[str, Any], Dict[str, Any], float]]:  # (source, target, allowed distance) for every near-constrained floor pair
+    links = []
+    for placement in objective.floor:
+        target = objective.targets[id(placement)]
+        if target is None or _constraint_type(placement) != "near":
+            continue
+        target_pos = (target.get("transform") or {}).get("pos")
+        if isinstance(target_pos, list):
+            links.append((placement, target, _distance_xz(placement["transform"]["pos"], target_pos) + NEAR_SLACK))
+    return links
+
+
+def _proposal_is_valid(
+    placement: Dict[str, Any],
+    objective: _LayoutObjective,
+    near_links: List[tuple[Dict[str, Any], Dict[str, Any], float]],
+) -> bool:
+    position = placement["transform"]["pos"]
+    radius = _footprint_radius(placement)
+    for other in objective.floor:
+        if other is not placement and _distance_xz(position, other["transform"]["pos"]) < radius + _footprint_radius(other) + REPAIR_CLEARANCE:
+            return False
+    for source, target, allowed in near_links:
+        if (source is placement or target is placement) and _distance_xz(source["transform"]["pos"], target["transform"]["pos"]) > allowed:
+            return False
+    return True
+
+
+def refine_layout(  # anytime local search: nudges floor objects while the solver objective improves, until the deadline
+    compiled_inputs: List[Dict[str, Any]],
+    dimensions: Dict[str, float],
+    scene_program: Dict[str, Any],
+    *,
+    deadline: float,
+    seed: int = 0,
+    max_iterations: int = REFINE_MAX_ITERATIONS,
+) -> Dict[str, Any]:
+    objective = _LayoutObjective(compiled_inputs, dimensions, scene_program)
+    near_links = _near_links(objective)
+    rng = random.Random(seed)
+    start_score = objective.total()
+    score = start_score
+    step = REFINE_INITIAL_STEP
+    rejected_run = 0
+    iterations = 0
+    accepted = 0
+    stopped = "converged" if objective.floor else "empty"
+
+    while objective.floor and step >= REFINE_MIN_STEP:
+        if iterations >= max_iterations:
+            stopped = "iterations"
+            break
+        if time.monotonic() >= deadline:
+            stopped = "deadline"
+            break
+        iterations += 1
+        placement = objective.floor[rng.randrange(len(objective.floor))]
+        transform = placement["transform"]
+        old_pos = transform["pos"]
+        old_rot = transform.get("rot")
+        angle = rng.uniform(0.0, 2.0 * math.pi)
+        distance = step * rng.uniform(0.25, 1.0)
+        new_pos = _clamp_floor_position(
+            [float(old_pos[0]) + (math.cos(angle) * distance), float(old_pos[1]), float(old_pos[2]) + (math.sin(angle) * distance)],
+            dimensions,
+        )
+        new_pos[1] = old_pos[1]
+        turn = rng.choice((-REFINE_YAW_STEP, 0.0, REFINE_YAW_STEP))
+        touched = objective.affected(placement, (old_pos, new_pos))
+        before = sum(objective.term(item) for item in touched)
+
+        transform["pos"] = new_pos
+        if turn and isinstance(old_rot, list) and len(old_rot) == 3 and _constraint_relation(placement) != "face_to":
+            transform["rot"] = [old_rot[0], round((float(old_rot[1]) + turn) % 360.0, 3), old_rot[2]]
+        improved = False
+        if _proposal_is_valid(placement, objective, near_links):
+            after = sum(objective.term(item) for item in touched)
+            improved = after > before + 1e-9
+        if improved:
+            score += after - before
+            accepted += 1
+            rejected_run = 0
+            continue
+        transform["pos"] = old_pos
+        transform["rot"] = old_rot
+        rejected_run += 1
+        if rejected_run >= 4 * len(objective.floor):
+            step *= 0.5
+            rejected_run = 0
+
+    return {
+        "iterations": iterations,
+        "accepted_moves": accepted,
+        "objective_before": round(start_score, 3),
+        "objective_after": round(score, 3),
+        "stopped": stopped,
+    }
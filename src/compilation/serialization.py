@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from typing import Any, Dict
+
+
+"""Encode-once JSON for build artifacts: each large subtree is serialized a single time and its bytes reused."""
+
+
+ARTIFACT_JSON_ENV = "WORLD_ARTIFACT_JSON"  # "pretty" restores indented artifacts for debugging; anything else is compact
+ARTIFACT_JSON_MODES = ("compact", "pretty")
+
+
+def artifact_json_mode() -> str:  # production default is compact; read per call so tests and operators can flip it at runtime
+    mode = os.getenv(ARTIFACT_JSON_ENV, "compact").strip().lower()
+    return mode if mode in ARTIFACT_JSON_MODES else "compact"
+
+
+def canonical_json(data: Any) -> str:  # the hashing form: sorted keys, no whitespace, ASCII only
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
+
+
+def encode_artifact(  # artifact bytes for payload, splicing pre-encoded top-level values in place of re-encoding them
+    payload: Dict[str, Any],
+    mode: str | None = None,
+    embedded: Dict[str, bytes] | None = None,
+) -> bytes:
+    pretty = (mode or artifact_json_mode()) == "pretty"
+    if not embedded:
+        if pretty:
+            return json.dumps(payload, indent=2, sort_keys=True).encode("utf-8")
+        return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+    # Each embedded key is encoded as a unique string marker, then the quoted
+    # marker is swapped for the stored bytes. Markers cannot collide with real
+    # values because every call uses a fresh uuid.
+    token = uuid.uuid4().hex
+    markers = {key: f"@raw:{token}:{index}" for index, key in enumerate(embedded)}
+    staged = {**payload, **markers}
+    if pretty:
+        text = json.dumps(staged, indent=2, sort_keys=True)
+    else:
+        text = json.dumps(staged, sort_keys=True, separators=(",", ":"))
+    out = text.encode("utf-8")
+    for key, marker in markers.items():
+        raw = embedded[key]
+        if pretty:
+            raw = raw.replace(b"\n", b"\n  ")  # embedded values sit one level deep; JSON strings never hold a bare newline
+        out = out.replace(f'"{marker}"'.encode("utf-8"), raw, 1)
+    return out
@@ -124,6 +124,10 @@ def _base_manifest_payload(payload: Dict[str, Any], *, manifest_version: str) ->
         'readiness': payload.get('readiness') or {},
         'phase0_url': payload.get('phase0_url'),
         'phase0_data': payload.get('phase0_data'),
+        'manifest_mode': payload.get('manifest_mode') or 'inline',
+        'phase0_sha256': payload.get('phase0_sha256'),
+        'phase0_size_bytes': payload.get('phase0_size_bytes'),
+        'phase0_binary': payload.get('phase0_binary') if isinstance(payload.get('phase0_binary'), dict) else None,
         'phase_order': payload.get('phase_order') or ['phase0'],
         'phases': payload.get('phases') or {},
         'planner_backend': payload.get('planner_backend'),
@@ -1,4 +1,4 @@
-from src.llm import gemini, openrouter, transport
+from src.llm import gemini, openrouter, response_cache, transport
 from src.llm.planner import (  # re-export the three LLM stage functions as the public API
     request_llm_design_brief,
     request_llm_intent,
@@ -9,6 +9,7 @@ from src.llm.planner import (  # re-export the three LLM stage functions as the
 __all__ = [
     "gemini",
     "openrouter",
+    "response_cache",
     "transport",
     "request_llm_design_brief",
     "request_llm_intent",
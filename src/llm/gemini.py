@@ -59,16 +59,11 @@ def _extract_text_content(response_payload: Dict[str, Any]) -> Dict[str, Any]:
     return {"ok": True, "text": text}
 
 
-def request_json(
-    *,
+def _http_request(
     settings: Dict[str, Any],
     system_prompt: str,
     user_payload: Dict[str, Any],
-    circuit_key: str,
-) -> Dict[str, Any]:
-    if transport.is_circuit_open(circuit_key):
-        return transport.llm_error("llm_circuit_open", f"{PROVIDER_NAME} planner is temporarily disabled after repeated failures.")
-
+) -> Dict[str, Any]:  # keyword arguments for transport.post_json_with_retries
     payload = {
         "system_instruction": {"parts": [{"text": system_prompt}]},
         "contents": [{"role": "user", "parts": [{"text": json.dumps(user_payload, ensure_ascii=True)}]}],
@@ -88,16 +83,19 @@ def request_json(
         "https://generativelanguage.googleapis.com/v1beta/models/"
         f"{settings['model']}:generateContent?key={settings['api_key']}"
     )
-    http_result = transport.post_json_with_retries(
-        url=url,
-        headers={"Content-Type": "application/json"},
-        payload=payload,
-        timeout_s=settings["timeout_s"],
-        retry_count=settings["retry_count"],
-        retry_backoff_s=settings["retry_backoff_s"],
-        transport_error_code=GEMINI_TRANSPORT_ERROR,
-        provider_name=PROVIDER_NAME,
-    )
+    return {
+        "url": url,
+        "headers": {"Content-Type": "application/json"},
+        "payload": payload,
+        "timeout_s": settings["timeout_s"],
+        "retry_count": settings["retry_count"],
+        "retry_backoff_s": settings["retry_backoff_s"],
+        "transport_error_code": GEMINI_TRANSPORT_ERROR,
+        "provider_name": PROVIDER_NAME,
+    }
+
+
+def _response_result(http_result: Dict[str, Any], settings: Dict[str, Any], circuit_key: str) -> Dict[str, Any]:
     if not http_result.get("ok"):
         transport.record_circuit_failure(
             circuit_key,
@@ -129,6 +127,23 @@ def request_json(
     return {"ok": True, "payload": parsed_content}
 
 
+def _circuit_open_error() -> Dict[str, Any]:
+    return transport.llm_error("llm_circuit_open", f"{PROVIDER_NAME} planner is temporarily disabled after repeated failures.")
+
+
+def request_json(
+    *,
+    settings: Dict[str, Any],
+    system_prompt: str,
+    user_payload: Dict[str, Any],
+    circuit_key: str,
+) -> Dict[str, Any]:
+    if transport.is_circuit_open(circuit_key):
+        return _circuit_open_error()
+    http_result = transport.post_json_with_retries(**_http_request(settings, system_prompt, user_payload))
+    return _response_result(http_result, settings, circuit_key)
+
+
 def candidate_asset_payload(candidate_assets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     payload: List[Dict[str, Any]] = []
     for asset in candidate_assets:
@@ -83,16 +83,11 @@ def _extract_text_output(response_payload: Dict[str, Any]) -> Dict[str, Any]:
     return {"ok": True, "text": "".join(text_parts)}
 
 
-def request_json(
-    *,
+def _http_request(
     settings: Dict[str, Any],
     system_prompt: str,
     user_payload: Dict[str, Any],
-    circuit_key: str,
-) -> Dict[str, Any]:
-    if transport.is_circuit_open(circuit_key):
-        return transport.llm_error("llm_circuit_open", f"{PROVIDER_NAME} planner is temporarily disabled after repeated failures.")
-
+) -> Dict[str, Any]:  # keyword arguments for transport.post_json_with_retries
     payload = {
         "model": settings["model"],
         "input": [
@@ -113,19 +108,22 @@ def request_json(
     max_output_tokens = int(settings.get("max_output_tokens") or 0)
     if max_output_tokens > 0:
         payload["max_output_tokens"] = max_output_tokens
-    http_result = transport.post_json_with_retries(
-        url="https://openrouter.ai/api/v1/responses",
-        headers={
+    return {
+        "url": "https://openrouter.ai/api/v1/responses",
+        "headers": {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {settings['api_key']}",
         },
-        payload=payload,
-        timeout_s=settings["timeout_s"],
-        retry_count=settings["retry_count"],
-        retry_backoff_s=settings["retry_backoff_s"],
-        transport_error_code=OPENROUTER_TRANSPORT_ERROR,
-        provider_name=PROVIDER_NAME,
-    )
+        "payload": payload,
+        "timeout_s": settings["timeout_s"],
+        "retry_count": settings["retry_count"],
+        "retry_backoff_s": settings["retry_backoff_s"],
+        "transport_error_code": OPENROUTER_TRANSPORT_ERROR,
+        "provider_name": PROVIDER_NAME,
+    }
+
+
+def _response_result(http_result: Dict[str, Any], settings: Dict[str, Any], circuit_key: str) -> Dict[str, Any]:
     if not http_result.get("ok"):
         transport.record_circuit_failure(
             circuit_key,
@@ -157,6 +155,23 @@ def request_json(
     return {"ok": True, "payload": parsed_content}
 
 
+def _circuit_open_error() -> Dict[str, Any]:
+    return transport.llm_error("llm_circuit_open", f"{PROVIDER_NAME} planner is temporarily disabled after repeated failures.")
+
+
+def request_json(
+    *,
+    settings: Dict[str, Any],
+    system_prompt: str,
+    user_payload: Dict[str, Any],
+    circuit_key: str,
+) -> Dict[str, Any]:
+    if transport.is_circuit_open(circuit_key):
+        return _circuit_open_error()
+    http_result = transport.post_json_with_retries(**_http_request(settings, system_prompt, user_payload))
+    return _response_result(http_result, settings, circuit_key)
+
+
 def candidate_asset_payload(candidate_assets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     payload: List[Dict[str, Any]] = []
     for asset in candidate_assets:
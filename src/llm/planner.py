@@ -4,12 +4,10 @@ import json
 import time
 from functools import lru_cache
 from pathlib import Path
-from types import SimpleNamespace
-from urllib import error as urllib_error
-from urllib import request as urllib_request
 from typing import Any, Dict, List
 
 from src.llm import transport
+from src.llm.response_cache import request_json_cached
 from src.llm.planner_support import (
     compact_candidate_asset_payload,
     compact_pack_payload,
@@ -27,7 +25,6 @@ from src.planning.archetype_policy import SUPPORTED_ARCHETYPES
 
 
 _CIRCUIT_STATE = transport._CIRCUIT_STATE
-urllib = SimpleNamespace(request=urllib_request, error=urllib_error)
 
 PROMPT_POLICY_PATH = Path(__file__).resolve().parent / "taxonomy" / "planner_prompt_policy_v1.json"
 
@@ -133,7 +130,8 @@ def request_llm_design_brief(
         f"{design_brief_examples}"
         "Use short structured language, not prose paragraphs."
     )
-    result = adapter.request_json(
+    result = request_json_cached(
+        adapter,
         settings=settings,
         system_prompt=system_prompt,
         user_payload=user_payload,
@@ -145,7 +143,7 @@ def request_llm_design_brief(
     design_brief = payload.get("design_brief") if isinstance(payload.get("design_brief"), dict) else payload
     if not isinstance(design_brief, dict):
         return timed_result(start_time, invalid_content_error(adapter, "content does not include a valid design brief object."))
-    return timed_result(start_time, {"ok": True, "backend": settings["provider"], "design_brief": design_brief})
+    return timed_result(start_time, {"ok": True, "backend": settings["provider"], "design_brief": design_brief, "cache_status": result.get("cache_status", "off")})
 
 
 
@@ -217,7 +215,8 @@ def request_llm_intent(  # stage 1: asks the LLM to interpret the prompt into a
         "Mini-example: for 'reading nook with chair, side table, lamp', output a reading_corner-style composition with chair as focal_object_role, a side support table, a nearby lamp, cozy density, clear entry, and negatives against unrelated office clutter. Use typed relations such as chair->table near/proximity, lamp->chair near/proximity, and chair->room edge/room_position when appropriate. "
         "Do not include coordinates, offsets, radii, wall insets, or distances."
     )
-    result = adapter.request_json(
+    result = request_json_cached(
+        adapter,
         settings=settings,
         system_prompt=system_prompt,
         user_payload=user_payload,
@@ -229,7 +228,7 @@ def request_llm_intent(  # stage 1: asks the LLM to interpret the prompt into a
     intent_payload = payload.get("intent_payload") if isinstance(payload.get("intent_payload"), dict) else payload
     if not isinstance(intent_payload, dict):
         return timed_result(start_time, invalid_content_error(adapter, "content does not include a valid semantic intent object."))
-    return timed_result(start_time, {"ok": True, "backend": settings["provider"], "intent_payload": intent_payload})
+    return timed_result(start_time, {"ok": True, "backend": settings["provider"], "intent_payload": intent_payload, "cache_status": result.get("cache_status", "off")})
 
 
 
@@ -307,7 +306,8 @@ def request_llm_selection(  # stage 2: asks the LLM to select assets, stylekit,
         "ORIENTATION GUIDANCE: Chairs must face the table. If a chair is part of a dining_set or lounge_cluster, its yaw must be calculated relative to the anchor (table). In your slot_asset_map, do not override this semantic intent with random rotations. "
         "TEXTILE GUIDANCE: Pillows, cushions, and towels must ONLY be placed as surface-anchored optional additions (anchor='surface'). Never place pillows or towels directly on the floor. Only carpets and rugs belong on the floor. "
     )
-    result = adapter.request_json(
+    result = request_json_cached(
+        adapter,
         settings=settings,
         system_prompt=system_prompt,
         user_payload=user_payload,
@@ -319,7 +319,7 @@ def request_llm_selection(  # stage 2: asks the LLM to select assets, stylekit,
     selection = payload.get("selection") if isinstance(payload.get("selection"), dict) else payload
     if not isinstance(selection, dict):
         return timed_result(start_time, invalid_content_error(adapter, "content does not include a valid semantic selection object."))
-    return timed_result(start_time, {"ok": True, "backend": settings["provider"], "selection": selection})
+    return timed_result(start_time, {"ok": True, "backend": settings["provider"], "selection": selection, "cache_status": result.get("cache_status", "off")})
 
 
 def request_llm_plan(
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import time
+import uuid
+from typing import Any, Dict, Tuple
+
+
+"""Content-addressed disk cache for LLM stage responses."""
+
+
+CACHE_MODES = {"off", "use", "refresh"}  # off: no reads or writes; use: read then write on miss; refresh: skip read, overwrite
+DEFAULT_CACHE_DIR = ".cache/llm"  # outside build/, which is served over HTTP and would expose cached prompts and responses
+CACHE_FORMAT_VERSION = 1  # bump when the entry layout or key recipe changes so stale entries stop matching
+_KEY_SETTINGS = ("reasoning_effort", "max_output_tokens", "thinking_budget", "thinking_level")  # settings that change model output
+EVICT_LOW_WATER = 0.9  # eviction trims to this fraction of max_bytes so the next few writes do not rescan
+
+_SIZE_LOCK = threading.Lock()
+_TRACKED_BYTES: Dict[str, int] = {}  # cache dir -> bytes at the last scan plus bytes written since
+
+
+def _canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
+
+
+def cache_key(
+    *,
+    settings: Dict[str, Any],
+    system_prompt: str,
+    user_payload: Dict[str, Any],
+) -> str:  # sha256 over provider, model, prompt hash, canonical payload, and output-shaping settings
+    material = {
+        "version": CACHE_FORMAT_VERSION,
+        "provider": settings.get("provider"),
+        "model": settings.get("model"),
+        "system_prompt_sha256": hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+        "user_payload": user_payload,
+        "settings": {name: settings.get(name) for name in _KEY_SETTINGS},
+    }
+    return hashlib.sha256(_canonical_json(material).encode("utf-8")).hexdigest()
+
+
+def _entry_path(cache_dir: pathlib.Path, key: str) -> pathlib.Path:  # two-level fan-out keeps directories small
+    return cache_dir / key[:2] / f"{key}.json"
+
+
+def read_entry(cache_dir: pathlib.Path, key: str, ttl_s: float) -> Dict[str, Any] | None:
+    path = _entry_path(cache_dir, key)
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or not isinstance(entry.get("payload"), dict):
+        return None
+    if time.time() - float(entry.get("created_at") or 0.0) > ttl_s:
+        path.unlink(missing_ok=True)
+        return None
+    try:
+        os.utime(path)  # mtime doubles as the LRU clock
+    except OSError:
+        pass
+    return entry["payload"]
+
+
+def write_entry(cache_dir: pathlib.Path, key: str, payload: Dict[str, Any], max_bytes: int) -> None:
+    path = _entry_path(cache_dir, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    encoded = _canonical_json({"created_at": time.time(), "payload": payload}).encode("utf-8")
+    tmp_path.write_bytes(encoded)
+    os.replace(tmp_path, path)  # readers never see a half-written entry
+    tracked_key = str(cache_dir)
+    with _SIZE_LOCK:
+        tracked = _TRACKED_BYTES.get(tracked_key)
+        if tracked is None:  # first write this process: one scan seeds the counter
+            _, tracked = _evict(cache_dir, None)
+        else:
+            tracked += len(encoded)  # overwrites count twice; that only makes the next rescan come early
+        if tracked > max_bytes:  # the directory is only walked when the counter crosses the cap
+            _, tracked = _evict(cache_dir, int(max_bytes * EVICT_LOW_WATER))
+        _TRACKED_BYTES[tracked_key] = tracked
+
+
+def _evict(cache_dir: pathlib.Path, max_bytes: int | None) -> Tuple[int, int]:  # (entries removed, bytes left); None only measures
+    entries = []
+    total = 0
+    for path in cache_dir.glob("*/*.json"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+    if max_bytes is None or total <= max_bytes:
+        return 0, total
+    removed = 0
+    for _, size, path in sorted(entries, key=lambda item: (item[0], str(item[2]))):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed, total
+
+
+def evict_to_size(cache_dir: pathlib.Path, max_bytes: int) -> int:  # drops least-recently-used entries until the cache fits; returns count removed
+    removed, total = _evict(cache_dir, max_bytes)
+    with _SIZE_LOCK:
+        _TRACKED_BYTES[str(cache_dir)] = total
+    return removed
+
+
+def request_json_cached(
+    adapter: Any,
+    *,
+    settings: Dict[str, Any],
+    system_prompt: str,
+    user_payload: Dict[str, Any],
+    circuit_key: str,
+) -> Dict[str, Any]:  # adapter.request_json behind the cache; only successful responses are stored
+    mode = settings.get("cache_mode", "off")
+    if mode not in CACHE_MODES or mode == "off":
+        return adapter.request_json(
+            settings=settings,
+            system_prompt=system_prompt,
+            user_payload=user_payload,
+            circuit_key=circuit_key,
+        )
+
+    cache_dir = pathlib.Path(settings["cache_dir"])
+    key = cache_key(settings=settings, system_prompt=system_prompt, user_payload=user_payload)
+    if mode == "use":
+        cached_payload = read_entry(cache_dir, key, settings["cache_ttl_s"])
+        if cached_payload is not None:
+            return {"ok": True, "payload": cached_payload, "cache_status": "hit"}
+
+    result = adapter.request_json(
+        settings=settings,
+        system_prompt=system_prompt,
+        user_payload=user_payload,
+        circuit_key=circuit_key,
+    )
+    if result.get("ok") and isinstance(result.get("payload"), dict):
+        try:
+            write_entry(cache_dir, key, result["payload"], settings["cache_max_bytes"])
+        except OSError:
+            pass  # a read-only or full disk must not fail the planner
+        result = {**result, "cache_status": "refresh" if mode == "refresh" else "miss"}
+    return result
@@ -2,13 +2,19 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 import time
-import urllib.error
-import urllib.request
 from typing import Any, Dict
 
+import httpx
+
+from src.llm.response_cache import CACHE_MODES, DEFAULT_CACHE_DIR
+
 
 _CIRCUIT_STATE: Dict[str, Dict[str, float]] = {}  # per-provider circuit breaker state tracking failures and cooldowns
+_POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=16, keepalive_expiry=60.0)
+_POOL_LOCK = threading.Lock()
+_SYNC_CLIENT: httpx.Client | None = None
 
 
 # Keep behavior deterministic so planner/runtime contracts stay stable.
@@ -86,6 +92,42 @@ def retry_sleep(backoff_s: float, attempt_index: int) -> None:  # exponential ba
     time.sleep(backoff_s * (2**attempt_index))
 
 
+def http_client() -> httpx.Client:  # process-wide keep-alive pool so repeated stage calls reuse one TLS connection per host
+    global _SYNC_CLIENT
+    with _POOL_LOCK:
+        if _SYNC_CLIENT is None:
+            _SYNC_CLIENT = httpx.Client(limits=_POOL_LIMITS)
+        return _SYNC_CLIENT
+
+
+def close_http_clients() -> None:  # closes pooled connections, e.g. on server shutdown or after forking workers
+    global _SYNC_CLIENT
+    with _POOL_LOCK:
+        if _SYNC_CLIENT is not None:
+            _SYNC_CLIENT.close()
+            _SYNC_CLIENT = None
+
+
+def _attempt_outcome(  # maps one HTTP attempt to (result envelope, retryable)
+    response: httpx.Response | None,
+    exc: Exception | None,
+    *,
+    transport_error_code: str,
+    provider_name: str,
+) -> tuple[Dict[str, Any], bool]:
+    if response is not None:
+        code = response.status_code
+        if code < 400:
+            return {"ok": True, "body": response.text}, False
+        retryable = code in {408, 409, 429} or 500 <= code <= 599  # HTTP codes that warrant automatic retry
+        return llm_error("llm_http_error", f"{provider_name} returned HTTP {code}."), retryable
+    if isinstance(exc, httpx.TimeoutException):
+        return llm_error(transport_error_code, f"{provider_name} request timed out."), True
+    if isinstance(exc, httpx.TransportError):
+        return llm_error(transport_error_code, f"{provider_name} transport error: {exc}"), True
+    return llm_error(transport_error_code, f"{provider_name} request failed unexpectedly."), True
+
+
 def post_json_with_retries(  # HTTP POST with exponential backoff, circuit breaker integration, and error normalization
     *,
     url: str,
@@ -98,34 +140,22 @@ def post_json_with_retries(  # HTTP POST with exponential backoff, circuit break
     provider_name: str,
 ) -> Dict[str, Any]:
     body = json.dumps(payload).encode("utf-8")
+    client = http_client()
     for attempt in range(retry_count + 1):
-        request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+        response, failure = None, None
         try:
-            with urllib.request.urlopen(request, timeout=timeout_s) as resp:
-                raw = resp.read().decode("utf-8")
-            return {"ok": True, "body": raw}
-        except urllib.error.HTTPError as exc:
-            code = int(getattr(exc, "code", 500))
-            retryable = code in {408, 409, 429} or 500 <= code <= 599  # HTTP codes that warrant automatic retry
-            if retryable and attempt < retry_count:
-                retry_sleep(retry_backoff_s, attempt)
-                continue
-            return llm_error("llm_http_error", f"{provider_name} returned HTTP {code}.")
-        except urllib.error.URLError as exc:
-            if attempt < retry_count:
-                retry_sleep(retry_backoff_s, attempt)
-                continue
-            return llm_error(transport_error_code, f"{provider_name} transport error: {exc.reason}")
-        except TimeoutError:
-            if attempt < retry_count:
-                retry_sleep(retry_backoff_s, attempt)
-                continue
-            return llm_error(transport_error_code, f"{provider_name} request timed out.")
-        except Exception:
-            if attempt < retry_count:
-                retry_sleep(retry_backoff_s, attempt)
-                continue
-            return llm_error(transport_error_code, f"{provider_name} request failed unexpectedly.")
+            response = client.post(url, content=body, headers=headers, timeout=timeout_s)
+        except Exception as exc:
+            failure = exc
+        result, retryable = _attempt_outcome(
+            response,
+            failure,
+            transport_error_code=transport_error_code,
+            provider_name=provider_name,
+        )
+        if result.get("ok") or not retryable or attempt >= retry_count:
+            return result
+        retry_sleep(retry_backoff_s, attempt)
     return llm_error(transport_error_code, f"{provider_name} request exhausted retries.")
 
 
@@ -177,4 +207,31 @@ def resolve_runtime_settings(user_prefs: Dict[str, Any]) -> Dict[str, Any]:  # r
         "thinking_level": str(
             user_prefs.get("llm_thinking_level", os.getenv("PLANNER_LLM_THINKING_LEVEL", ""))
         ).strip().lower(),
+        **resolve_cache_settings(user_prefs),
+    }
+
+
+def resolve_cache_settings(user_prefs: Dict[str, Any]) -> Dict[str, Any]:  # response cache mode, location, TTL, and size cap
+    mode = str(user_prefs.get("llm_cache", os.getenv("PLANNER_LLM_CACHE", "off"))).strip().lower()
+    if mode in {"bypass", "false", "0", "no"}:
+        mode = "off"
+    elif mode in {"true", "1", "yes", "on"}:
+        mode = "use"
+    return {
+        "cache_mode": mode if mode in CACHE_MODES else "off",
+        "cache_dir": str(os.getenv("PLANNER_LLM_CACHE_DIR", DEFAULT_CACHE_DIR)),
+        "cache_ttl_s": as_positive_float(
+            user_prefs.get("llm_cache_ttl_s", os.getenv("PLANNER_LLM_CACHE_TTL_S", 86400)),
+            86400.0,
+            min_value=1.0,
+            max_value=30 * 86400.0,
+        ),
+        "cache_max_bytes": as_bounded_int(
+            os.getenv("PLANNER_LLM_CACHE_MAX_MB", 256),
+            default=256,
+            min_value=1,
+            max_value=65536,
+        )
+        * 1024
+        * 1024,
     }
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import math
+from functools import lru_cache
 from typing import Any, Dict, List, Sequence, Tuple
 
 from src.placement.constants import (
@@ -19,10 +20,12 @@ from src.placement.constants import (
 )
 from src.placement.role_defaults import ROLE_FALLBACK_GEOMETRY, ROLE_PRIORITY
 from src.placement.semantic_taxonomy import (
+    TOKEN_MEMO_SIZE,
     canonicalize_concept,
     canonicalize_role_token,
+    compiled_semantic_taxonomy,
     ground_concept,
-    supported_runtime_roles,
+    register_taxonomy_memo,
 )
 
 
@@ -54,7 +57,13 @@ def map_semantic_concept_to_runtime_role(concept: Any, asset: Dict[str, Any] | N
 
 
 def canonicalize_semantic_role(value: Any) -> str:  # normalizes free-text role names into the runtime ontology of known roles
-    token = _safe_text(value).replace("-", "_").replace(" ", "_").replace("/", "_")
+    return _canonical_semantic_role(_safe_text(value))
+
+
+@register_taxonomy_memo
+@lru_cache(maxsize=TOKEN_MEMO_SIZE)
+def _canonical_semantic_role(text: str) -> str:  # memoized on the lowercased text; asset catalogs repeat the same labels and tags
+    token = text.replace("-", "_").replace(" ", "_").replace("/", "_")
     if not token:
         return ""
     resolved = _resolve_known_role(token)
@@ -75,7 +84,7 @@ def canonicalize_semantic_role(value: Any) -> str:  # normalizes free-text role
 
 def semantic_role_key(record: Dict[str, Any]) -> str:  # tries grounded/runtime fields first, then falls back to metadata-driven role inference
     explicit_role = canonicalize_semantic_role(record.get("runtime_role") or record.get("selected_role") or record.get("role"))
-    supported_roles = supported_runtime_roles()
+    supported_roles = compiled_semantic_taxonomy().supported_roles
     if explicit_role in supported_roles or explicit_role in ROLE_PRIORITY:
         return explicit_role
 
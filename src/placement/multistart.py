@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Sequence, Tuple
+
+from src.compilation.phase0_placement import _constraint_relation, _face_alignment_score, _resolve_face_to_target
+from src.placement.occupancy import NON_FLOOR_CONSTRAINTS, FloorOccupancy
+from src.placement.scene_solver import _walkway_penalty, solve_scene_layout
+
+
+"""Best-of-N layout search over independently seeded solver starts."""
+
+
+FACE_TO_FAILURE_THRESHOLD = 0.75  # same cut the phase0 placement audit uses for relation failures
+OVERLAP_WEIGHT = 10.0
+GROUP_FAILURE_WEIGHT = 3.0
+FACE_TO_FAILURE_WEIGHT = 2.0
+MAX_LAYOUT_STARTS = 8  # client-requested starts are clamped here; each one is a full solver pass
+LAYOUT_WORKERS_ENV = "JUNIORIS_LAYOUT_WORKERS"  # size of the shared start pool; 1 solves every start in-process
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def layout_start_seeds(base_seed: int, starts: int) -> List[int | None]:  # start 0 is always the unseeded greedy pass, so best-of-N never scores below it
+    return [None] + [int(base_seed) + index for index in range(1, min(max(int(starts), 1), MAX_LAYOUT_STARTS))]
+
+
+def _pool_size() -> int:
+    try:
+        configured = int(os.getenv(LAYOUT_WORKERS_ENV, ""))
+    except ValueError:
+        configured = 0
+    return max(1, configured if configured > 0 else min(os.cpu_count() or 1, MAX_LAYOUT_STARTS))
+
+
+def _start_pool() -> ProcessPoolExecutor:  # one bounded pool per process, created lazily so importing the planner never starts workers
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # The API server is threaded, and forking a threaded process can
+            # deadlock on locks held by other threads; forkserver and spawn
+            # children start from a clean interpreter instead.
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _POOL = ProcessPoolExecutor(max_workers=_pool_size(), mp_context=multiprocessing.get_context(method))
+        return _POOL
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:  # drops a broken pool so the next request starts a fresh one
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_start_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown_start_pool)
+
+
+def _floor_footprint(placement: Dict[str, Any]) -> Tuple[List[float], float] | None:
+    constraint = placement.get("constraint") if isinstance(placement.get("constraint"), dict) else {}
+    if str(constraint.get("type") or "").strip().lower() in NON_FLOOR_CONSTRAINTS:
+        return None
+    radius = float(((placement.get("geometry_profile") or {}).get("footprint_radius")) or 0.0)
+    if radius <= 0.0:
+        return None
+    return (placement.get("transform") or {}).get("pos") or [0.0, 0.0, 0.0], radius
+
+
+def audit_layout(
+    placements: List[Dict[str, Any]],
+    *,
+    scene_program: Dict[str, Any],
+    room_dimensions: Dict[str, float],
+) -> Dict[str, Any]:  # the placement audit metrics for a solved layout, folded into one lower-is-better objective
+    occupancy = FloorOccupancy()
+    overlap_count = 0
+    walkway_penalty = 0.0
+    grouped: Dict[str, List[Tuple[List[float], float]]] = {}
+    for placement in placements:
+        footprint = _floor_footprint(placement)
+        if footprint is None:
+            continue
+        pos, radius = footprint
+        for entry in occupancy.nearby(pos, radius + occupancy.max_radius):
+            if entry.radius > 0.0 and math.dist((pos[0], pos[2]), (entry.x, entry.z)) < radius + entry.radius:
+                overlap_count += 1
+        occupancy.add(placement)
+        walkway_penalty += _walkway_penalty(pos, str(placement.get("role") or ""), scene_program, room_dimensions)
+        group_id = str(placement.get("group_id") or "").strip()
+        if group_id:
+            grouped.setdefault(group_id, []).append((pos, radius))
+
+    group_failure_count = 0
+    for members in grouped.values():
+        for left_index, (left_pos, left_radius) in enumerate(members):
+            for right_pos, right_radius in members[left_index + 1 :]:
+                if math.dist((left_pos[0], left_pos[2]), (right_pos[0], right_pos[2])) < left_radius + right_radius + 0.05:
+                    group_failure_count += 1
+
+    face_to_failure_count = 0
+    face_to_misalignment = 0.0
+    for placement in placements:
+        if _constraint_relation(placement) != "face_to":
+            continue
+        target = _resolve_face_to_target(placement, placements)
+        score = _face_alignment_score(placement, target) if target is not None else None
+        if score is None:
+            continue
+        face_to_misalignment += (1.0 - score) / 2.0
+        if score < FACE_TO_FAILURE_THRESHOLD:
+            face_to_failure_count += 1
+
+    objective = (
+        (OVERLAP_WEIGHT * overlap_count)
+        + (GROUP_FAILURE_WEIGHT * group_failure_count)
+        + (FACE_TO_FAILURE_WEIGHT * face_to_failure_count)
+        + face_to_misalignment
+        + walkway_penalty
+    )
+    return {
+        "placed_count": len(placements),
+        "overlap_count": overlap_count,
+        "group_layout_failure_count": group_failure_count,
+        "face_to_failure_count": face_to_failure_count,
+        "walkway_penalty": round(walkway_penalty, 3),
+        "objective": round(objective, 6),
+    }
+
+
+def _solve_start(job: Tuple[List[Dict[str, Any]], Dict[str, Any], Dict[str, Any], Dict[str, float], int | None]) -> Tuple[List[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]:
+    selected_assets, scene_program, placement_intent, room_dimensions, seed = job
+    placements, layout_program = solve_scene_layout(
+        selected_assets,
+        scene_program=scene_program,
+        placement_intent=placement_intent,
+        room_dimensions=room_dimensions,
+        seed=seed,
+    )
+    return placements, layout_program, audit_layout(placements, scene_program=scene_program, room_dimensions=room_dimensions)
+
+
+def solve_scene_layout_multistart(
+    selected_assets: List[Dict[str, Any]],
+    *,
+    scene_program: Dict[str, Any],
+    placement_intent: Dict[str, Any],
+    room_dimensions: Dict[str, float],
+    seeds: Sequence[int | None],
+    max_workers: int | None = None,
+) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:  # runs one solver start per seed (in the shared process pool when allowed) and keeps the best audited layout
+    jobs = [(selected_assets, scene_program, placement_intent, room_dimensions, seed) for seed in seeds]
+    workers = min(len(jobs), max_workers if max_workers is not None else _pool_size())
+    results = None
+    if workers > 1:
+        pool = _start_pool()
+        try:
+            results = list(pool.map(_solve_start, jobs))
+        except BrokenProcessPool:  # a worker died; solve in-process rather than fail the request
+            _discard_pool(pool)
+    if results is None:
+        results = [_solve_start(job) for job in jobs]
+
+    # More placed objects first, then the lowest objective; ties keep the
+    # earliest start so the choice depends only on the seed list.
+    best_index = min(
+        range(len(results)),
+        key=lambda index: (-results[index][2]["placed_count"], results[index][2]["objective"], index),
+    )
+    placements, layout_program, _ = results[best_index]
+    layout_program = dict(layout_program)
+    layout_program["multi_start"] = {
+        "start_count": len(results),
+        "best_start": best_index,
+        "best_seed": seeds[best_index],
+        "audits": [audit for _, _, audit in results],
+    }
+    return placements, layout_program
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+
+"""Uniform-grid spatial hash over committed floor footprints."""
+
+
+DEFAULT_CELL_SIZE = 1.0  # meters; close to a typical furniture footprint diameter
+NON_FLOOR_CONSTRAINTS = {"wall", "surface", "ceiling"}  # mounted/stacked placements never block the floor
+
+
+class FootprintEntry:
+    __slots__ = ("x", "z", "radius", "group_id", "placement")
+
+    def __init__(self, x: float, z: float, radius: float, group_id: str, placement: Dict[str, Any]) -> None:
+        self.x = x
+        self.z = z
+        self.radius = radius
+        self.group_id = group_id
+        self.placement = placement
+
+
+class FloorOccupancy:
+    """Floor footprints bucketed by grid cell for neighbourhood queries.
+
+    Tracks every committed placement so callers can keep using "is anything
+    placed yet" semantics, but only floor-bound footprints are hashed. A child
+    created with layered() sees its parent's entries plus its own, which lets
+    tentative group bundles be scored without copying the committed grid.
+    """
+
+    def __init__(
+        self,
+        placements: Sequence[Dict[str, Any]] = (),
+        *,
+        cell_size: float = DEFAULT_CELL_SIZE,
+        parent: "FloorOccupancy | None" = None,
+    ) -> None:
+        self.cell_size = parent.cell_size if parent is not None else cell_size
+        self._parent = parent
+        self._cells: Dict[Tuple[int, int], List[FootprintEntry]] = {}
+        self._count = 0
+        self._max_radius = 0.0
+        for placement in placements:
+            self.add(placement)
+
+    def __len__(self) -> int:
+        return self._count + (len(self._parent) if self._parent is not None else 0)
+
+    @property
+    def max_radius(self) -> float:
+        parent_radius = self._parent.max_radius if self._parent is not None else 0.0
+        return max(self._max_radius, parent_radius)
+
+    def layered(self) -> "FloorOccupancy":
+        return FloorOccupancy(parent=self)
+
+    def _cell(self, x: float, z: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(z / self.cell_size)
+
+    def add(self, placement: Dict[str, Any]) -> None:
+        self._count += 1
+        constraint = placement.get("constraint") if isinstance(placement.get("constraint"), dict) else {}
+        if str(constraint.get("type") or "").strip().lower() in NON_FLOOR_CONSTRAINTS:
+            return
+        pos = ((placement.get("transform") or {}).get("pos")) or [0.0, 0.0, 0.0]
+        radius = float(((placement.get("geometry_profile") or {}).get("footprint_radius")) or 0.0)
+        entry = FootprintEntry(
+            float(pos[0]),
+            float(pos[2]),
+            radius,
+            str(placement.get("group_id") or "").strip().lower(),
+            placement,
+        )
+        self._cells.setdefault(self._cell(entry.x, entry.z), []).append(entry)
+        self._max_radius = max(self._max_radius, radius)
+
+    def nearby(self, position: Sequence[float], reach: float) -> Iterator[FootprintEntry]:
+        # Every floor entry whose center lies within `reach` of position on
+        # each axis (a superset of the disc of that radius).
+        x = float(position[0])
+        z = float(position[2])
+        if self._cells:
+            min_x, min_z = self._cell(x - reach, z - reach)
+            max_x, max_z = self._cell(x + reach, z + reach)
+            if (max_x - min_x + 1) * (max_z - min_z + 1) > len(self._cells):  # query box larger than the occupied grid
+                for entries in self._cells.values():
+                    yield from entries
+            else:
+                for cell_x in range(min_x, max_x + 1):
+                    for cell_z in range(min_z, max_z + 1):
+                        yield from self._cells.get((cell_x, cell_z), ())
+        if self._parent is not None:
+            yield from self._parent.nearby(position, reach)
+
+
+class PointGrid:
+    """Mutable uniform grid of keyed points, for structures whose items move."""
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE) -> None:
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], set[int]] = {}
+        self._cell_of: Dict[int, Tuple[int, int]] = {}
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._cell_of
+
+    def _cell(self, x: float, z: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(z / self.cell_size)
+
+    def insert(self, key: int, x: float, z: float) -> None:
+        self.remove(key)
+        cell = self._cell(x, z)
+        self._cells.setdefault(cell, set()).add(key)
+        self._cell_of[key] = cell
+
+    def remove(self, key: int) -> None:
+        cell = self._cell_of.pop(key, None)
+        if cell is None:
+            return
+        members = self._cells[cell]
+        members.discard(key)
+        if not members:
+            del self._cells[cell]
+
+    def near(self, x: float, z: float, reach: float) -> List[int]:  # keys in every cell overlapping the square of half-size reach
+        min_x, min_z = self._cell(x - reach, z - reach)
+        max_x, max_z = self._cell(x + reach, z + reach)
+        if (max_x - min_x + 1) * (max_z - min_z + 1) > len(self._cells):
+            return [key for members in self._cells.values() for key in members]
+        found: List[int] = []
+        for cell_x in range(min_x, max_x + 1):
+            for cell_z in range(min_z, max_z + 1):
+                found.extend(self._cells.get((cell_x, cell_z), ()))
+        return found
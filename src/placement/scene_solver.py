@@ -3,7 +3,11 @@ from __future__ import annotations
 import math
 from typing import Any, Dict, List, Sequence, Tuple
 
+import numpy as np
+
+from src.placement.constraints import _halton_points
 from src.placement.geometry import derive_near_distance, geometry_profile_from_asset, semantic_role_key
+from src.placement.occupancy import FloorOccupancy
 from src.planning.scene_program_policy import policy_set
 from src.placement.scene_solver_defaults import (
     EDGE_BIASED_ROLES,
@@ -96,24 +100,56 @@ def _scene_graph_edges(scene_program: Dict[str, Any], placement_intent: Dict[str
     return edges
 
 
+CLEARANCE_CAP = 1.5  # gaps beyond this all score the same, which bounds the clearance search radius
+BATCH_SCORE_TOLERANCE = 1e-9  # batched scores within this of the best (or of a clearance threshold) are re-checked exactly
+
+
+SEEDED_JITTER_METERS = 0.6  # a seeded start may shift each desired position by up to this much per axis
+SEEDED_VARIANTS = 2  # jittered copies a seeded start adds next to every candidate position
+SEEDED_SAMPLE_COUNT = 1024  # Halton offsets drawn per seeded start; reused cyclically
+
+
+class _SeededJitter:
+    """Deterministic Halton offsets that widen candidate lists for a seeded solver start.
+
+    Without a seed nothing is added, so the unseeded solve is the canonical
+    greedy pass. With one, every candidate position gains SEEDED_VARIANTS
+    shifted copies, drawn in call order from a scrambled Halton sequence.
+    """
+
+    def __init__(self, seed: int | None) -> None:
+        self._offsets = None if seed is None else (_halton_points(2, seed, SEEDED_SAMPLE_COUNT) * 2.0 - 1.0) * SEEDED_JITTER_METERS
+        self._cursor = 0
+
+    def extra_positions(self, position: Sequence[float]) -> List[List[float]]:
+        if self._offsets is None:
+            return []
+        extras: List[List[float]] = []
+        for _ in range(SEEDED_VARIANTS):
+            offset_x, offset_z = self._offsets[self._cursor % len(self._offsets)]
+            self._cursor += 1
+            extras.append([float(position[0]) + float(offset_x), 0.0, float(position[2]) + float(offset_z)])
+        return extras
+
+
+def _as_occupancy(existing: FloorOccupancy | Sequence[Dict[str, Any]]) -> FloorOccupancy:
+    return existing if isinstance(existing, FloorOccupancy) else FloorOccupancy(existing)
+
+
 def _is_clear(
     position: Sequence[float],
     footprint_radius: float,
-    existing: Sequence[Dict[str, Any]],
+    existing: FloorOccupancy | Sequence[Dict[str, Any]],
     *,
     skip_group_id: str = "",
 ) -> bool:
-    for placement in existing:
-        constraint = placement.get("constraint") if isinstance(placement.get("constraint"), dict) else {}
-        if _safe_text(constraint.get("type")) in {"wall", "surface", "ceiling"}:
-            continue
-        if skip_group_id and _safe_text(placement.get("group_id")) == skip_group_id:
+    occupancy = _as_occupancy(existing)
+    for entry in occupancy.nearby(position, footprint_radius + occupancy.max_radius + 0.08):
+        if skip_group_id and entry.group_id == skip_group_id:
             continue
-        existing_pos = ((placement.get("transform") or {}).get("pos")) or [0.0, 0.0, 0.0]
-        existing_radius = float(((placement.get("geometry_profile") or {}).get("footprint_radius")) or 0.0)
-        if existing_radius <= 0.0:
+        if entry.radius <= 0.0:
             continue
-        if _distance_xz(position, existing_pos) < (footprint_radius + existing_radius + 0.08):
+        if math.dist((float(position[0]), float(position[2])), (entry.x, entry.z)) < (footprint_radius + entry.radius + 0.08):
             return False
     return True
 
@@ -121,24 +157,20 @@ def _is_clear(
 def _clearance_score(
     position: Sequence[float],
     footprint_radius: float,
-    existing: Sequence[Dict[str, Any]],
+    existing: FloorOccupancy | Sequence[Dict[str, Any]],
     *,
     skip_group_id: str = "",
 ) -> float:
-    if not existing:
+    occupancy = _as_occupancy(existing)
+    if not len(occupancy):
         return 1.0
     best_gap = 10.0
-    for placement in existing:
-        constraint = placement.get("constraint") if isinstance(placement.get("constraint"), dict) else {}
-        if _safe_text(constraint.get("type")) in {"wall", "surface", "ceiling"}:
-            continue
-        if skip_group_id and _safe_text(placement.get("group_id")) == skip_group_id:
+    for entry in occupancy.nearby(position, footprint_radius + occupancy.max_radius + CLEARANCE_CAP):
+        if skip_group_id and entry.group_id == skip_group_id:
             continue
-        existing_pos = ((placement.get("transform") or {}).get("pos")) or [0.0, 0.0, 0.0]
-        existing_radius = float(((placement.get("geometry_profile") or {}).get("footprint_radius")) or 0.0)
-        gap = _distance_xz(position, existing_pos) - (footprint_radius + existing_radius)
+        gap = math.dist((float(position[0]), float(position[2])), (entry.x, entry.z)) - (footprint_radius + entry.radius)
         best_gap = min(best_gap, gap)
-    return max(min(best_gap, 1.5), -1.5)
+    return max(min(best_gap, CLEARANCE_CAP), -CLEARANCE_CAP)
 
 
 def _focal_wall_point(scene_program: Dict[str, Any], dimensions: Dict[str, float]) -> List[float]:
@@ -207,7 +239,7 @@ def _candidate_score(
     yaw: float,
     role: str,
     dimensions: Dict[str, float],
-    existing: Sequence[Dict[str, Any]],
+    existing: FloorOccupancy | Sequence[Dict[str, Any]],
     footprint_radius: float,
     scene_program: Dict[str, Any],
     zone_preference: str,
@@ -254,6 +286,80 @@ def _candidate_variants(desired_pos: Sequence[float], anchor_pos: Sequence[float
     return candidates
 
 
+def _batched_candidate_scores(
+    positions: np.ndarray,
+    *,
+    yaw: float,
+    role: str,
+    footprint_radius: float,
+    dimensions: Dict[str, float],
+    occupancy: FloorOccupancy,
+    scene_program: Dict[str, Any],
+    zone_preference: str,
+    skip_group_id: str = "",
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Array form of _is_clear + _candidate_score for N candidate (x, z) rows.
+    # Returns (clear, score, borderline) where borderline marks rows whose
+    # clear test sits within float noise of the threshold.
+    low = positions.min(axis=0)
+    high = positions.max(axis=0)
+    center = (low + high) * 0.5
+    reach = float((high - low).max()) * 0.5 + footprint_radius + occupancy.max_radius + CLEARANCE_CAP
+    entries = [
+        entry
+        for entry in occupancy.nearby([center[0], 0.0, center[1]], reach)
+        if not (skip_group_id and entry.group_id == skip_group_id)
+    ]
+    count = positions.shape[0]
+    clear = np.ones(count, dtype=bool)
+    borderline = np.zeros(count, dtype=bool)
+    if not len(occupancy):
+        clearance = np.full(count, 1.0)
+    elif not entries:
+        clearance = np.full(count, CLEARANCE_CAP)
+    else:
+        centers = np.array([(entry.x, entry.z) for entry in entries], dtype=np.float64)
+        radii = np.array([entry.radius for entry in entries], dtype=np.float64)
+        distances = np.hypot(positions[:, None, 0] - centers[None, :, 0], positions[:, None, 1] - centers[None, :, 1])
+        blocking = radii > 0.0
+        margin = distances[:, blocking] - (footprint_radius + radii[blocking] + 0.08)
+        clear = (margin >= 0.0).all(axis=1)
+        borderline = (np.abs(margin) < BATCH_SCORE_TOLERANCE).any(axis=1)
+        best_gap = np.minimum((distances - (footprint_radius + radii)).min(axis=1), 10.0)
+        clearance = np.clip(best_gap, -CLEARANCE_CAP, CLEARANCE_CAP)
+
+    half_width, half_length = _half_extents(dimensions)
+    zone_target = _zone_position(zone_preference or "center", dimensions)
+    zone = 1.0 - np.minimum(np.hypot(positions[:, 0] - zone_target[0], positions[:, 1] - zone_target[2]) / max(half_width + half_length, 1.0), 1.0)
+
+    focal = np.zeros(count)
+    if _safe_text(scene_program.get("focal_object_role")) == role:
+        focal_target = _focal_wall_point(scene_program, dimensions)
+        closeness = 1.0 - np.minimum(
+            np.hypot(positions[:, 0] - focal_target[0], positions[:, 1] - focal_target[2]) / max(half_width + half_length, 1.0),
+            1.0,
+        )
+        at_origin = (np.abs(positions[:, 0]) < 1e-6) & (np.abs(positions[:, 1]) < 1e-6)
+        inward_yaw = np.where(at_origin, 0.0, np.degrees(np.arctan2(-positions[:, 0], -positions[:, 1])))
+        facing_alignment = 1.0 - np.minimum(np.abs(np.mod(yaw - inward_yaw + 180.0, 360.0) - 180.0) / 180.0, 1.0)
+        focal = closeness + (0.4 * facing_alignment)
+
+    walkway = np.zeros(count)
+    if role not in {"wall", "surface", "ceiling"}:
+        central_band = (np.abs(positions[:, 0]) < (half_width * 0.28)) & (np.abs(positions[:, 1]) < (half_length * 0.28))
+        entry_band = (np.abs(positions[:, 0]) < (half_width * 0.26)) & (positions[:, 1] < (-half_length * 0.35))
+        walkway_intent = scene_program.get("walkway_preservation_intent") if isinstance(scene_program.get("walkway_preservation_intent"), dict) else {}
+        circulation = _safe_text(scene_program.get("circulation_preference"))
+        off_focal = role != _safe_text(scene_program.get("focal_object_role"))
+        if (bool(walkway_intent.get("keep_central_path_clear")) or circulation == "clear_center") and off_focal:
+            walkway = walkway + np.where(central_band, 1.2, 0.0)
+        if (bool(walkway_intent.get("keep_entry_clear")) or circulation == "clear_entry") and off_focal:
+            walkway = walkway + np.where(entry_band, 1.0, 0.0)
+
+    score = (2.5 * clearance) + (1.5 * zone) + focal - walkway
+    return clear, score, borderline
+
+
 def _resolve_scored_position(
     *,
     desired_pos: Sequence[float],
@@ -261,35 +367,55 @@ def _resolve_scored_position(
     role: str,
     footprint_radius: float,
     dimensions: Dict[str, float],
-    existing: Sequence[Dict[str, Any]],
+    existing: FloorOccupancy | Sequence[Dict[str, Any]],
     scene_program: Dict[str, Any],
     zone_preference: str,
     anchor_pos: Sequence[float] | None = None,
     skip_group_id: str = "",
 ) -> Tuple[List[float], float] | None:
+    existing = _as_occupancy(existing)
+    candidates = [
+        _clamp_floor_position(candidate, dimensions)
+        for candidate in _candidate_variants(desired_pos, anchor_pos=anchor_pos, footprint_radius=footprint_radius)
+    ]
+    scalar_kwargs = {
+        "yaw": yaw,
+        "role": role,
+        "dimensions": dimensions,
+        "existing": existing,
+        "footprint_radius": footprint_radius,
+        "scene_program": scene_program,
+        "zone_preference": zone_preference,
+        "skip_group_id": skip_group_id,
+    }
+    clear, scores, borderline = _batched_candidate_scores(
+        np.array([(candidate[0], candidate[2]) for candidate in candidates], dtype=np.float64),
+        yaw=yaw,
+        role=role,
+        footprint_radius=footprint_radius,
+        dimensions=dimensions,
+        occupancy=existing,
+        scene_program=scene_program,
+        zone_preference=zone_preference,
+        skip_group_id=skip_group_id,
+    )
+    for index in np.flatnonzero(borderline):  # settle threshold-hugging rows exactly
+        clear[index] = _is_clear(candidates[index], footprint_radius, existing, skip_group_id=skip_group_id)
+    if not clear.any():
+        return None
+
+    # Any row within tolerance of the batched best could win under exact
+    # arithmetic, so re-score just those with the scalar path and keep the
+    # first strict maximum in candidate order, as the scalar loop does.
+    best_batched = scores[clear].max()
     best_position: List[float] | None = None
     best_score = float("-inf")
-    for candidate in _candidate_variants(desired_pos, anchor_pos=anchor_pos, footprint_radius=footprint_radius):
-        clamped = _clamp_floor_position(candidate, dimensions)
-        if not _is_clear(clamped, footprint_radius, existing, skip_group_id=skip_group_id):
-            continue
-        score = _candidate_score(
-            position=clamped,
-            yaw=yaw,
-            role=role,
-            dimensions=dimensions,
-            existing=existing,
-            footprint_radius=footprint_radius,
-            scene_program=scene_program,
-            zone_preference=zone_preference,
-            skip_group_id=skip_group_id,
-        )
+    for index in np.flatnonzero(clear & (scores >= best_batched - BATCH_SCORE_TOLERANCE)):
+        score = _candidate_score(position=candidates[index], **scalar_kwargs)
         if score > best_score:
-            best_position = clamped
+            best_position = candidates[index]
             best_score = score
-    if best_position is not None:
-        return best_position, best_score
-    return None
+    return best_position, best_score
 
 
 def _constraint_payload(constraint_type: str, *, target: str = "", relation: str = "") -> Dict[str, Any]:
@@ -308,6 +434,7 @@ def _placement_entry(
     position: Sequence[float],
     yaw: float,
     constraint: Dict[str, Any],
+    zone_preference: str,
 ) -> Dict[str, Any]:
     return {
         "placement_id": placement_id,
@@ -320,6 +447,7 @@ def _placement_entry(
         "front_yaw_offset_degrees": float(asset.get("front_yaw_offset_degrees") or 0.0),
         "geometry_profile": geometry_profile_from_asset(asset),
         "constraint": constraint,
+        "zone_preference": zone_preference,  # the zone the solver scored this object against; compile-time refinement scores the same one
         "transform": {
             "pos": [_round3(position[0]), _round3(position[1]), _round3(position[2])],
             "rot": [0.0, _round3(yaw), 0.0],
@@ -423,9 +551,10 @@ def _place_group(
     dimensions: Dict[str, float],
     density_profile: str,
     scene_program: Dict[str, Any],
-    placements: List[Dict[str, Any]],
+    occupancy: FloorOccupancy,
     placement_index: int,
     ordinal: int,
+    jitter: _SeededJitter | None = None,
 ) -> tuple[List[Dict[str, Any]], int, float]:
     group_id = _safe_text(group_spec.get("group_id"))
     anchor_profile = geometry_profile_from_asset(anchor_asset)
@@ -435,8 +564,11 @@ def _place_group(
     if _safe_text(group_spec.get("zone_preference")) == "center":
         anchor_constraint_type = "floor"
 
+    anchor_candidates = _group_anchor_candidates(group_spec, dimensions, ordinal)
+    if jitter is not None:
+        anchor_candidates += [extra for candidate in anchor_candidates for extra in jitter.extra_positions(candidate)]
     best_bundle: tuple[List[Dict[str, Any]], float] | None = None
-    for anchor_candidate in _group_anchor_candidates(group_spec, dimensions, ordinal):
+    for anchor_candidate in anchor_candidates:
         anchor_yaw = _group_anchor_yaw(anchor_candidate, group_spec)
         anchor_choice = _resolve_scored_position(
             desired_pos=anchor_candidate,
@@ -444,7 +576,7 @@ def _place_group(
             role=_safe_text(anchor_asset.get("role") or semantic_role_key(anchor_asset)),
             footprint_radius=float(anchor_profile.get("footprint_radius") or 0.7),
             dimensions=dimensions,
-            existing=placements,
+            existing=occupancy,
             scene_program=scene_program,
             zone_preference=_safe_text(group_spec.get("zone_preference")) or "center",
             skip_group_id=group_id,
@@ -458,6 +590,7 @@ def _place_group(
             position=resolved_anchor,
             yaw=anchor_yaw,
             constraint=_constraint_payload(anchor_constraint_type),
+            zone_preference=_safe_text(group_spec.get("zone_preference")) or "center",
         )
         if not member_assets:
             score = anchor_score + _focal_score(resolved_anchor, anchor_yaw, _safe_text(anchor_asset.get("role") or semantic_role_key(anchor_asset)), scene_program, dimensions)
@@ -467,6 +600,8 @@ def _place_group(
 
         for angle_variant in _angle_variants(_safe_text(group_spec.get("layout_pattern")), len(member_assets)):
             bundle = [anchor_entry]
+            bundle_occupancy = occupancy.layered()  # committed placements plus this tentative bundle
+            bundle_occupancy.add(anchor_entry)
             bundle_score = anchor_score
             member_positions: List[List[float]] = []
             local_index = placement_index + 1
@@ -493,7 +628,7 @@ def _place_group(
                     role=_safe_text(member_asset.get("role") or semantic_role_key(member_asset)),
                     footprint_radius=float(member_profile.get("footprint_radius") or 0.6),
                     dimensions=dimensions,
-                    existing=placements + bundle,
+                    existing=bundle_occupancy,
                     scene_program=scene_program,
                     zone_preference=_safe_text(group_spec.get("zone_preference")) or "center",
                     anchor_pos=resolved_anchor,
@@ -519,8 +654,10 @@ def _place_group(
                         position=resolved_member,
                         yaw=final_yaw,
                         constraint=_constraint_payload("near", target=str(group_spec.get("anchor_role") or ""), relation=relation),
+                        zone_preference=_safe_text(group_spec.get("zone_preference")) or "center",
                     )
                 )
+                bundle_occupancy.add(bundle[-1])
                 local_index += 1
                 member_positions.append(resolved_member)
                 bundle_score += member_score
@@ -576,6 +713,8 @@ def _place_grouped_assets(
     room_dimensions: Dict[str, float],
     density_profile: str,
     scene_program: Dict[str, Any],
+    occupancy: FloorOccupancy,
+    jitter: _SeededJitter | None = None,
 ) -> tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]], int, List[Dict[str, Any]], List[float]]:
     placements: List[Dict[str, Any]] = []
     placed_roles: Dict[str, List[Dict[str, Any]]] = {}
@@ -598,11 +737,14 @@ def _place_grouped_assets(
             dimensions=room_dimensions,
             density_profile=density_profile,
             scene_program=scene_program,
-            placements=placements,
+            occupancy=occupancy,
             placement_index=placement_index,
             ordinal=ordinal,
+            jitter=jitter,
         )
         placements.extend(group_placements)
+        for placement in group_placements:
+            occupancy.add(placement)
         for placement in group_placements:
             placed_roles.setdefault(_safe_text(placement.get("role")), []).append(placement)
         group_summaries.append(
@@ -677,7 +819,7 @@ def _best_placement_choice(
     placement_index: int,
     candidates: List[tuple[List[float], float, str, str, str]],
     room_dimensions: Dict[str, float],
-    placements: List[Dict[str, Any]],
+    occupancy: FloorOccupancy,
     scene_program: Dict[str, Any],
 ) -> tuple[Dict[str, Any], float] | None:
     best_choice: tuple[Dict[str, Any], float] | None = None
@@ -688,7 +830,7 @@ def _best_placement_choice(
             role=role,
             footprint_radius=float(profile.get("footprint_radius") or 0.6),
             dimensions=room_dimensions,
-            existing=placements,
+            existing=occupancy,
             scene_program=scene_program,
             zone_preference=zone_preference,
         )
@@ -706,6 +848,7 @@ def _best_placement_choice(
                 target=target_role,
                 relation=relation_type if relation_type in policy_set("near_constraint_relations") else "",
             ),
+            zone_preference=zone_preference,
         )
         if best_choice is None or candidate_score > best_choice[1]:
             best_choice = (placement, candidate_score)
@@ -718,20 +861,25 @@ def solve_scene_layout(
     scene_program: Dict[str, Any],
     placement_intent: Dict[str, Any],
     room_dimensions: Dict[str, float],
+    seed: int | None = None,
 ) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
     density_profile = _safe_text(placement_intent.get("density_profile")) or "normal"
+    jitter = _SeededJitter(seed)
     group_specs = [
         dict(group)
         for group in scene_program.get("groups") or []
         if isinstance(group, dict) and _safe_text(group.get("group_id"))
     ]
     grouped_assets, ungrouped_assets = _group_selected_assets(selected_assets)
+    occupancy = FloorOccupancy()  # kept in step with `placements` so clearance queries only visit nearby cells
     placements, placed_roles, placement_index, group_summaries, group_scores = _place_grouped_assets(
         group_specs=group_specs,
         grouped_assets=grouped_assets,
         room_dimensions=room_dimensions,
         density_profile=density_profile,
         scene_program=scene_program,
+        occupancy=occupancy,
+        jitter=jitter,
     )
 
     relations = _scene_graph_edges(scene_program, placement_intent)
@@ -751,6 +899,11 @@ def solve_scene_layout(
             support_counts=support_counts,
             ordinal=ordinal,
         )
+        candidates += [
+            (extra, desired_yaw, zone_preference, target_role, relation_type)
+            for desired_pos, desired_yaw, zone_preference, target_role, relation_type in candidates
+            for extra in jitter.extra_positions(desired_pos)
+        ]
         best_choice = _best_placement_choice(
             asset=asset,
             role=role,
@@ -758,13 +911,14 @@ def solve_scene_layout(
             placement_index=placement_index,
             candidates=candidates,
             room_dimensions=room_dimensions,
-            placements=placements,
+            occupancy=occupancy,
             scene_program=scene_program,
         )
         if best_choice is None:
             continue
         placement, candidate_score = best_choice
         placements.append(placement)
+        occupancy.add(placement)
         placed_roles.setdefault(role, []).append(placement)
         relation_score_total += candidate_score
         placement_index += 1
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
 import json
+from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Tuple
 
 DEFAULT_TAXONOMY_PATH = Path(__file__).resolve().parent / "taxonomy" / "semantic_taxonomy_v1.json"
+TOKEN_MEMO_SIZE = 65536  # bound for the per-token normalization and resolution memos
 
 
-def _normalize_token(value: Any) -> str:
-    token = str(value or "").strip().lower().replace("-", "_").replace(" ", "_").replace("/", "_")
+@lru_cache(maxsize=TOKEN_MEMO_SIZE)
+def _normalize_text(text: str) -> str:
+    token = text.strip().lower().replace("-", "_").replace(" ", "_").replace("/", "_")
     return "_".join(part for part in token.split("_") if part)
 
 
+def _normalize_token(value: Any) -> str:
+    return _normalize_text(value if isinstance(value, str) else str(value or ""))
+
+
 def _token_parts(value: Any) -> List[str]:
     return [part for part in _normalize_token(value).split("_") if part]
 
@@ -72,40 +79,140 @@ def string_list(value: Any) -> List[str]:
     return out
 
 
+@dataclass(frozen=True)
+class GroundingRule:
+    match_all: frozenset[str]
+    match_any: frozenset[str]
+    runtime_role: str
+    subtype_by_token: Tuple[Tuple[str, str], ...]
+    default_subtype: str
+
+    def matches(self, token_set: set[str]) -> bool:
+        if self.match_all and not self.match_all.issubset(token_set):
+            return False
+        return not self.match_any or bool(self.match_any & token_set)
+
+
+@dataclass(frozen=True)
+class CompiledTaxonomy:
+    """Normalized lookup tables derived once from the semantic taxonomy payload.
+
+    Grounding rules keep their file order; rules_by_token lists, per token,
+    the rules that can only match when that token is present, so grounding
+    checks just the candidates a token set can reach.
+    """
+
+    supported_roles: frozenset[str]
+    role_aliases: Dict[str, str]
+    concept_aliases: Dict[str, str]
+    concept_grounding: Dict[str, Tuple[str, str]]
+    grounding_rules: Tuple[GroundingRule, ...]
+    rules_by_token: Dict[str, Tuple[int, ...]]
+    unconditional_rules: Tuple[int, ...]
+
+    def rule_candidates(self, token_set: set[str]) -> List[int]:
+        candidates = set(self.unconditional_rules)
+        for token in token_set:
+            candidates.update(self.rules_by_token.get(token, ()))
+        return sorted(candidates)
+
+
+def compile_semantic_taxonomy(payload: Dict[str, Any]) -> CompiledTaxonomy:
+    concept_grounding: Dict[str, Tuple[str, str]] = {}
+    for concept, grounding in dict(payload.get("concept_grounding") or {}).items():
+        if isinstance(grounding, dict):
+            concept_grounding[concept] = (_normalize_token(grounding.get("runtime_role")), _normalize_token(grounding.get("subtype")))
+    rules: List[GroundingRule] = []
+    rules_by_token: Dict[str, List[int]] = {}
+    unconditional: List[int] = []
+    for raw_rule in payload.get("token_grounding_rules") or []:
+        if not isinstance(raw_rule, dict):
+            continue
+        rule = GroundingRule(
+            match_all=frozenset(string_list(raw_rule.get("match_all"))),
+            match_any=frozenset(string_list(raw_rule.get("match_any"))),
+            runtime_role=_normalize_token(raw_rule.get("runtime_role")),
+            subtype_by_token=tuple((_normalize_token(key), _normalize_token(value)) for key, value in dict(raw_rule.get("subtype_by_token") or {}).items()),
+            default_subtype=_normalize_token(raw_rule.get("default_subtype")),
+        )
+        keys = rule.match_any or rule.match_all
+        for token in keys:
+            rules_by_token.setdefault(token, []).append(len(rules))
+        if not keys:
+            unconditional.append(len(rules))
+        rules.append(rule)
+    return CompiledTaxonomy(
+        supported_roles=frozenset(string_list(payload.get("supported_runtime_roles"))),
+        role_aliases={_normalize_token(k): _normalize_token(v) for k, v in dict(payload.get("role_aliases") or {}).items()},
+        concept_aliases={_normalize_token(k): _normalize_token(v) for k, v in dict(payload.get("concept_aliases") or {}).items()},
+        concept_grounding=concept_grounding,
+        grounding_rules=tuple(rules),
+        rules_by_token={token: tuple(indices) for token, indices in rules_by_token.items()},
+        unconditional_rules=tuple(unconditional),
+    )
+
+
+@lru_cache(maxsize=1)
+def compiled_semantic_taxonomy() -> CompiledTaxonomy:
+    return compile_semantic_taxonomy(load_semantic_taxonomy())
+
+
+_DEPENDENT_MEMOS: List[Any] = []  # lru_cache'd resolvers in other modules whose results derive from the taxonomy
+
+
+def register_taxonomy_memo(memo: Any) -> Any:  # decorator order: apply on top of lru_cache so clear_semantic_taxonomy_caches() resets it too
+    _DEPENDENT_MEMOS.append(memo)
+    return memo
+
+
+def clear_semantic_taxonomy_caches() -> None:  # drops the loaded payload, its compiled tables and every resolution memo built from them
+    load_semantic_taxonomy.cache_clear()
+    compiled_semantic_taxonomy.cache_clear()
+    _canonical_role_token.cache_clear()
+    _canonical_concept.cache_clear()
+    _ground_token.cache_clear()
+    for memo in _DEPENDENT_MEMOS:
+        memo.cache_clear()
+
+
 def supported_runtime_roles() -> set[str]:
-    return set(string_list(load_semantic_taxonomy().get("supported_runtime_roles")))
+    return set(compiled_semantic_taxonomy().supported_roles)
 
 
 def role_aliases() -> Dict[str, str]:
-    return {_normalize_token(k): _normalize_token(v) for k, v in dict(load_semantic_taxonomy().get("role_aliases") or {}).items()}
+    return dict(compiled_semantic_taxonomy().role_aliases)
 
 
-def canonicalize_role_token(value: Any) -> str:
-    token = _normalize_token(value)
+@lru_cache(maxsize=TOKEN_MEMO_SIZE)
+def _canonical_role_token(token: str) -> str:
     if not token:
         return ""
-    aliases = role_aliases()
-    supported = supported_runtime_roles()
+    taxonomy = compiled_semantic_taxonomy()
     for candidate in (token, token[:-1] if token.endswith("s") else token):
-        if candidate in aliases:
-            return aliases[candidate]
-        if candidate in supported:
+        if candidate in taxonomy.role_aliases:
+            return taxonomy.role_aliases[candidate]
+        if candidate in taxonomy.supported_roles:
             return candidate
     return ""
 
 
+def canonicalize_role_token(value: Any) -> str:
+    return _canonical_role_token(_normalize_token(value))
+
+
 def _strip_context_suffix(parts: List[str]) -> List[str]:
     if parts and parts[-1] in {"area", "room", "space", "corner", "zone"}:
         return parts[:-1]
     return parts
 
 
-def canonicalize_concept(value: Any) -> str:
-    parts = _strip_context_suffix(_token_parts(value))
+@lru_cache(maxsize=TOKEN_MEMO_SIZE)
+def _canonical_concept(normalized: str) -> str:
+    parts = _strip_context_suffix([part for part in normalized.split("_") if part])
     if not parts:
         return ""
     token = "_".join(parts)
-    aliases = {_normalize_token(k): _normalize_token(v) for k, v in dict(load_semantic_taxonomy().get("concept_aliases") or {}).items()}
+    aliases = compiled_semantic_taxonomy().concept_aliases
     if token in aliases:
         return aliases[token]
     for index in range(len(parts)):
@@ -115,45 +222,45 @@ def canonicalize_concept(value: Any) -> str:
     return token
 
 
-def _rule_subtype(rule: Dict[str, Any], token: str, token_set: set[str], role: str) -> str:
-    subtype_by_token = dict(rule.get("subtype_by_token") or {})
-    for key, value in subtype_by_token.items():
-        if _normalize_token(key) in token_set:
-            return _normalize_token(value)
-    default = _normalize_token(rule.get("default_subtype"))
-    if default == "$token_except_role":
+def canonicalize_concept(value: Any) -> str:
+    return _canonical_concept(_normalize_token(value))
+
+
+def _rule_subtype(rule: GroundingRule, token: str, token_set: set[str], role: str) -> str:
+    for key, value in rule.subtype_by_token:
+        if key in token_set:
+            return value
+    if rule.default_subtype == "$token_except_role":
         return "" if token in {role, "storage", "cabinet"} else token
-    return default
+    return rule.default_subtype
 
 
-def ground_concept(concept: Any) -> Tuple[str, str]:
-    token = canonicalize_concept(concept)
+@lru_cache(maxsize=TOKEN_MEMO_SIZE)
+def _ground_token(normalized: str) -> Tuple[str, str]:
+    token = _canonical_concept(normalized)
     if not token:
         return "", ""
-    taxonomy = load_semantic_taxonomy()
-    grounding = dict(taxonomy.get("concept_grounding") or {}).get(token)
-    if isinstance(grounding, dict):
-        return _normalize_token(grounding.get("runtime_role")), _normalize_token(grounding.get("subtype"))
+    taxonomy = compiled_semantic_taxonomy()
+    grounding = taxonomy.concept_grounding.get(token)
+    if grounding is not None:
+        return grounding
 
-    direct = canonicalize_role_token(token)
+    direct = _canonical_role_token(token)
     if direct:
         return direct, ""
 
     token_set = set(_token_parts(token))
-    for rule in taxonomy.get("token_grounding_rules") or []:
-        if not isinstance(rule, dict):
-            continue
-        match_all = set(string_list(rule.get("match_all")))
-        match_any = set(string_list(rule.get("match_any")))
-        if match_all and not match_all.issubset(token_set):
-            continue
-        if match_any and not (match_any & token_set):
-            continue
-        role = _normalize_token(rule.get("runtime_role"))
-        return role, _rule_subtype(rule, token, token_set, role)
+    for index in taxonomy.rule_candidates(token_set):
+        rule = taxonomy.grounding_rules[index]
+        if rule.matches(token_set):
+            return rule.runtime_role, _rule_subtype(rule, token, token_set, rule.runtime_role)
     return "", ""
 
 
+def ground_concept(concept: Any) -> Tuple[str, str]:
+    return _ground_token(_normalize_token(concept))
+
+
 def expand_semantic_aliases(tokens: Iterable[str]) -> set[str]:
     normalized = {_normalize_token(token) for token in tokens if _normalize_token(token)}
     aliases: set[str] = set()
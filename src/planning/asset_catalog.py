@@ -1,39 +1,98 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import pathlib
+import threading
+from dataclasses import dataclass, field
 from typing import Any, Dict, List
 
 from src.catalog.pack_registry import PackRegistry
+from src.planning.asset_features import AssetFeatureTable, activate_feature_table, clear_asset_feature_cache, feature_table_for_pool
+from src.planning.asset_shortlist import activate_catalog_pool
 
 
 PLANNER_POOL_PATH = pathlib.Path("data/index/planner_asset_pool_v1.json")  # pre-indexed pool of planner-eligible assets
 
 
-# Keep behavior deterministic so planner/runtime contracts stay stable.
-def load_planner_pool() -> List[Dict[str, Any]]:  # loads all indexed assets; returns empty list if file is missing or corrupt
-    if not PLANNER_POOL_PATH.exists():
-        return []
-    try:
-        payload = json.loads(PLANNER_POOL_PATH.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError):
-        return []
+@dataclass
+class PlannerAssetIndex:  # parsed planner pool plus secondary lookups; shared process-wide, so treat as read-only
+    assets: List[Dict[str, Any]] = field(default_factory=list)  # pool order, every record with an asset_id (duplicates kept, as the pool file lists them)
+    by_id: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # asset_id -> first record with that id
+    by_source_pack: Dict[str, List[int]] = field(default_factory=dict)  # stripped source_pack -> rows of assets
+    by_pack_id: Dict[str, List[int]] = field(default_factory=dict)  # explicit pack_id -> rows of assets
+    fingerprint: str = ""  # sha256 of the pool file bytes; empty when the file is missing or unreadable
+    features: AssetFeatureTable = field(default_factory=AssetFeatureTable)  # precomputed sidecar features; empty when no matching sidecar exists
+
+    def assets_for_rows(self, rows: List[int]) -> List[Dict[str, Any]]:  # records for rows, in pool order
+        return [self.assets[row] for row in sorted(set(rows))]
+
 
-    assets = payload.get("assets")
+_INDEX_CACHE: Dict[str, tuple[tuple[int, int], PlannerAssetIndex]] = {}  # resolved pool path -> (mtime_ns/size, index)
+_INDEX_LOCK = threading.Lock()
+
+
+def _build_planner_asset_index(raw: bytes) -> PlannerAssetIndex:
+    index = PlannerAssetIndex(fingerprint=hashlib.sha256(raw).hexdigest())
+    try:
+        payload = json.loads(raw.decode("utf-8"))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return PlannerAssetIndex()
+    assets = payload.get("assets") if isinstance(payload, dict) else None
     if not isinstance(assets, list):
-        return []
-    return [dict(asset) for asset in assets if isinstance(asset, dict) and asset.get("asset_id")]
+        return PlannerAssetIndex()
 
+    for asset in assets:
+        if not isinstance(asset, dict) or not asset.get("asset_id"):
+            continue
+        row = len(index.assets)
+        index.assets.append(asset)
+        index.by_id.setdefault(str(asset["asset_id"]), asset)
+        index.by_source_pack.setdefault(str(asset.get("source_pack", "")).strip(), []).append(row)
+        if isinstance(asset.get("pack_id"), str):
+            index.by_pack_id.setdefault(asset["pack_id"], []).append(row)
 
-def asset_matches_pack(asset: Dict[str, Any], pack_ids: List[str], registry: PackRegistry) -> bool:  # checks if an asset belongs to one of the selected packs
-    if not pack_ids:
-        return True
+    index.features = feature_table_for_pool(index.by_id, index.fingerprint)
+    activate_feature_table(index.features)
+    activate_catalog_pool(index.fingerprint, index.assets)  # shortlist columns are built from it on first use
+    return index
+
+
+def clear_planner_asset_index_cache() -> None:  # forces the next lookup to re-read the pool file and its feature sidecar
+    with _INDEX_LOCK:
+        _INDEX_CACHE.clear()
+    clear_asset_feature_cache()
+    activate_catalog_pool("", [])
 
-    pack_id = asset.get("pack_id")
-    if isinstance(pack_id, str) and pack_id in pack_ids:
-        return True
 
-    source_pack = str(asset.get("source_pack", "")).strip()
+def planner_asset_index(pool_path: str | pathlib.Path | None = None) -> PlannerAssetIndex:  # loads the pool once; re-parses only when the file's mtime or size changes
+    path = pathlib.Path(pool_path) if pool_path is not None else PLANNER_POOL_PATH
+    try:
+        stat = path.stat()
+    except OSError:
+        return PlannerAssetIndex()
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+    cache_key = str(path.resolve())
+
+    with _INDEX_LOCK:
+        cached = _INDEX_CACHE.get(cache_key)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return PlannerAssetIndex()
+        index = _build_planner_asset_index(raw)
+        _INDEX_CACHE[cache_key] = (stat_key, index)
+    return index
+
+
+# Keep behavior deterministic so planner/runtime contracts stay stable.
+def load_planner_pool() -> List[Dict[str, Any]]:  # loads all indexed assets; returns empty list if file is missing or corrupt
+    return [dict(asset) for asset in planner_asset_index().assets]
+
+
+def _source_pack_matches(source_pack: str, pack_ids: List[str], registry: PackRegistry) -> bool:  # pack match on a stripped source_pack value
     if source_pack in pack_ids:
         return True
     source_pack_lower = source_pack.lower()
@@ -50,8 +109,27 @@ def asset_matches_pack(asset: Dict[str, Any], pack_ids: List[str], registry: Pac
     return False
 
 
+def asset_matches_pack(asset: Dict[str, Any], pack_ids: List[str], registry: PackRegistry) -> bool:  # checks if an asset belongs to one of the selected packs
+    if not pack_ids:
+        return True
+
+    pack_id = asset.get("pack_id")
+    if isinstance(pack_id, str) and pack_id in pack_ids:
+        return True
+    return _source_pack_matches(str(asset.get("source_pack", "")).strip(), pack_ids, registry)
+
+
 def collect_assets(pack_ids: List[str], registry: PackRegistry) -> List[Dict[str, Any]]:  # filters the planner pool to only assets matching selected packs
-    return [asset for asset in load_planner_pool() if asset_matches_pack(asset, pack_ids, registry)]
+    index = planner_asset_index()
+    if not pack_ids:
+        return [dict(asset) for asset in index.assets]
+    matched_rows: List[int] = []
+    for pack_id in pack_ids:  # pack matching depends only on pack_id/source_pack, so test each distinct value once
+        matched_rows.extend(index.by_pack_id.get(pack_id, []))
+    for source_pack, rows in index.by_source_pack.items():
+        if _source_pack_matches(source_pack, pack_ids, registry):
+            matched_rows.extend(rows)
+    return [dict(asset) for asset in index.assets_for_rows(matched_rows)]
 
 
 def candidate_assets_by_ids(all_assets: List[Dict[str, Any]], asset_ids: List[str]) -> List[Dict[str, Any]]:  # resolves a list of asset IDs to full asset records, preserving order
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import pathlib
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from src.placement.semantic_taxonomy import DEFAULT_TAXONOMY_PATH
+
+
+"""Precomputed per-asset features, read from the sidecar written by src.planning.compile_catalog."""
+
+
+ASSET_FEATURES_PATH = pathlib.Path("data/index/planner_asset_features_v1.json")  # sidecar written next to the planner pool
+ASSET_FEATURES_VERSION = 1  # bump whenever a derivation in compile_catalog changes so older sidecars are ignored
+
+
+@dataclass
+class AssetFeatureTable:  # one sidecar joined to the pool records it describes; shared process-wide, so treat as read-only
+    pool_fingerprint: str = ""  # planner pool sha256 the features were derived from
+    registry_fingerprint: str = ""  # pack registry fingerprint the candidate records were derived from
+    assets: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # asset_id -> precomputed features
+    sources: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # asset_id -> pool record those features describe
+    candidates: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)  # pack_id -> substitution candidate records in manifest order
+
+    def features_for(self, asset: Dict[str, Any]) -> Dict[str, Any] | None:  # features only while the record still equals the pool record they came from
+        asset_id = str(asset.get("asset_id") or "")
+        source = self.sources.get(asset_id)
+        if source is None or (source is not asset and source != asset):
+            return None
+        return self.assets.get(asset_id)
+
+
+_SIDECAR_CACHE: Dict[str, tuple[tuple[int, int], Dict[str, Any] | None]] = {}  # resolved sidecar path -> (mtime_ns/size, parsed payload)
+_SIDECAR_LOCK = threading.Lock()
+_ACTIVE_TABLE = AssetFeatureTable()  # table for the most recently indexed planner pool
+
+
+@lru_cache(maxsize=1)
+def taxonomy_fingerprint() -> str:  # sha256 of the semantic taxonomy file every role and token derivation depends on
+    try:
+        return hashlib.sha256(DEFAULT_TAXONOMY_PATH.read_bytes()).hexdigest()
+    except OSError:
+        return ""
+
+
+def _parse_sidecar(raw: bytes) -> Dict[str, Any] | None:
+    try:
+        payload = json.loads(raw.decode("utf-8"))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != ASSET_FEATURES_VERSION:
+        return None
+    if payload.get("taxonomy_fingerprint") != taxonomy_fingerprint():
+        return None
+    if not isinstance(payload.get("assets"), dict) or not isinstance(payload.get("candidates"), dict):
+        return None
+    return payload
+
+
+def load_asset_feature_sidecar(path: str | pathlib.Path | None = None) -> Dict[str, Any] | None:  # parsed sidecar when its version and taxonomy still match; re-read only when the file changes
+    sidecar_path = pathlib.Path(path) if path is not None else ASSET_FEATURES_PATH
+    try:
+        stat = sidecar_path.stat()
+    except OSError:
+        return None
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+    cache_key = str(sidecar_path.resolve())
+
+    with _SIDECAR_LOCK:
+        cached = _SIDECAR_CACHE.get(cache_key)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+        try:
+            payload = _parse_sidecar(sidecar_path.read_bytes())
+        except OSError:
+            return None
+        _SIDECAR_CACHE[cache_key] = (stat_key, payload)
+    return payload
+
+
+def feature_table_for_pool(  # joins the sidecar to a freshly indexed pool; empty when the sidecar is missing or was built from another pool
+    records_by_id: Dict[str, Dict[str, Any]],
+    pool_fingerprint: str,
+    path: str | pathlib.Path | None = None,
+) -> AssetFeatureTable:
+    payload = load_asset_feature_sidecar(path)
+    if payload is None or not pool_fingerprint or payload.get("pool_fingerprint") != pool_fingerprint:
+        return AssetFeatureTable()
+    table = AssetFeatureTable(
+        pool_fingerprint=pool_fingerprint,
+        registry_fingerprint=str(payload.get("registry_fingerprint") or ""),
+        candidates=payload["candidates"],
+    )
+    for asset_id, features in payload["assets"].items():
+        record = records_by_id.get(asset_id)
+        if record is None or not isinstance(features, dict):
+            continue
+        table.sources[asset_id] = record
+        table.assets[asset_id] = {
+            **features,
+            "semantic_tokens": frozenset(features.get("semantic_tokens") or ()),
+            "creative_tokens": frozenset(features.get("creative_tokens") or ()),
+        }
+    return table
+
+
+def activate_feature_table(table: AssetFeatureTable) -> None:  # called by the planner index whenever it (re)builds the pool
+    global _ACTIVE_TABLE
+    _ACTIVE_TABLE = table
+
+
+def clear_asset_feature_cache() -> None:  # forces the next lookup to re-read the sidecar
+    with _SIDECAR_LOCK:
+        _SIDECAR_CACHE.clear()
+    activate_feature_table(AssetFeatureTable())
+    taxonomy_fingerprint.cache_clear()
+
+
+def precomputed_asset_features(asset: Dict[str, Any]) -> Dict[str, Any] | None:  # sidecar features for an unmodified planner pool record, else None
+    return _ACTIVE_TABLE.features_for(asset)
+
+
+def precomputed_candidates(registry_fingerprint: str, path: str | pathlib.Path | None = None) -> Dict[str, List[Dict[str, Any]]] | None:  # substitution candidate records per pack, when built from this exact registry
+    payload = load_asset_feature_sidecar(path)
+    if payload is None or not registry_fingerprint or payload.get("registry_fingerprint") != registry_fingerprint:
+        return None
+    return payload["candidates"]
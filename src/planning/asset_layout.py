@@ -9,9 +9,11 @@ from src.placement.geometry import (
     room_capacity_summary,
     semantic_role_key,
 )
+from src.placement.multistart import MAX_LAYOUT_STARTS, layout_start_seeds, solve_scene_layout_multistart
 from src.placement.scene_solver import solve_scene_layout
 from src.world.templates import ROOM_BASIC_DIMENSIONS
 
+from src.planning.asset_features import precomputed_asset_features
 from src.planning.asset_shortlist import _ordered_selected_assets, filter_candidate_assets
 from src.planning.scene_program_common import _derive_role_fields_from_slots
 from src.planning.scene_policy import asset_allowed_by_scene_policy
@@ -260,7 +262,8 @@ def _placement_profiles(candidate_assets: List[Dict[str, Any]]) -> Dict[str, Dic
         asset_id = str(asset.get("asset_id", "")).strip()
         if not asset_id:
             continue
-        profiles[asset_id] = geometry_profile_from_asset(asset)
+        features = precomputed_asset_features(asset)
+        profiles[asset_id] = dict(features["geometry_profile"]) if features is not None else geometry_profile_from_asset(asset)
     return profiles
 
 
@@ -396,6 +399,7 @@ def _layout_inputs_from_selected_assets(  # translates selected semantic objects
     room_dimensions: Dict[str, float],
     candidate_assets: List[Dict[str, Any]],
     scene_program: Dict[str, Any],
+    seed: int = 0,
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     selected_assets = [
         asset
@@ -443,12 +447,22 @@ def _layout_inputs_from_selected_assets(  # translates selected semantic objects
         effective_max_props,
         len(ordered_assets),
     )
-    placements, layout_program = solve_scene_layout(
-        ordered_assets,
-        scene_program=scene_program,
-        placement_intent=placement_intent,
-        room_dimensions=room_dimensions,
-    )
+    layout_starts = min(int(budgets.get("layout_starts") or 1), MAX_LAYOUT_STARTS)
+    if layout_starts > 1:
+        placements, layout_program = solve_scene_layout_multistart(
+            ordered_assets,
+            scene_program=scene_program,
+            placement_intent=placement_intent,
+            room_dimensions=room_dimensions,
+            seeds=layout_start_seeds(seed, layout_starts),
+        )
+    else:
+        placements, layout_program = solve_scene_layout(
+            ordered_assets,
+            scene_program=scene_program,
+            placement_intent=placement_intent,
+            room_dimensions=room_dimensions,
+        )
     anchor_counts = {"floor": 0, "wall": 0, "surface": 0, "lights": 0}
     clutter_total = 0
     for placement in placements:
@@ -484,6 +498,7 @@ def build_layout_inputs_from_selected_assets(  # public API: produces raw placem
     room_dimensions: Dict[str, float] | None = None,
     candidate_assets: List[Dict[str, Any]] | None = None,
     scene_program: Dict[str, Any] | None = None,
+    seed: int = 0,
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     room_dimensions = room_dimensions or ROOM_BASIC_DIMENSIONS
     scene_program = _scene_program_view(intent_spec=intent_spec, scene_program=scene_program)
@@ -496,6 +511,7 @@ def build_layout_inputs_from_selected_assets(  # public API: produces raw placem
         room_dimensions=room_dimensions,
         candidate_assets=candidate_assets or selected_assets,
         scene_program=scene_program,
+        seed=seed,
     )
 
 
@@ -512,7 +528,7 @@ def build_layout_from_selected_assets(  # convenience wrapper: builds inputs the
     candidate_assets: List[Dict[str, Any]] | None = None,
     scene_program: Dict[str, Any] | None = None,
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    del prompt_text, seed
+    del prompt_text
     placements, base_plan = build_layout_inputs_from_selected_assets(
         selected_assets,
         max_props=max_props,
@@ -522,6 +538,7 @@ def build_layout_from_selected_assets(  # convenience wrapper: builds inputs the
         room_dimensions=room_dimensions,
         candidate_assets=candidate_assets,
         scene_program=scene_program,
+        seed=seed,
     )
     if not placements:
         return [], base_plan
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, List
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
 
 from src.placement.constants import (
     MIN_SEMANTIC_CONFIDENCE,
@@ -13,9 +16,11 @@ from src.placement.geometry import (
     map_semantic_concept_to_runtime_role,
     semantic_role_key,
 )
-from src.placement.semantic_taxonomy import expand_semantic_aliases
+from src.placement.semantic_taxonomy import expand_semantic_aliases, register_taxonomy_memo
+from src.planning.asset_features import precomputed_asset_features
 from src.planning.scene_program_common import _derive_role_fields_from_slots
 from src.planning.scene_policy import asset_allowed_by_scene_policy, negative_policy_tokens
+from src.selection.ranking import TokenMembership, pack_int_keys, string_ranks, top_k_order
 from src.runtime.realization_registry import (
     resolve_target_height_meters,
     resolve_target_height_ratio_bounds,
@@ -94,7 +99,7 @@ def _scene_creative_tokens(scene_program: Dict[str, Any] | None, intent_spec: Di
     return set(token for token in tokens if token)
 
 
-def _asset_creative_tokens(asset: Dict[str, Any]) -> set[str]:  # collects all style/color/affinity tokens from an asset for matching
+def _compute_asset_creative_tokens(asset: Dict[str, Any]) -> set[str]:  # collects all style/color/affinity tokens from an asset for matching
     tokens = set(_normalize_tokens(asset.get("style_tags", [])))
     tokens.update(_normalize_tokens(asset.get("color_tags", [])))
     tokens.update(_normalize_tokens(asset.get("room_affinities", [])))
@@ -148,6 +153,8 @@ def _asset_allowed_by_scene_metadata(
     intent_spec: Dict[str, Any] | None,
     required_roles: set[str],
     prompt_text: str,
+    scene_tokens: set[str],
+    negative_tokens: set[str],
 ) -> bool:
     if not asset_allowed_for_slot(
         asset,
@@ -160,8 +167,6 @@ def _asset_allowed_by_scene_metadata(
     if role in required_roles:
         return True
 
-    scene_tokens = _scene_affinity_tokens(scene_program, intent_spec)
-    negative_tokens = negative_policy_tokens(scene_program if isinstance(scene_program, dict) and scene_program else dict(intent_spec or {}))
     asset_tokens = _asset_creative_tokens(asset)
     asset_negative_affinities = set(_normalize_tokens(asset.get("negative_scene_affinities", [])))
 
@@ -186,7 +191,6 @@ def filter_candidate_assets(candidate_assets: List[Dict[str, Any]]) -> List[Dict
         semantic_conf = float(asset.get("semantic_confidence", 0.0) or 0.0)
         planner_approved = asset.get("planner_approved") is True
         planner_excluded = asset.get("planner_excluded") is True
-        role = semantic_role_key(asset)
         if classification != "prop":
             continue
         if quest_compatible is not True:
@@ -195,7 +199,11 @@ def filter_candidate_assets(candidate_assets: List[Dict[str, Any]]) -> List[Dict
             continue
         if not planner_approved or planner_excluded:
             continue
-        if not _size_is_plausible_for_role(asset, role):
+        features = precomputed_asset_features(asset)
+        if features is not None:
+            if not features["size_plausible"]:
+                continue
+        elif not _size_is_plausible_for_role(asset, semantic_role_key(asset)):
             continue
         filtered.append(asset)
     return filtered
@@ -253,8 +261,8 @@ def _prompt_tokens(prompt_text: str) -> set[str]:
     return set(_split_text_tokens(str(prompt_text or "").lower()))
 
 
-def _asset_semantic_tokens(asset: Dict[str, Any]) -> set[str]:
-    tokens = _asset_creative_tokens(asset)
+def _compute_asset_semantic_tokens(asset: Dict[str, Any]) -> set[str]:
+    tokens = _compute_asset_creative_tokens(asset)
     tokens.update(_split_text_tokens(str(asset.get("asset_id") or "").lower()))
     role = semantic_role_key(asset)
     if role:
@@ -271,6 +279,187 @@ def _asset_semantic_tokens(asset: Dict[str, Any]) -> set[str]:
     return tokens
 
 
+_TOKEN_SOURCE_FIELDS = (  # every asset field the token sets (including semantic_role_key) read
+    "asset_id",
+    "requested_asset_id",
+    "label",
+    "category",
+    "semantic_concept",
+    "room_role_subtype",
+    "runtime_role",
+    "selected_role",
+    "role",
+    "tags",
+    "style_tags",
+    "color_tags",
+    "room_affinities",
+    "usable_roles",
+)
+_TOKEN_MEMO_SIZE = 131072  # sized for the full planner pool so repeat shortlists never re-tokenize
+
+
+_ABSENT = object()  # marks a field the record does not carry, so the memo rebuilds it without that key rather than with None
+
+
+def _token_source_key(asset: Dict[str, Any]) -> tuple:
+    return tuple(
+        tuple(value) if isinstance(value, list) else value
+        for value in (asset.get(name, _ABSENT) for name in _TOKEN_SOURCE_FIELDS)
+    )
+
+
+@register_taxonomy_memo
+@lru_cache(maxsize=_TOKEN_MEMO_SIZE)
+def _token_sets_for_key(key: tuple) -> tuple[frozenset[str], frozenset[str]]:
+    asset = {name: list(value) if isinstance(value, tuple) else value for name, value in zip(_TOKEN_SOURCE_FIELDS, key) if value is not _ABSENT}
+    return frozenset(_compute_asset_creative_tokens(asset)), frozenset(_compute_asset_semantic_tokens(asset))
+
+
+def _asset_token_sets(asset: Dict[str, Any]) -> tuple[frozenset[str], frozenset[str]]:  # (creative, semantic) tokens, memoized on the fields that feed them
+    features = precomputed_asset_features(asset)
+    if features is not None:
+        return features["creative_tokens"], features["semantic_tokens"]
+    key = _token_source_key(asset)
+    try:
+        return _token_sets_for_key(key)
+    except TypeError:  # unhashable metadata (nested dicts in tags); tokenize without the memo
+        return frozenset(_compute_asset_creative_tokens(asset)), frozenset(_compute_asset_semantic_tokens(asset))
+
+
+def _asset_creative_tokens(asset: Dict[str, Any]) -> frozenset[str]:
+    return _asset_token_sets(asset)[0]
+
+
+def _asset_semantic_tokens(asset: Dict[str, Any]) -> frozenset[str]:
+    return _asset_token_sets(asset)[1]
+
+
+def _asset_role_key(asset: Dict[str, Any]) -> str:
+    features = precomputed_asset_features(asset)
+    return features["role_key"] if features is not None else semantic_role_key(asset)
+
+
+def _asset_confidence(asset: Dict[str, Any]) -> float:
+    return float(asset.get("semantic_confidence", 0.55) or 0.55)
+
+
+class _CatalogColumns:
+    """Shortlist columns for the whole planner pool, built once per pool and taxonomy.
+
+    Rows follow pool order. A shortlist call maps each candidate back to its
+    pool row and gathers these columns, so only candidates that are not
+    unmodified pool records are tokenized per call.
+    """
+
+    def __init__(self, assets: Sequence[Dict[str, Any]]) -> None:
+        self.assets = list(assets)
+        self.rows_by_id: Dict[str, List[int]] = {}
+        for row, asset in enumerate(self.assets):
+            self.rows_by_id.setdefault(str(asset.get("asset_id") or ""), []).append(row)
+        self.tokens = TokenMembership([_asset_semantic_tokens(asset) for asset in self.assets])
+        self.roles = [_asset_role_key(asset) for asset in self.assets]
+        self.confidence = np.array([_asset_confidence(asset) for asset in self.assets], dtype=np.float64)
+        self.no_family = np.array([0 if asset.get("coherence_family_id") else 1 for asset in self.assets], dtype=np.int64)
+        self.id_rank = string_ranks([str(asset.get("asset_id", "")) for asset in self.assets])
+
+    def row_for(self, asset: Dict[str, Any]) -> int:  # pool row holding exactly this record; -1 when it is not an unmodified pool record
+        for row in self.rows_by_id.get(str(asset.get("asset_id") or ""), ()):
+            record = self.assets[row]
+            if record is asset or record == asset:
+                return row
+        return -1
+
+
+_ACTIVE_POOL: tuple[str, List[Dict[str, Any]]] = ("", [])  # (fingerprint, records) of the most recently indexed planner pool
+
+
+def activate_catalog_pool(fingerprint: str, assets: List[Dict[str, Any]]) -> None:  # called by the planner index whenever it (re)builds the pool
+    global _ACTIVE_POOL
+    _ACTIVE_POOL = (fingerprint, assets)
+
+
+@register_taxonomy_memo
+@lru_cache(maxsize=1)
+def _catalog_columns(fingerprint: str) -> _CatalogColumns | None:  # built on the first shortlist after a pool load, then shared by every call
+    active_fingerprint, assets = _ACTIVE_POOL
+    if not fingerprint or fingerprint != active_fingerprint:
+        return None
+    return _CatalogColumns(assets)
+
+
+class _CandidateTokens:  # TokenMembership queries over one call's candidates: pool rows read the catalog index, the rest a small local one
+    def __init__(self, catalog: TokenMembership | None, rows: np.ndarray, local_tokens: List[frozenset[str]]) -> None:
+        self.row_count = len(rows)
+        self._catalog = catalog
+        self._pooled = np.flatnonzero(rows >= 0)
+        self._pool_rows = rows[self._pooled]
+        self._local_positions = np.flatnonzero(rows < 0)
+        self._local = TokenMembership(local_tokens)
+
+    def contains(self, token: str | None) -> np.ndarray:
+        mask = np.zeros(self.row_count, dtype=bool)
+        if not token:
+            return mask
+        if self._catalog is not None and self._pooled.size:
+            mask[self._pooled] = self._catalog.contains(token)[self._pool_rows]
+        if self._local_positions.size:
+            mask[self._local_positions] = self._local.contains(token)
+        return mask
+
+    def overlap(self, query: Iterable[str]) -> np.ndarray:
+        query = set(query)
+        hits = np.zeros(self.row_count, dtype=np.int64)
+        if self._catalog is not None and self._pooled.size:
+            hits[self._pooled] = self._catalog.overlap(query)[self._pool_rows]
+        if self._local_positions.size:
+            hits[self._local_positions] = self._local.overlap(query)
+        return hits
+
+
+class _CandidateColumns:  # columnar view of one shortlist call's filtered candidates, gathered from the catalog columns where possible
+    def __init__(self, assets: Sequence[Dict[str, Any]]) -> None:
+        self.assets = list(assets)
+        catalog = _catalog_columns(_ACTIVE_POOL[0])
+        rows = np.array([catalog.row_for(asset) if catalog is not None else -1 for asset in self.assets], dtype=np.int64)
+        local = [position for position, row in enumerate(rows) if row < 0]
+        self.tokens = _CandidateTokens(
+            catalog.tokens if catalog is not None else None,
+            rows,
+            [_asset_semantic_tokens(self.assets[position]) for position in local],
+        )
+        self.roles = [catalog.roles[row] if row >= 0 else _asset_role_key(asset) for asset, row in zip(self.assets, rows)]
+        self.by_role: Dict[str, List[int]] = {}
+        for position, role in enumerate(self.roles):
+            self.by_role.setdefault(role, []).append(position)
+        if catalog is not None and not local:
+            self.confidence = catalog.confidence[rows]
+            self.no_family = catalog.no_family[rows]
+            self.id_rank = catalog.id_rank[rows]  # pool-wide ranks order any subset the same way
+        else:
+            self.confidence = np.array([_asset_confidence(asset) for asset in self.assets], dtype=np.float64)
+            self.no_family = np.array([0 if asset.get("coherence_family_id") else 1 for asset in self.assets], dtype=np.int64)
+            self.id_rank = string_ranks([str(asset.get("asset_id", "")) for asset in self.assets])
+
+    def role_mask(self, roles: Iterable[str]) -> np.ndarray:
+        mask = np.zeros(len(self.assets), dtype=bool)
+        for role in set(roles):
+            mask[self.by_role.get(role, [])] = True
+        return mask
+
+    def take(self, positions: Iterable[int]) -> List[Dict[str, Any]]:
+        return [self.assets[int(position)] for position in positions]
+
+
+_FAMILY_PREFERENCE_CONCEPTS = {"nightstand", "bedside_surface", "dresser", "wardrobe", "closet", "sleep_storage"}  # slots whose ranking can penalize token-disjoint assets
+
+
+def _slot_has_family_preference(slot: Dict[str, Any]) -> bool:
+    return bool(
+        {canonicalize_semantic_concept(slot.get("concept")), canonicalize_semantic_concept(slot.get("subtype"))}
+        & _FAMILY_PREFERENCE_CONCEPTS
+    )
+
+
 def _slot_family_preference(asset: Dict[str, Any], slot: Dict[str, Any], scene_program: Dict[str, Any] | None) -> int:
     concept = canonicalize_semantic_concept(slot.get("concept"))
     subtype = canonicalize_semantic_concept(slot.get("subtype"))
@@ -295,41 +484,40 @@ def _slot_family_preference(asset: Dict[str, Any], slot: Dict[str, Any], scene_p
     return 0
 
 
-def _slot_match_score(asset: Dict[str, Any], slot: Dict[str, Any], scene_tokens: set[str], prompt_tokens: set[str], scene_program: Dict[str, Any] | None = None) -> tuple[int, int, int, float, str]:
-    asset_tokens = _asset_semantic_tokens(asset)
+def _slot_score_keys(  # sort keys per candidate: family preference, concept/subtype/role hits, style hits, coherence family, confidence, asset_id
+    columns: _CandidateColumns,
+    slot: Dict[str, Any],
+    style_hits: np.ndarray,
+    scene_program: Dict[str, Any] | None,
+) -> List[np.ndarray]:
     concept = slot.get("concept") or ""
     runtime_role = slot.get("runtime_role") or ""
     subtype = slot.get("subtype") or ""
-    concept_hit = 1 if concept and concept in asset_tokens else 0
-    subtype_hit = 1 if subtype and subtype in asset_tokens else 0
-    role_hit = 1 if runtime_role and semantic_role_key(asset) == runtime_role else 0
-    style_hits = len((scene_tokens | prompt_tokens) & asset_tokens)
-    semantic_conf = float(asset.get("semantic_confidence", 0.55) or 0.55)
-    return (
-        _slot_family_preference(asset, slot, scene_program),
-        -(concept_hit * 4 + subtype_hit * 2 + role_hit),
-        -style_hits,
-        0 if asset.get("coherence_family_id") else 1,
-        -semantic_conf,
-        str(asset.get("asset_id", "")),
+    hits = (
+        columns.tokens.contains(concept).astype(np.int64) * 4
+        + columns.tokens.contains(subtype).astype(np.int64) * 2
+        + (columns.role_mask([runtime_role]) if runtime_role else np.zeros(len(columns.assets), dtype=bool)).astype(np.int64)
     )
+    preference = np.zeros(len(columns.assets), dtype=np.int64)
+    if _slot_has_family_preference(slot):
+        preference = np.array([_slot_family_preference(asset, slot, scene_program) for asset in columns.assets], dtype=np.int64)
+    return [
+        pack_int_keys([preference, -hits, -style_hits, columns.no_family]),
+        -columns.confidence,
+        columns.id_rank,
+    ]
 
 
-def _role_match_score(asset: Dict[str, Any], scene_tokens: set[str], prompt_tokens: set[str]) -> tuple[float, int, str]:
-    return (
-        -float(asset.get("semantic_confidence", 0.55) or 0.55),
-        -len((scene_tokens | prompt_tokens) & _asset_semantic_tokens(asset)),
-        str(asset.get("asset_id", "")),
-    )
+def _role_score_keys(columns: _CandidateColumns, style_hits: np.ndarray) -> List[np.ndarray]:  # confidence first, then scene/prompt overlap, then asset_id
+    return [-columns.confidence, -style_hits, columns.id_rank]
 
 
-def _prompt_match_score(asset: Dict[str, Any], prompt_tokens: set[str], scene_tokens: set[str]) -> tuple[int, float, str]:
-    overlap = len(prompt_tokens & _asset_semantic_tokens(asset))
-    return (
-        -overlap,
-        -float(asset.get("semantic_confidence", 0.55) or 0.55),
-        str(asset.get("asset_id", "")),
-    )
+def _remaining_score_keys(columns: _CandidateColumns, requested_roles: List[str], prompt_hits: np.ndarray) -> List[np.ndarray]:  # requested roles first, then prompt overlap, confidence, asset_id
+    return [
+        pack_int_keys([np.where(columns.role_mask(requested_roles), 0, 1), -prompt_hits]),
+        -columns.confidence,
+        columns.id_rank,
+    ]
 
 
 def _append_shortlist_asset(
@@ -360,14 +548,10 @@ def _priority_rank(priority: str) -> int:
     return {"must": 0, "should": 1, "optional": 2}.get(priority, 1)
 
 
-def _prompt_matched_assets(safe_assets: List[Dict[str, Any]], prompt_tokens: set[str]) -> List[Dict[str, Any]]:
+def _prompt_matched_assets(columns: _CandidateColumns, prompt_tokens: set[str]) -> List[Dict[str, Any]]:
     if not prompt_tokens:
         return []
-    return [
-        asset
-        for asset in safe_assets
-        if prompt_tokens & _asset_semantic_tokens(asset)
-    ]
+    return columns.take(np.flatnonzero(columns.tokens.overlap(prompt_tokens) > 0))
 
 
 def build_semantic_candidate_shortlist(  # filters approved assets and packs a small role-covered shortlist for the selection LLM
@@ -387,6 +571,8 @@ def build_semantic_candidate_shortlist(  # filters approved assets and packs a s
     required_roles, optional_roles, _ = _derive_role_fields_from_slots(semantic_slots)
     required_role_set = set(required_roles)
     requested_roles = required_roles + [role for role in optional_roles if role not in required_roles]
+    scene_tokens = _scene_affinity_tokens(scene_program, intent_spec)
+    negative_tokens = negative_policy_tokens(scene_program if isinstance(scene_program, dict) and scene_program else dict(intent_spec or {}))
     scene_filtered_assets = [
         asset
         for asset in safe_assets
@@ -396,6 +582,8 @@ def build_semantic_candidate_shortlist(  # filters approved assets and packs a s
             intent_spec=intent_spec,
             required_roles=required_role_set,
             prompt_text=prompt_text,
+            scene_tokens=scene_tokens,
+            negative_tokens=negative_tokens,
         )
     ]
     if scene_filtered_assets:
@@ -403,17 +591,20 @@ def build_semantic_candidate_shortlist(  # filters approved assets and packs a s
 
     shortlist: List[Dict[str, Any]] = []
     seen_asset_ids: set[str] = set()
-    scene_tokens = _scene_affinity_tokens(scene_program, intent_spec)
     prompt_tokens = _prompt_tokens(prompt_text)
+    columns = _CandidateColumns(safe_assets)
 
     if not semantic_slots:
-        prompt_matched_assets = _prompt_matched_assets(safe_assets, prompt_tokens)
+        prompt_matched_assets = _prompt_matched_assets(columns, prompt_tokens)
         if prompt_matched_assets:
             safe_assets = prompt_matched_assets
+            columns = _CandidateColumns(safe_assets)
 
+    style_hits = columns.tokens.overlap(scene_tokens | prompt_tokens)
+    coverage_limit = min(SHORTLIST_ROLE_COVERAGE_LIMIT, limit)
     for slot in sorted(semantic_slots, key=lambda item: (_priority_rank(item.get("priority", "should")), item["slot_id"])):
-        ranked = sorted(safe_assets, key=lambda asset: _slot_match_score(asset, slot, scene_tokens, prompt_tokens, scene_program))
-        for asset in ranked[: min(SHORTLIST_ROLE_COVERAGE_LIMIT, limit)]:
+        ranked = columns.take(top_k_order(_slot_score_keys(columns, slot, style_hits, scene_program), coverage_limit))
+        for asset in ranked:
             if not asset_allowed_for_slot(
                 asset,
                 scene_program=scene_program,
@@ -427,24 +618,27 @@ def build_semantic_candidate_shortlist(  # filters approved assets and packs a s
             if _append_shortlist_asset(shortlist, seen_asset_ids, asset, limit=limit):
                 return shortlist
 
+    role_keys = _role_score_keys(columns, style_hits)
     for role in requested_roles:
-        role_matches = sorted(
-            [asset for asset in safe_assets if semantic_role_key(asset) == role],
-            key=lambda asset: _role_match_score(asset, scene_tokens, prompt_tokens),
-        )
-        for asset in role_matches[: min(SHORTLIST_ROLE_COVERAGE_LIMIT, limit)]:
+        role_positions = np.asarray(columns.by_role.get(role, []), dtype=np.int64)
+        top = top_k_order([key[role_positions] for key in role_keys], coverage_limit)
+        for asset in columns.take(role_positions[top]):
             if _append_shortlist_asset(shortlist, seen_asset_ids, asset, limit=limit):
                 return shortlist
 
-    remaining_assets = sorted(
-        safe_assets,
-        key=lambda asset: (
-            0 if semantic_role_key(asset) in requested_roles else 1,
-            *_prompt_match_score(asset, prompt_tokens, scene_tokens),
-        ),
-    )
-    for asset in remaining_assets:
-        if _append_shortlist_asset(shortlist, seen_asset_ids, asset, limit=max(1, limit)):
-            break
+    remaining_keys = _remaining_score_keys(columns, requested_roles, columns.tokens.overlap(prompt_tokens))
+    # Rows already shortlisted, or repeating an asset_id, use up ordering slots
+    # without being appended, so the window doubles until the shortlist fills
+    # or every row has been offered. top_k_order prefixes are stable across k.
+    row_count = len(remaining_keys[0]) if remaining_keys else 0
+    offered = 0
+    window = max(1, limit) + len(seen_asset_ids)
+    while offered < row_count and len(shortlist) < max(1, limit):
+        order = top_k_order(remaining_keys, window)
+        for asset in columns.take(order[offered:]):
+            if _append_shortlist_asset(shortlist, seen_asset_ids, asset, limit=max(1, limit)):
+                break
+        offered = len(order)
+        window *= 2
 
     return shortlist
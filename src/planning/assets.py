@@ -4,10 +4,13 @@ from __future__ import annotations
 
 from src.planning.asset_catalog import (
     PLANNER_POOL_PATH,
+    PlannerAssetIndex,
     asset_matches_pack,
     candidate_assets_by_ids,
+    clear_planner_asset_index_cache,
     collect_assets,
     load_planner_pool,
+    planner_asset_index,
 )
 from src.planning.asset_layout import (
     ROOM_BASIC_DIMENSIONS,
@@ -22,6 +25,7 @@ from src.planning.asset_shortlist import (
 
 __all__ = [
     "PLANNER_POOL_PATH",
+    "PlannerAssetIndex",
     "ROOM_BASIC_DIMENSIONS",
     "build_optional_raw_placements",
     "asset_matches_pack",
@@ -29,9 +33,11 @@ __all__ = [
     "build_layout_inputs_from_selected_assets",
     "build_semantic_candidate_shortlist",
     "candidate_assets_by_ids",
+    "clear_planner_asset_index_cache",
     "collect_assets",
     "filter_candidate_assets",
     "load_planner_pool",
+    "planner_asset_index",
 ]
 
 # Keep behavior deterministic so planner/runtime contracts stay stable.
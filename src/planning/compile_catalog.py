@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import sys
+from typing import Any, Dict, List
+
+from src.catalog.pack_registry import PackRegistry, load_pack_registry
+from src.placement.geometry import geometry_profile_from_asset, semantic_role_key
+from src.planning import asset_catalog
+from src.planning.asset_catalog import planner_asset_index
+from src.planning.asset_features import ASSET_FEATURES_PATH, ASSET_FEATURES_VERSION, taxonomy_fingerprint
+from src.planning.asset_shortlist import (
+    _compute_asset_creative_tokens,
+    _compute_asset_semantic_tokens,
+    _size_is_plausible_for_role,
+)
+from src.selection.substitution import _candidate_record
+
+
+"""Offline catalog compile: derives per-asset features once and writes them as a sidecar."""
+
+
+def derive_asset_features(asset: Dict[str, Any]) -> Dict[str, Any]:  # everything the planner, shortlist and layout derive per request from one pool record
+    role = semantic_role_key(asset)
+    return {
+        "role_key": role,
+        "semantic_tokens": sorted(_compute_asset_semantic_tokens(asset)),
+        "creative_tokens": sorted(_compute_asset_creative_tokens(asset)),
+        "geometry_profile": geometry_profile_from_asset(asset),
+        "size_plausible": _size_is_plausible_for_role(asset, role),
+    }
+
+
+def build_asset_feature_sidecar(pool_path: str | pathlib.Path, registry: PackRegistry) -> Dict[str, Any]:
+    index = planner_asset_index(pool_path)
+    candidates: Dict[str, List[Dict[str, Any]]] = {}
+    for pack_id, pack in sorted(registry.packs_by_id.items()):
+        candidates[pack_id] = [_candidate_record(pack_id, pack, asset) for asset in pack.get("assets", [])]
+    return {
+        "version": ASSET_FEATURES_VERSION,
+        "taxonomy_fingerprint": taxonomy_fingerprint(),
+        "pool_fingerprint": index.fingerprint,
+        "registry_fingerprint": registry.fingerprint,
+        "assets": {str(asset["asset_id"]): derive_asset_features(asset) for asset in index.assets},
+        "candidates": candidates,
+    }
+
+
+def write_asset_feature_sidecar(  # compiles the sidecar and swaps it in atomically so readers never see a partial file
+    out_path: str | pathlib.Path = ASSET_FEATURES_PATH,
+    *,
+    pool_path: str | pathlib.Path | None = None,
+    packs_root: str | pathlib.Path = "packs",
+) -> Dict[str, Any]:
+    registry = load_pack_registry(packs_root)
+    payload = build_asset_feature_sidecar(pool_path if pool_path is not None else asset_catalog.PLANNER_POOL_PATH, registry)
+    target = pathlib.Path(out_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = target.with_name(f".{target.name}.tmp")
+    staging.write_text(json.dumps(payload, sort_keys=True), encoding="utf-8")
+    os.replace(staging, target)
+    return {
+        "ok": True,
+        "path": str(target),
+        "asset_count": len(payload["assets"]),
+        "candidate_count": sum(len(records) for records in payload["candidates"].values()),
+        "pool_fingerprint": payload["pool_fingerprint"],
+        "registry_fingerprint": payload["registry_fingerprint"],
+    }
+
+
+def _main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m src.planning.compile_catalog", description="Precompute per-asset planner features into a sidecar artifact.")
+    parser.add_argument("--pool", default=None, help="planner asset pool JSON (default: data/index/planner_asset_pool_v1.json)")
+    parser.add_argument("--packs", default="packs", help="packs directory for substitution candidates")
+    parser.add_argument("--out", default=str(ASSET_FEATURES_PATH), help="sidecar path to write")
+    args = parser.parse_args(argv)
+
+    pool_path = pathlib.Path(args.pool) if args.pool else asset_catalog.PLANNER_POOL_PATH
+    if not pool_path.exists():
+        print(f"File not found: {pool_path}", file=sys.stderr)
+        return 2
+    summary = write_asset_feature_sidecar(args.out, pool_path=pool_path, packs_root=args.packs)
+    print(f"OK: wrote {summary['asset_count']} asset features and {summary['candidate_count']} candidate records to {summary['path']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
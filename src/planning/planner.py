@@ -4,10 +4,16 @@ from typing import Any, Dict, List
 
 from src.llm.planner import request_llm_design_brief, request_llm_intent, request_llm_selection
 from src.catalog.pack_registry import load_pack_registry
+from src.placement.multistart import MAX_LAYOUT_STARTS
 from src.planning import assets as planner_assets
 from src.planning import semantics as planner_semantics
 from src.planning.scene_program_common import _derive_role_fields_from_slots
-from src.planning.utils import normalize_bool as _normalize_bool, seed_from_prompt as _seed_from_prompt
+from src.planning.utils import (
+    ProgressCallback,
+    emit_progress as _emit_progress,
+    normalize_bool as _normalize_bool,
+    seed_from_prompt as _seed_from_prompt,
+)
 from src.catalog.stylekit_registry import load_stylekit_registry
 from src.runtime.decor_plan import build_decor_asset_ids_by_kind, build_decor_capabilities
 from src.world.validation import validate_worldspec
@@ -162,10 +168,13 @@ def _budget_overrides(user_prefs: Dict[str, Any]) -> Dict[str, int]:  # applies
         "max_texture_tier",
         "max_lights",
         "max_clutter_weight",
+        "layout_starts",
     ):
         value = user_prefs.get(key)
         if isinstance(value, int) and value > 0:
             budgets[key] = value
+    if "layout_starts" in budgets:
+        budgets["layout_starts"] = min(budgets["layout_starts"], MAX_LAYOUT_STARTS)  # each start is a full solver pass
     return budgets
 
 
@@ -317,11 +326,18 @@ def _semantic_intent_stage(
     prompt_plan: Dict[str, Any],
     user_prefs: Dict[str, Any],
     bootstrap_candidates: List[Dict[str, Any]],
+    progress: ProgressCallback | None = None,
 ) -> Dict[str, Any]:
     design_brief: Dict[str, Any] = {}
     design_brief_result = request_llm_design_brief(prompt_plan=prompt_plan, user_prefs=user_prefs)
     if design_brief_result.get("ok"):
         design_brief = dict(design_brief_result.get("design_brief") or {})
+    _emit_progress(
+        progress,
+        "design_brief",
+        ok=bool(design_brief_result.get("ok")),
+        latency_ms=design_brief_result.get("latency_ms"),
+    )
 
     intent_result = request_llm_intent(prompt_plan=prompt_plan, user_prefs=user_prefs, design_brief=design_brief)
     if not intent_result.get("ok"):
@@ -349,6 +365,13 @@ def _semantic_intent_stage(
         )
 
     scene_program = planner_semantics.complete_scene_program(validated_intent["scene_program"], prompt_text)
+    _emit_progress(
+        progress,
+        "intent",
+        latency_ms=intent_result.get("latency_ms"),
+        scene_type=scene_program.get("scene_type"),
+        semantic_slot_count=len(list(scene_program.get("semantic_slots") or [])),
+    )
     return {
         "ok": True,
         "design_brief": design_brief,
@@ -377,6 +400,7 @@ def _semantic_selection_stage(
     scene_program: Dict[str, Any],
     intent_spec: Dict[str, Any],
     placement_intent: Dict[str, Any],
+    progress: ProgressCallback | None = None,
 ) -> Dict[str, Any]:
     budgets = _derive_scene_budgets(scene_program, placement_intent, budgets)
     semantic_candidates = planner_assets.build_semantic_candidate_shortlist(
@@ -455,6 +479,13 @@ def _semantic_selection_stage(
             },
         )
 
+    _emit_progress(
+        progress,
+        "selection",
+        latency_ms=selection_result.get("latency_ms"),
+        stylekit_id=validated_plan["stylekit_id"],
+        selected_asset_count=len(validated_plan["assets"]),
+    )
     return {
         "ok": True,
         "budgets": validated_plan["budgets"],
@@ -529,6 +560,9 @@ def _scene_context(scene_program: Dict[str, Any], scene_context_assets: List[Dic
         "grounded_slots": [dict(slot) for slot in scene_program.get("grounded_slots") or [] if isinstance(slot, dict)],
         "focal_object_role": scene_program.get("focal_object_role"),
         "focal_wall": scene_program.get("focal_wall"),
+        "walkway_preservation_intent": dict(scene_program.get("walkway_preservation_intent") or {}),
+        "circulation_preference": scene_program.get("circulation_preference"),
+        "empty_space_preference": scene_program.get("empty_space_preference"),
         **build_decor_capabilities(scene_context_assets),
     }
     context["decor_asset_ids_by_kind"] = build_decor_asset_ids_by_kind(scene_context_assets, scene_context=context)
@@ -587,6 +621,7 @@ def plan_worldspec(  # top-level orchestrator: prompt -> intent -> selection ->
     prompt_text: str,
     seed: int | None = None,
     user_prefs: Dict[str, Any] | None = None,
+    progress: ProgressCallback | None = None,
 ) -> Dict[str, Any]:
     prompt_text = (prompt_text or "").strip()
     user_prefs = user_prefs or {}
@@ -606,6 +641,7 @@ def plan_worldspec(  # top-level orchestrator: prompt -> intent -> selection ->
         prompt_plan=prompt_plan,
         user_prefs=user_prefs,
         bootstrap_candidates=bootstrap_candidates,
+        progress=progress,
     )
     if not intent_stage.get("ok"):
         return intent_stage
@@ -625,6 +661,7 @@ def plan_worldspec(  # top-level orchestrator: prompt -> intent -> selection ->
         scene_program=intent_stage["scene_program"],
         intent_spec=intent_stage["intent_spec"],
         placement_intent=intent_stage["placement_intent"],
+        progress=progress,
     )
     if not selection_stage.get("ok"):
         return selection_stage
@@ -651,6 +688,7 @@ def plan_worldspec(  # top-level orchestrator: prompt -> intent -> selection ->
     )
     placements = placement_stage["placements"]
     placement_plan = placement_stage["placement_plan"]
+    _emit_progress(progress, "placement", placed_count=len(placements))
     if not placements:
         return _no_placements_result(
             planner_backend=planner_backend,
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import hashlib
 import re
-from typing import Any
+from typing import Any, Callable, Dict
+
+ProgressCallback = Callable[[str, Dict[str, Any]], None]  # (stage, fields) listener for long-running pipeline stages
+
 
 # Keep behavior deterministic so planner/runtime contracts stay stable.
 def tokenize(text: str) -> set[str]:  # splits text into lowercase alphanumeric tokens for fuzzy matching
@@ -18,3 +21,11 @@ def normalize_bool(value: Any, default: bool = False) -> bool:  # coerces string
     if isinstance(value, str):
         return value.strip().lower() in {"1", "true", "yes", "on"}
     return default
+
+def emit_progress(progress: ProgressCallback | None, stage: str, **fields: Any) -> None:  # reports a finished stage; listener errors never fail the request
+    if progress is None:
+        return
+    try:
+        progress(stage, fields)
+    except Exception:
+        pass
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from scipy import ndimage
+
+from src.runtime.safe_spawn import (
+    BASE_PLACEMENT_RADIUS,
+    PLAYER_CAPSULE_RADIUS,
+    _block_discs,
+    _extract_room_bounds,
+    _extract_teleportable_bounds,
+    _walkable_raster,
+)
+
+
+"""Walkability grid and spawn-to-furniture reachability for compiled rooms."""
+
+
+REACHABILITY_RESOLUTION = 0.10  # meters per cell; coarse enough to flood-fill a room in a few milliseconds
+APPROACH_REACH = 0.50  # how far past its footprint edge the player may stand and still reach an object
+NON_FLOOR_CONSTRAINTS = {"wall", "surface", "ceiling"}  # mounted/stacked placements never block the floor
+FOUR_CONNECTED = ndimage.generate_binary_structure(2, 1)
+
+
+def _floor_footprints(placements: Any) -> List[Tuple[Dict[str, Any], float, float, float]]:
+    footprints: List[Tuple[Dict[str, Any], float, float, float]] = []
+    if not isinstance(placements, list):
+        return footprints
+    for placement in placements:
+        if not isinstance(placement, dict):
+            continue
+        constraint = placement.get("constraint") if isinstance(placement.get("constraint"), dict) else {}
+        if str(constraint.get("type") or "").strip().lower() in NON_FLOOR_CONSTRAINTS:
+            continue
+        pos = (placement.get("transform") or {}).get("pos")
+        if not isinstance(pos, list) or len(pos) != 3:
+            continue
+        radius = float(((placement.get("geometry_profile") or {}).get("footprint_radius")) or 0.0)
+        footprints.append((placement, float(pos[0]), float(pos[2]), radius if radius > 0.0 else BASE_PLACEMENT_RADIUS))
+    return footprints
+
+
+def _geodesic_steps(walkable: np.ndarray, seeds: np.ndarray) -> np.ndarray:  # BFS step count from the seed cells over 4-connected walkable cells; -1 where unreachable
+    steps = np.full(walkable.shape, -1, dtype=np.int32)
+    frontier = seeds & walkable
+    grown = np.empty_like(frontier)
+    step = 0
+    while frontier.any():
+        steps[frontier] = step
+        step += 1
+        # One BFS layer: shift the frontier a cell along each axis.
+        grown[:] = frontier
+        grown[1:, :] |= frontier[:-1, :]
+        grown[:-1, :] |= frontier[1:, :]
+        grown[:, 1:] |= frontier[:, :-1]
+        grown[:, :-1] |= frontier[:, 1:]
+        frontier = grown & walkable & (steps < 0)
+    return steps
+
+
+def analyze_reachability(phase0_data: Dict[str, Any]) -> Dict[str, Any]:  # rasterizes the walkable floor and checks the player can walk from spawn to every floor object
+    template = phase0_data.get("template")
+    template = template if isinstance(template, dict) else {}
+    room_bounds = _extract_room_bounds(template)
+    teleportable_bounds = _extract_teleportable_bounds(template)
+    spawn = phase0_data.get("safe_spawn") if isinstance(phase0_data.get("safe_spawn"), dict) else {}
+    spawn_pos = spawn.get("pos")
+    raster = (
+        _walkable_raster(teleportable_bounds, room_bounds, REACHABILITY_RESOLUTION)
+        if room_bounds is not None and teleportable_bounds
+        else None
+    )
+    if raster is None or not isinstance(spawn_pos, list) or len(spawn_pos) != 3:
+        return {
+            "ok": False,
+            "reason": "no_walkable_grid" if raster is None else "missing_spawn",
+            "objects": [],
+            "unreachable_placement_ids": [],
+        }
+
+    walkable, xs, zs, resolution = raster
+    footprints = _floor_footprints(phase0_data.get("placements"))
+    # Inflate footprints by the capsule radius so every walkable cell is a
+    # valid standing position for the player center.
+    _block_discs(walkable, xs, zs, ((x, z, radius + PLAYER_CAPSULE_RADIUS) for _, x, z, radius in footprints))
+    regions, region_count = ndimage.label(walkable, structure=FOUR_CONNECTED)
+
+    spawn_x = int(np.clip(round((float(spawn_pos[0]) - xs[0]) / resolution), 0, len(xs) - 1))
+    spawn_z = int(np.clip(round((float(spawn_pos[2]) - zs[0]) / resolution), 0, len(zs) - 1))
+    spawn_blocked = not walkable[spawn_x, spawn_z]
+    if spawn_blocked and walkable.any():  # the spawn search uses coarser occupancy radii; walk from the nearest open cell
+        open_x, open_z = np.nonzero(walkable)
+        nearest = int(np.argmin(((open_x - spawn_x) ** 2) + ((open_z - spawn_z) ** 2)))
+        spawn_x, spawn_z = int(open_x[nearest]), int(open_z[nearest])
+    seeds = np.zeros(walkable.shape, dtype=bool)
+    seeds[spawn_x, spawn_z] = True
+    steps = _geodesic_steps(walkable, seeds)
+    spawn_region = int(regions[spawn_x, spawn_z])
+
+    objects: List[Dict[str, Any]] = []
+    unreachable: List[str] = []
+    for placement, x, z, radius in footprints:
+        reach = radius + PLAYER_CAPSULE_RADIUS + APPROACH_REACH
+        low_x, high_x = np.searchsorted(xs, x - reach), np.searchsorted(xs, x + reach, side="right")
+        low_z, high_z = np.searchsorted(zs, z - reach), np.searchsorted(zs, z + reach, side="right")
+        window_x = (xs[low_x:high_x] - x)[:, None]
+        window_z = (zs[low_z:high_z] - z)[None, :]
+        approach = ((window_x * window_x) + (window_z * window_z) <= reach * reach) & (steps[low_x:high_x, low_z:high_z] >= 0)
+        placement_id = str(placement.get("placement_id") or "")
+        if approach.any():
+            path_length = round(float(steps[low_x:high_x, low_z:high_z][approach].min()) * resolution, 2)
+        else:
+            path_length = None
+            unreachable.append(placement_id)
+        objects.append(
+            {
+                "placement_id": placement_id,
+                "asset_id": str(placement.get("asset_id") or ""),
+                "reachable": path_length is not None,
+                "path_length_meters": path_length,
+            }
+        )
+
+    return {
+        "ok": not unreachable,
+        "reason": "" if not unreachable else "unreachable_objects",
+        "grid_resolution": round(resolution, 3),
+        "walkable_cells": int(walkable.sum()),
+        "region_count": int(region_count),
+        "spawn_blocked": bool(spawn_blocked),
+        "spawn_region_cells": int((regions == spawn_region).sum()) if spawn_region else 0,
+        "reachable_count": len(objects) - len(unreachable),
+        "unreachable_count": len(unreachable),
+        "objects": objects,
+        "unreachable_placement_ids": unreachable,
+    }
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import math
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+from scipy import ndimage
 
 
 PLAYER_CAPSULE_RADIUS = 0.25  # VR player collision radius in meters
@@ -11,6 +14,9 @@ BASE_PLACEMENT_RADIUS = 0.35  # default occupancy radius when asset bounds are u
 RING_STEP = 0.50  # distance between concentric search rings
 ANGLE_SEQUENCE = (0, 45, 90, 135, 180, 225, 270, 315)  # 8 directions tested per ring
 DEFAULT_ROTATION_Y = 180.0  # player faces the back wall by default
+GRID_RESOLUTION = 0.05  # meters per cell when rasterizing the floor for the distance transform
+MAX_GRID_CELLS = 1_000_000  # coarsen the raster beyond this so large multi-plane floors stay bounded
+COMFORT_CLEARANCE = 1.0  # clearance beyond which a spawn is not considered more comfortable; ties go to the point nearest center
 
 
 # Keep behavior deterministic so planner/runtime contracts stay stable.
@@ -150,6 +156,31 @@ def _clamp_to_room(x: float, z: float, room_bounds: Dict[str, float]) -> Tuple[f
     return (round(clamped_x, 3), round(clamped_z, 3))
 
 
+def _floor_edge_distance(x: float, z: float, teleportable_bounds: List[Tuple[float, float, float, float]]) -> float:
+    distance = 0.0
+    for min_x, max_x, min_z, max_z in teleportable_bounds:
+        if min_x <= x <= max_x and min_z <= z <= max_z:
+            distance = max(distance, min(x - min_x, max_x - x, z - min_z, max_z - z))
+    return distance
+
+
+def _spawn_clearance(
+    x: float,
+    z: float,
+    occupancy: List[Tuple[float, float, float]],
+    teleportable_bounds: List[Tuple[float, float, float, float]],
+    room_bounds: Dict[str, float],
+) -> float:  # free distance around the player capsule: to the nearest placement footprint or floor/wall-margin edge
+    clearance = min(
+        _floor_edge_distance(x, z, teleportable_bounds),
+        room_bounds["max_x"] - abs(x),
+        room_bounds["max_z"] - abs(z),
+    )
+    for ox, oz, radius in occupancy:
+        clearance = min(clearance, math.hypot(x - ox, z - oz) - radius)
+    return round(max(clearance - PLAYER_CAPSULE_RADIUS, 0.0), 3)
+
+
 def find_safe_spawn(phase0_data: Dict[str, Any]) -> Dict[str, Any]:  # spirals outward from room center to find an unobstructed teleportable position
     template = phase0_data.get("template")
     template = template if isinstance(template, dict) else {}
@@ -195,6 +226,7 @@ def find_safe_spawn(phase0_data: Dict[str, Any]) -> Dict[str, Any]:  # spirals o
                 "rot": [0.0, DEFAULT_ROTATION_Y, 0.0],
             },
             "attempts": attempts,
+            "clearance": _spawn_clearance(clamped_x, clamped_z, occupancy, teleportable_bounds, room_bounds),
             "reason": "",
         }
 
@@ -204,3 +236,123 @@ def find_safe_spawn(phase0_data: Dict[str, Any]) -> Dict[str, Any]:  # spirals o
         "attempts": attempts,
         "reason": "no_safe_spawn_found",
     }
+
+
+def _walkable_raster(
+    teleportable_bounds: List[Tuple[float, float, float, float]],
+    room_bounds: Dict[str, float],
+    resolution: float = GRID_RESOLUTION,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float] | None:
+    # Cell centers sit on integer multiples of the resolution so the room
+    # center is sampled exactly; one blocked ring of padding makes the grid
+    # edge count as an obstacle for the distance transform.
+    min_x = max(min(bound[0] for bound in teleportable_bounds), -room_bounds["max_x"])
+    max_x = min(max(bound[1] for bound in teleportable_bounds), room_bounds["max_x"])
+    min_z = max(min(bound[2] for bound in teleportable_bounds), -room_bounds["max_z"])
+    max_z = min(max(bound[3] for bound in teleportable_bounds), room_bounds["max_z"])
+    if min_x > max_x or min_z > max_z:
+        return None
+    area_cells = ((max_x - min_x) / resolution + 3) * ((max_z - min_z) / resolution + 3)
+    if area_cells > MAX_GRID_CELLS:
+        resolution *= math.sqrt(area_cells / MAX_GRID_CELLS)
+    xs = np.arange(math.ceil(min_x / resolution) - 1, math.floor(max_x / resolution) + 2) * resolution
+    zs = np.arange(math.ceil(min_z / resolution) - 1, math.floor(max_z / resolution) + 2) * resolution
+    grid_x, grid_z = np.meshgrid(xs, zs, indexing="ij")
+    walkable = np.zeros(grid_x.shape, dtype=bool)
+    for bound_min_x, bound_max_x, bound_min_z, bound_max_z in teleportable_bounds:
+        walkable |= (grid_x >= bound_min_x) & (grid_x <= bound_max_x) & (grid_z >= bound_min_z) & (grid_z <= bound_max_z)
+    walkable &= (np.abs(grid_x) <= room_bounds["max_x"]) & (np.abs(grid_z) <= room_bounds["max_z"])
+    walkable[[0, -1], :] = False
+    walkable[:, [0, -1]] = False
+    return walkable, xs, zs, resolution
+
+
+def _block_discs(
+    free: np.ndarray,
+    xs: np.ndarray,
+    zs: np.ndarray,
+    discs: Iterable[Tuple[float, float, float]],
+) -> None:  # clears every cell whose center lies inside one of the (x, z, radius) discs
+    for ox, oz, radius in discs:
+        low_x = max(int(np.searchsorted(xs, ox - radius)), 0)
+        high_x = int(np.searchsorted(xs, ox + radius, side="right"))
+        low_z = max(int(np.searchsorted(zs, oz - radius)), 0)
+        high_z = int(np.searchsorted(zs, oz + radius, side="right"))
+        if low_x >= high_x or low_z >= high_z:
+            continue
+        window_x = (xs[low_x:high_x] - ox)[:, None]
+        window_z = (zs[low_z:high_z] - oz)[None, :]
+        free[low_x:high_x, low_z:high_z] &= (window_x * window_x) + (window_z * window_z) > radius * radius
+
+
+def find_max_clearance_spawn(phase0_data: Dict[str, Any]) -> Dict[str, Any]:  # rasterizes floor + footprints and takes the roomiest point near center from one distance transform
+    template = phase0_data.get("template")
+    template = template if isinstance(template, dict) else {}
+    room_bounds = _extract_room_bounds(template)
+    if room_bounds is None:
+        return {
+            "ok": False,
+            "spawn": None,
+            "attempts": 0,
+            "reason": "invalid_template_dimensions",
+        }
+
+    teleportable_bounds = _extract_teleportable_bounds(template)
+    if not teleportable_bounds:
+        return {
+            "ok": False,
+            "spawn": None,
+            "attempts": 0,
+            "reason": "no_teleportable_floor",
+        }
+
+    occupancy = _extract_occupancy(phase0_data.get("placements"))
+    raster = _walkable_raster(teleportable_bounds, room_bounds)
+    if raster is None:
+        return {
+            "ok": False,
+            "spawn": None,
+            "attempts": 0,
+            "reason": "no_safe_spawn_found",
+        }
+    free, xs, zs, resolution = raster
+    _block_discs(free, xs, zs, occupancy)
+
+    # Distance from each free cell center to the nearest blocked cell center,
+    # less one cell so rasterization never overstates the room around a point.
+    distance = ndimage.distance_transform_edt(free, sampling=resolution) - resolution
+    clearance = distance - PLAYER_CAPSULE_RADIUS
+    candidates = np.flatnonzero(clearance >= 0.0)
+    if candidates.size == 0:
+        return {
+            "ok": False,
+            "spawn": None,
+            "attempts": 1,
+            "cells_evaluated": int(free.size),
+            "reason": "no_safe_spawn_found",
+        }
+    cell_x, cell_z = np.unravel_index(candidates, free.shape)
+    comfort = np.minimum(clearance.ravel()[candidates], COMFORT_CLEARANCE)
+    center_distance = (xs[cell_x] ** 2) + (zs[cell_z] ** 2)
+    best = candidates[np.lexsort((candidates, center_distance, -comfort))[0]]
+    best_x, best_z = np.unravel_index(best, free.shape)
+    spawn_x = round(float(xs[best_x]), 3) + 0.0
+    spawn_z = round(float(zs[best_z]), 3) + 0.0
+    return {
+        "ok": True,
+        "spawn": {
+            "pos": [spawn_x, 0.0, spawn_z],
+            "rot": [0.0, DEFAULT_ROTATION_Y, 0.0],
+        },
+        "attempts": 1,  # one distance transform, not a retry loop; the raster size is reported separately
+        "cells_evaluated": int(free.size),
+        "clearance": _spawn_clearance(spawn_x, spawn_z, occupancy, teleportable_bounds, room_bounds),
+        "reason": "",
+    }
+
+
+DEFAULT_SPAWN_ENGINE = "ring_search"
+SPAWN_ENGINES: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "ring_search": find_safe_spawn,
+    "distance_transform": find_max_clearance_spawn,
+}
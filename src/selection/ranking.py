@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+
+"""Columnar scoring helpers shared by shortlist and substitution ranking."""
+
+
+class TokenMembership:
+    """Sparse asset x token membership matrix stored column-wise.
+
+    Each token maps to the sorted row positions that carry it, so overlap counts
+    for a query are one bincount over the matched columns instead of a Python
+    set intersection per asset.
+    """
+
+    def __init__(self, token_rows: Sequence[Iterable[str]]) -> None:
+        self.row_count = len(token_rows)
+        columns: Dict[str, List[int]] = {}
+        for row, tokens in enumerate(token_rows):
+            for token in set(tokens):
+                columns.setdefault(token, []).append(row)
+        self._columns = {token: np.asarray(rows, dtype=np.int64) for token, rows in columns.items()}
+
+    def rows(self, token: str) -> np.ndarray:
+        return self._columns.get(token, np.empty(0, dtype=np.int64))
+
+    def contains(self, token: str | None) -> np.ndarray:  # bool column: which rows carry the token
+        mask = np.zeros(self.row_count, dtype=bool)
+        if token:
+            mask[self.rows(token)] = True
+        return mask
+
+    def overlap(self, query: Iterable[str]) -> np.ndarray:  # per-row |row tokens & set(query)|
+        hits = [self._columns[token] for token in set(query) if token in self._columns]
+        if not hits:
+            return np.zeros(self.row_count, dtype=np.int64)
+        return np.bincount(np.concatenate(hits), minlength=self.row_count)
+
+
+def string_ranks(values: Sequence[str]) -> np.ndarray:  # rank of each string under Python's ordering; equal strings share a rank
+    if not values:
+        return np.empty(0, dtype=np.int64)
+    _, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return inverse.astype(np.int64).reshape(-1)
+
+
+def pack_int_keys(columns: Sequence[np.ndarray]) -> np.ndarray:  # folds small-range integer sort keys (most significant first) into one int64 mixed-radix key
+    packed = np.zeros(len(columns[0]) if columns else 0, dtype=np.int64)
+    for column in columns:
+        column = np.asarray(column, dtype=np.int64)
+        if column.size == 0:
+            continue
+        low = int(column.min())
+        span = int(column.max()) - low + 1
+        packed = packed * span + (column - low)
+    return packed
+
+
+def top_k_order(keys: Sequence[np.ndarray], k: int) -> np.ndarray:
+    # Row positions of the k smallest rows under lexicographic order of `keys`
+    # (most significant first), identical to sorted(...)[:k]. argpartition on
+    # the primary key bounds the candidate set; only rows tied with the k-th
+    # primary value or better are fully sorted.
+    count = len(keys[0]) if keys else 0
+    if k <= 0 or count == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < count:
+        primary = keys[0]
+        kth_value = primary[np.argpartition(primary, k - 1)[k - 1]]
+        pool = np.flatnonzero(primary <= kth_value)
+    else:
+        pool = np.arange(count)
+    order = np.lexsort([np.asarray(key)[pool] for key in reversed(keys)])
+    return pool[order[:k]]
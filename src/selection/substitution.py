@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import json
 import re
-from collections import Counter
+import threading
+import weakref
+from collections import Counter, OrderedDict
 from dataclasses import dataclass, field
 from typing import Any, Dict, Iterable, List, Tuple
 
+import numpy as np
+
 from src.catalog.pack_registry import PackRegistry
 from src.placement.geometry import canonicalize_semantic_role, semantic_role_key
 from src.placement.semantic_taxonomy import substitution_family_for_tokens
+from src.planning.asset_features import precomputed_candidates
+from src.selection.ranking import TokenMembership, pack_int_keys, string_ranks, top_k_order
 
 
 PLACEHOLDER_ASSET_ID = "placeholder_cube"  # fallback asset when no viable substitute is found
@@ -15,6 +22,8 @@ PLACEHOLDER_ASSET_ID = "placeholder_cube"  # fallback asset when no viable subst
 _POLY_ORDER = {"low": 0, "mid": 1, "high": 2}  # hierarchy of polygon counts for downgrade comparisons
 _POLY_HINT_ORDER = {"low": 0, "medium": 1, "mid": 1, "high": 2}  # alternative namings normalized for polygon hints
 _PERF_HINT_ORDER = {"low": 0, "medium": 1, "high": 2}  # rank order classification for overall performance cost
+REGISTRY_STATE_CACHE_SIZE = 4  # registries whose candidate buckets and resolutions are kept warm
+RESOLUTION_MEMO_SIZE = 4096  # full resolutions remembered per registry
 
 
 @dataclass(frozen=True)
@@ -242,35 +251,41 @@ def _coherence_filter(  # gates candidates on quest compatibility, role, visual
     return out, dict(rejections)
 
 
-def _score_candidate(candidate: Dict[str, Any], requested: Dict[str, Any], room_theme: Dict[str, Any] | None) -> Tuple:  # multi-factor sort key: tag overlap, category, style, color, perf
-    requested_tags = requested.get("tags", [])
-    requested_category = requested.get("category")
+def _score_columns(candidates: List[Dict[str, Any]], requested: Dict[str, Any], room_theme: Dict[str, Any] | None) -> List[np.ndarray]:  # multi-factor sort keys: tag overlap, category, style, color, perf, then asset_id
     room_style, room_era, room_colors = _room_theme_sets(room_theme)
+    tags = TokenMembership([candidate.get("tags", []) for candidate in candidates])
+    style_tags = TokenMembership([candidate.get("style_tags", []) for candidate in candidates])
+    era_tags = TokenMembership([candidate.get("era_tags", []) for candidate in candidates])
+    color_tags = TokenMembership([candidate.get("color_tags", []) for candidate in candidates])
 
-    shared_tags = _safe_tag_overlap(candidate.get("tags", []), requested_tags)
-    category_match = 1 if requested_category and candidate.get("category") == requested_category else 0
-
-    style_overlap = _safe_tag_overlap(candidate.get("style_tags", []), requested.get("style_tags", []))
-    era_overlap = _safe_tag_overlap(candidate.get("era_tags", []), requested.get("era_tags", []))
-    room_style_overlap = _safe_tag_overlap(candidate.get("style_tags", []), room_style)
-    room_era_overlap = _safe_tag_overlap(candidate.get("era_tags", []), room_era)
-    style_score = style_overlap + era_overlap + room_style_overlap + room_era_overlap
-
-    color_score = _safe_tag_overlap(candidate.get("color_tags", []), requested.get("color_tags", []))
-    color_score += _safe_tag_overlap(candidate.get("color_tags", []), room_colors)
-
-    texture_tier = int(candidate.get("texture_tier", 1))
-    perf_rank = int(candidate.get("perf_rank", 1))
-
-    return (
-        -shared_tags,
-        -category_match,
-        -style_score,
-        -color_score,
-        texture_tier,
-        perf_rank,
-        str(candidate.get("asset_id", "")),
+    requested_category = requested.get("category")
+    category_match = np.array(
+        [1 if requested_category and candidate.get("category") == requested_category else 0 for candidate in candidates],
+        dtype=np.int64,
     )
+    style_score = (
+        style_tags.overlap(requested.get("style_tags", []))
+        + era_tags.overlap(requested.get("era_tags", []))
+        + style_tags.overlap(room_style)
+        + era_tags.overlap(room_era)
+    )
+    color_score = color_tags.overlap(requested.get("color_tags", [])) + color_tags.overlap(room_colors)
+    texture_tier = np.array([int(candidate.get("texture_tier", 1)) for candidate in candidates], dtype=np.int64)
+    perf_rank = np.array([int(candidate.get("perf_rank", 1)) for candidate in candidates], dtype=np.int64)
+
+    return [
+        pack_int_keys(
+            [
+                -tags.overlap(requested.get("tags", [])),
+                -category_match,
+                -style_score,
+                -color_score,
+                texture_tier,
+                perf_rank,
+            ]
+        ),
+        string_ranks([str(candidate.get("asset_id", "")) for candidate in candidates]),
+    ]
 
 
 def _build_coherence_checks(  # verifies if the final substituted asset adhered to style/poly constraints
@@ -324,7 +339,7 @@ def _try_exact_resolution(  # attempts fast-path where requested asset is presen
     room_theme: Dict[str, Any] | None,
     registry: PackRegistry,
     rejected_counts: Counter[str],
-) -> Dict[str, Any] | None:
+) -> ResolvedAsset | None:
     existing = registry.assets_by_id.get(requested_asset_id)
     if not existing:
         return None
@@ -349,13 +364,98 @@ def _try_exact_resolution(  # attempts fast-path where requested asset is presen
         rejected_candidate_counts=dict(rejected_counts),
         rationale=["Requested asset passed deterministic pack and coherence checks."],
         selection_backend="exact",
-    ).as_dict()
+    )
+
+
+class _PackCandidates:  # one pack's candidate records in manifest order, bucketed by normalized tag
+    def __init__(self, records: List[Dict[str, Any]]) -> None:
+        self.records = records
+        self.by_tag: Dict[str, List[int]] = {}
+        for position, record in enumerate(records):
+            for tag in set(record.get("tags", [])):
+                self.by_tag.setdefault(tag, []).append(position)
+
+    def tagged(self, tags: set[str]) -> List[Dict[str, Any]]:  # records sharing at least one tag, in manifest order
+        positions: set[int] = set()
+        for tag in tags:
+            positions.update(self.by_tag.get(tag, ()))
+        return [self.records[position] for position in sorted(positions)]
+
+
+class _RegistryState:
+    """Candidate buckets and memoized resolutions for one registry.
+
+    Everything here is derived from the registry's contents, so it is only
+    valid while the registry is unchanged; shared registries are read-only by
+    contract and private ones are keyed by identity as well as fingerprint.
+    """
+
+    def __init__(self, registry: PackRegistry) -> None:
+        precomputed = precomputed_candidates(registry.fingerprint)
+        self.packs: Dict[str, _PackCandidates] = {}
+        for pack_id, pack in registry.packs_by_id.items():
+            records = precomputed.get(pack_id) if precomputed is not None else None
+            if records is None:
+                records = [_candidate_record(pack_id, pack, asset) for asset in pack.get("assets", [])]
+            self.packs[pack_id] = _PackCandidates(records)
+        self.resolutions: OrderedDict[str, ResolvedAsset] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def remember(self, key: str, resolved: ResolvedAsset) -> None:
+        with self.lock:
+            self.resolutions[key] = resolved
+            self.resolutions.move_to_end(key)
+            while len(self.resolutions) > RESOLUTION_MEMO_SIZE:
+                self.resolutions.popitem(last=False)
+
+    def recall(self, key: str) -> ResolvedAsset | None:
+        with self.lock:
+            resolved = self.resolutions.get(key)
+            if resolved is not None:
+                self.resolutions.move_to_end(key)
+            return resolved
+
+
+_REGISTRY_STATES: OrderedDict[int, Tuple[Any, str, _RegistryState]] = OrderedDict()  # id(registry) -> (weakref, fingerprint, state)
+_REGISTRY_STATES_LOCK = threading.Lock()
+
+
+def _registry_state(registry: PackRegistry) -> _RegistryState | None:  # None for registries without a fingerprint (built by hand), which are never cached
+    if not registry.fingerprint:
+        return None
+    key = id(registry)
+    with _REGISTRY_STATES_LOCK:
+        cached = _REGISTRY_STATES.get(key)
+        if cached is not None and cached[0]() is registry and cached[1] == registry.fingerprint:
+            _REGISTRY_STATES.move_to_end(key)
+            return cached[2]
+    state = _RegistryState(registry)
+    with _REGISTRY_STATES_LOCK:
+        _REGISTRY_STATES[key] = (weakref.ref(registry), registry.fingerprint, state)
+        _REGISTRY_STATES.move_to_end(key)
+        while len(_REGISTRY_STATES) > REGISTRY_STATE_CACHE_SIZE:
+            _REGISTRY_STATES.popitem(last=False)
+    return state
+
+
+def clear_substitution_caches() -> None:  # drops every cached candidate bucket and memoized resolution
+    with _REGISTRY_STATES_LOCK:
+        _REGISTRY_STATES.clear()
+
+
+def _resolution_key(*parts: Any) -> str | None:  # canonical JSON of the call arguments; None when they cannot be serialized deterministically
+    try:
+        return json.dumps(parts, sort_keys=True, separators=(",", ":"), default=repr)
+    except (TypeError, ValueError):
+        return None
 
 
-def _collect_candidate_pools(  # splits all known candidates into shared-pack (preferred) and cross-pack (fallback) buckets
+def _collect_candidate_pools(  # splits the tag-matching candidates into shared-pack (preferred) and cross-pack (fallback) buckets
     requested_asset_id: str,
     selected_pack_ids: List[str],
     registry: PackRegistry,
+    requested_tags: set[str],
+    state: _RegistryState | None = None,
 ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     requested_pack_hint = _asset_pack_id_from_hint(requested_asset_id, registry)
     shared_pack_candidates: List[Dict[str, Any]] = []
@@ -365,12 +465,16 @@ def _collect_candidate_pools(  # splits all known candidates into shared-pack (p
         pack = registry.packs_by_id.get(pack_id)
         if not pack:
             continue
-        for asset in pack.get("assets", []):
-            candidate = _candidate_record(pack_id, pack, asset)
-            if requested_pack_hint and pack_id == requested_pack_hint:
-                shared_pack_candidates.append(candidate)
-            else:
-                cross_pack_candidates.append(candidate)
+        if state is not None:
+            candidates = state.packs[pack_id].tagged(requested_tags) if requested_tags else state.packs[pack_id].records
+        else:
+            candidates = [_candidate_record(pack_id, pack, asset) for asset in pack.get("assets", [])]
+            if requested_tags:
+                candidates = [candidate for candidate in candidates if requested_tags & set(candidate.get("tags", []))]
+        if requested_pack_hint and pack_id == requested_pack_hint:
+            shared_pack_candidates.extend(candidates)
+        else:
+            cross_pack_candidates.extend(candidates)
 
     return shared_pack_candidates, cross_pack_candidates
 
@@ -383,7 +487,8 @@ def _deterministic_substitution_selection(  # final decider which chooses highes
     if not filtered_candidates:
         return {"ok": False}
 
-    ranked = sorted(filtered_candidates, key=lambda candidate: _score_candidate(candidate, requested, room_theme))
+    top = top_k_order(_score_columns(filtered_candidates, requested, room_theme), 3)
+    ranked = [filtered_candidates[position] for position in top]
     selected = ranked[0]
     alternatives = [str(candidate.get("asset_id", "")) for candidate in ranked[:3] if candidate.get("asset_id")]
     return {
@@ -394,14 +499,15 @@ def _deterministic_substitution_selection(  # final decider which chooses highes
     }
 
 
-def resolve_asset_or_substitute(  # main entry: tries exact match, then shared-pack substitute, then cross-pack, then placeholder
+def _resolve(  # tries exact match, then shared-pack substitute, then cross-pack, then placeholder
     requested_asset_id: str,
     requested_tags: List[str] | None,
     pack_ids: List[str],
     registry: PackRegistry,
-    requested_meta: Dict[str, Any] | None = None,
-    room_theme: Dict[str, Any] | None = None,
-) -> Dict[str, Any]:
+    requested_meta: Dict[str, Any] | None,
+    room_theme: Dict[str, Any] | None,
+    state: _RegistryState | None,
+) -> ResolvedAsset:
     selected_pack_ids, requested_invalid_packs = _resolve_pack_scope(pack_ids, registry)
     requested = _derive_requested_profile(
         requested_asset_id=requested_asset_id,
@@ -433,23 +539,19 @@ def resolve_asset_or_substitute(  # main entry: tries exact match, then shared-p
             rejected_candidate_counts=dict(rejected_counts),
             rationale=["Requested asset is preserved from the approved planner pool even though it is not in the compile registry."],
             selection_backend="passthrough",
-        ).as_dict()
+        )
 
+    # Only candidates sharing a requested tag are eligible; the tag buckets
+    # hand those over directly instead of scanning every pack asset.
     shared_pack_candidates, cross_pack_candidates = _collect_candidate_pools(
         requested_asset_id=requested_asset_id,
         selected_pack_ids=selected_pack_ids,
         registry=registry,
+        requested_tags=set(requested.get("tags", [])),
+        state=state,
     )
 
-    requested_tag_set = set(requested.get("tags", []))
-
-    def _tag_gate(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        if not requested_tag_set:
-            return candidates
-        with_overlap = [candidate for candidate in candidates if requested_tag_set & set(candidate.get("tags", []))]
-        return with_overlap if with_overlap else []
-
-    for candidate_pool in (_tag_gate(shared_pack_candidates), _tag_gate(cross_pack_candidates)):
+    for candidate_pool in (shared_pack_candidates, cross_pack_candidates):
         if not candidate_pool:
             continue
 
@@ -470,7 +572,7 @@ def resolve_asset_or_substitute(  # main entry: tries exact match, then shared-p
                 alternatives=deterministic_result["alternatives"],
                 rationale=deterministic_result["rationale"],
                 selection_backend="deterministic",
-            ).as_dict()
+            )
 
     return ResolvedAsset(
         resolved_asset_id=PLACEHOLDER_ASSET_ID,
@@ -481,4 +583,22 @@ def resolve_asset_or_substitute(  # main entry: tries exact match, then shared-p
         alternatives=[],
         rationale=["No deterministic candidate survived pack, tag, and coherence filtering."],
         selection_backend="deterministic",
-    ).as_dict()
+    )
+
+
+def resolve_asset_or_substitute(  # main entry: memoized per registry on the full argument set, since compiles repeat the same requests
+    requested_asset_id: str,
+    requested_tags: List[str] | None,
+    pack_ids: List[str],
+    registry: PackRegistry,
+    requested_meta: Dict[str, Any] | None = None,
+    room_theme: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    state = _registry_state(registry)
+    key = _resolution_key(requested_asset_id, requested_tags, pack_ids, requested_meta, room_theme) if state is not None else None
+    resolved = state.recall(key) if state is not None and key is not None else None
+    if resolved is None:
+        resolved = _resolve(requested_asset_id, requested_tags, pack_ids, registry, requested_meta, room_theme, state)
+        if state is not None and key is not None:
+            state.remember(key, resolved)
+    return resolved.as_dict()
@@ -9,6 +9,8 @@ from typing import Any, Dict, List
 
 import httpx
 
+from src.compilation.artifact_store import artifact_store
+
 
 DEFAULT_ELEVENLABS_BASE_URL = "https://api.elevenlabs.io"
 DEFAULT_VOICE_ID = "JBFqnCBsd6RMkjVDRZzb"
@@ -417,7 +419,9 @@ def build_tts_artifact(
     artifact_dir = pathlib.Path(build_root) / "voice_cache"
     artifact_dir.mkdir(parents=True, exist_ok=True)
     artifact_path = artifact_dir / f"{cache_key}.{extension}"
+    store = artifact_store(build_root)
     if artifact_path.exists():
+        store.touch(artifact_path)
         return {
             "ok": True,
             "cache_key": cache_key,
@@ -429,7 +433,8 @@ def build_tts_artifact(
     synthesized = synthesize_tts_bytes(normalized_text, user_prefs=user_prefs)
     if not synthesized.get("ok"):
         return synthesized
-    artifact_path.write_bytes(bytes(synthesized["audio_bytes"]))
+    store.put(artifact_path, bytes(synthesized["audio_bytes"]))  # atomic, so the audio URL never serves a partial file
+    store.collect_in_background()
     return {
         "ok": True,
         "cache_key": cache_key,
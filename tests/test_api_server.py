@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
 import json
+import os
 
 import pytest
 
 from src.api import server as api_server
+from src.compilation.artifact_store import ArtifactStore
+from src.compilation.compile_cache import write_if_changed, write_precompressed
+from src.compilation.phase0_binary import PHASE0_BINARY_VERSION
 from src.contracts.runtime import validate_api_response_contract
 from tests.semantic_test_utils import inline_semantic_prefs
 
@@ -264,6 +270,144 @@ def test_run_plan_and_compile_maps_manifest_failures(monkeypatch, tmp_path):
     assert any(error["path"] == "$.manifest" for error in result["errors"])
 
 
+def _fake_staged_pipeline(monkeypatch, tmp_path):
+    def fake_plan_worldspec(prompt_text, seed=None, user_prefs=None, progress=None):
+        for stage in ("design_brief", "intent", "selection", "placement"):
+            progress(stage, {})
+        return {"ok": True, "worldspec": {"worldspec_version": "0.1", "placements": []}, "planner_backend": "llm"}
+
+    def fake_compile_phase0(*args, **kwargs):
+        return {"ok": True, "world_id": "world_fake", "safe_spawn": {"position": {"x": 0, "y": 0, "z": 0}}}
+
+    monkeypatch.setattr(api_server, "plan_worldspec", fake_plan_worldspec)
+    monkeypatch.setattr(api_server, "compile_phase0", fake_compile_phase0)
+    monkeypatch.setattr(api_server, "_write_manifest", lambda *args, **kwargs: tmp_path / "manifest.json")
+
+
+def test_run_plan_and_compile_reports_stage_progress(monkeypatch, tmp_path):
+    _fake_staged_pipeline(monkeypatch, tmp_path)
+    seen = []
+    result = api_server.run_plan_and_compile(
+        "test prompt",
+        build_root=tmp_path,
+        progress=lambda stage, fields: seen.append(stage),
+    )
+    assert result["ok"] is True
+    assert seen == ["design_brief", "intent", "selection", "placement", "compile", "manifest"]
+
+
+def test_run_plan_and_compile_spends_spare_latency_on_refinement(monkeypatch, tmp_path):
+    _fake_staged_pipeline(monkeypatch, tmp_path)
+    budgets = []
+
+    def recording_compile_phase0(*args, **kwargs):
+        budgets.append(kwargs.get("refine_budget_seconds"))
+        return {"ok": True, "world_id": "world_fake", "safe_spawn": {"position": {"x": 0, "y": 0, "z": 0}}}
+
+    monkeypatch.setattr(api_server, "compile_phase0", recording_compile_phase0)
+    monkeypatch.delenv(api_server.LATENCY_BUDGET_ENV, raising=False)
+    for prefs in ({}, {"latency_budget_ms": 60000}, {"latency_budget_ms": 600}):
+        assert api_server.run_plan_and_compile("test prompt", user_prefs=prefs, build_root=tmp_path)["ok"] is True
+    assert budgets[0] is None  # no latency budget, no refinement
+    assert budgets[1] == api_server.REFINE_MAX_S
+    assert 0.0 < budgets[2] <= 0.1
+
+    monkeypatch.setattr(api_server.time, "monotonic", lambda: 1000.0)
+    assert api_server._refine_budget_seconds({"latency_budget_ms": 5000}, request_started=990.0) is None  # slow LLM stages: skip it
+    assert api_server._refine_budget_seconds({"latency_budget_ms": 3000}, request_started=998.0) == pytest.approx(1.0 - api_server.REFINE_RESERVE_S)
+
+
+def test_run_plan_and_compile_collapses_concurrent_duplicates(monkeypatch, tmp_path):
+    import threading
+    import time
+
+    _fake_staged_pipeline(monkeypatch, tmp_path)
+    entered = threading.Event()
+    release = threading.Event()
+    calls = {"count": 0}
+
+    def blocking_plan_worldspec(prompt_text, seed=None, user_prefs=None, progress=None):
+        calls["count"] += 1
+        progress("design_brief", {})
+        entered.set()
+        release.wait(timeout=5)
+        return {"ok": True, "worldspec": {"worldspec_version": "0.1", "placements": []}, "planner_backend": "llm"}
+
+    monkeypatch.setattr(api_server, "plan_worldspec", blocking_plan_worldspec)
+    results = {}
+    follower_stages = []
+
+    def submit(name, prompt, progress=None):
+        results[name] = api_server.run_plan_and_compile(prompt, optional_seed=3, build_root=tmp_path, progress=progress)
+
+    leader = threading.Thread(target=submit, args=("leader", "cozy   room"))
+    leader.start()
+    assert entered.wait(timeout=5)
+    follower = threading.Thread(target=submit, args=("follower", "cozy room", lambda stage, fields: follower_stages.append(stage)))
+    follower.start()
+    deadline = time.monotonic() + 5
+    while not any(flight.followers for flight in api_server._GENERATION_FLIGHTS._flights.values()):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    release.set()
+    leader.join(timeout=5)
+    follower.join(timeout=5)
+
+    assert calls["count"] == 1
+    assert results["leader"]["ok"] is True and results["follower"]["ok"] is True
+    assert results["follower"]["world_id"] == results["leader"]["world_id"]
+    assert results["follower"]["request_id"] != results["leader"]["request_id"]
+    assert results["follower"]["trace_id"] != results["leader"]["trace_id"]
+    assert results["follower"]["deduplicated"] is True
+    assert "deduplicated" not in results["leader"]
+    assert follower_stages == ["design_brief", "compile", "manifest"]
+    assert api_server._GENERATION_FLIGHTS.in_flight() == 0
+
+
+@pytest.mark.skipif(api_server.FastAPI is None, reason="FastAPI is not installed")
+def test_plan_and_compile_job_streams_stage_events(monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+
+    _fake_staged_pipeline(monkeypatch, tmp_path)
+    client = TestClient(api_server.app)
+    submitted = client.post("/plan_and_compile/jobs", json={"prompt_text": "test prompt"})
+    assert submitted.status_code == 202
+    job = submitted.json()
+    assert job["job_id"].startswith("job_")
+
+    events = []
+    with client.stream("GET", job["events_url"]) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        for line in response.iter_lines():
+            if line.startswith("data: "):
+                events.append(json.loads(line[len("data: "):]))
+    assert [event["event"] for event in events] == [
+        "design_brief",
+        "intent",
+        "selection",
+        "placement",
+        "compile",
+        "manifest",
+        "result",
+    ]
+    assert events[-1]["result"]["world_id"] == "world_fake"
+
+    status = client.get(job["status_url"]).json()
+    assert status["status"] == "succeeded"
+    assert status["completed_stages"][-1] == "manifest"
+
+
+@pytest.mark.skipif(api_server.FastAPI is None, reason="FastAPI is not installed")
+def test_plan_and_compile_job_rejects_empty_prompt_without_job():
+    from fastapi.testclient import TestClient
+
+    client = TestClient(api_server.app)
+    response = client.post("/plan_and_compile/jobs", json={"prompt_text": "  "})
+    assert response.status_code == 400
+    _assert_failure_contract_v02(response.json())
+    assert client.get("/plan_and_compile/jobs/job_missing").status_code == 404
+
+
 def test_run_plan_and_compile_rejects_non_llm_prompt_mode(tmp_path):
     result = api_server.run_plan_and_compile(
         prompt_text="clean room",
@@ -419,3 +563,153 @@ def test_fastapi_endpoint_spawn_failure_is_422(monkeypatch):
     payload = response.json()
     _assert_failure_contract_v02(payload)
     assert payload["error_code"] == "spawn_failed"
+
+
+def test_reference_manifest_points_at_phase0_instead_of_inlining_it(tmp_path):
+    phase0_data = {"world_id": "world_ref", "phase": "phase0", "placements": [{"asset_id": "chair_01"}], "shell_material_bindings": {}}
+    phase0_json = json.dumps(phase0_data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    compile_result = {
+        "ok": True,
+        "world_id": "world_ref",
+        "phase0_artifact": str(tmp_path / "world_ref" / "phase0.json"),
+        "phase0_data": phase0_data,
+        "phase0_json": phase0_json,
+        "phase0_binary_artifact": str(tmp_path / "world_ref" / "phase0.bin"),
+        "phase0_binary": b"JIP0-test",
+        "safe_spawn": {"pos": [0.0, 0.0, 0.0], "rot": [0.0, 180.0, 0.0]},
+        "teleportable_surfaces": 1,
+    }
+    worldspec = {"worldspec_version": "0.1", "template_id": "room_basic", "placements": []}
+
+    inline_path = api_server._write_manifest(tmp_path, "world_ref", worldspec, compile_result)
+    assert api_server._manifest_url("world_ref", inline_path) == "/build/world_ref/manifest.json"
+    inline = json.loads(inline_path.read_text(encoding="utf-8"))
+    assert inline["phase0_data"] == phase0_data
+    assert "manifest_mode" not in inline
+
+    path = api_server._write_manifest(tmp_path, "world_ref", worldspec, compile_result, manifest_mode="reference")
+    assert api_server._manifest_url("world_ref", path) == "/build/world_ref/manifest.reference.json"
+    assert json.loads(inline_path.read_text(encoding="utf-8")) == inline  # each mode keeps its own file
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    assert "phase0_data" not in manifest
+    assert manifest["manifest_mode"] == "reference"
+    assert manifest["phase0_url"] == "/build/world_ref/phase0.json"
+    assert manifest["phase0_size_bytes"] == len(phase0_json)
+    assert manifest["phase0_sha256"] == hashlib.sha256(phase0_json).hexdigest()
+    assert manifest["safe_spawn"] == compile_result["safe_spawn"]
+    assert manifest["readiness"]["portal_allowed"] is True
+    assert set(manifest["stylekit"]) >= {"stylekit_id", "lighting", "palette", "skybox"}
+    assert manifest["phase0_binary"] == {
+        "url": "/build/world_ref/phase0.bin",
+        "format_version": PHASE0_BINARY_VERSION,
+        "sha256": hashlib.sha256(b"JIP0-test").hexdigest(),
+        "size_bytes": len(b"JIP0-test"),
+    }
+
+
+def test_run_plan_and_compile_rejects_unknown_manifest_mode():
+    result = api_server.run_plan_and_compile("test prompt", user_prefs={"manifest_mode": "streaming"})
+    _assert_failure_contract_v02(result)
+    assert result["error_code"] == "invalid_request"
+    assert any(error["path"] == "$.user_prefs.manifest_mode" for error in result["errors"])
+
+
+def test_server_shutdown_closes_pooled_llm_client():
+    from fastapi.testclient import TestClient
+    from src.llm import transport
+
+    with TestClient(api_server.app) as client:
+        pooled = transport.http_client()
+        assert client.get("/healthz").status_code == 200
+        assert not pooled.is_closed
+    assert pooled.is_closed
+    assert transport.http_client() is not pooled
+
+
+def test_build_mount_serves_precompressed_artifacts_with_content_etags(tmp_path):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.api.build_static import BuildStaticFiles
+
+    payload = json.dumps({"placements": list(range(2000))}).encode("utf-8")
+    artifact = tmp_path / "world_gz" / "phase0.json"
+    write_if_changed(artifact, payload)
+    write_precompressed(artifact, payload)
+    assert gzip.decompress((tmp_path / "world_gz" / "phase0.json.gz").read_bytes()) == payload
+    (tmp_path / "voice_cache").mkdir()
+    (tmp_path / "voice_cache" / "abc123.mp3").write_bytes(b"ID3")
+
+    app = FastAPI()
+    app.mount("/build", BuildStaticFiles(directory=str(tmp_path)), name="build")
+    client = TestClient(app)
+
+    compressed = client.get("/build/world_gz/phase0.json", headers={"Accept-Encoding": "gzip"})
+    assert compressed.status_code == 200
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.content == payload
+    digest = hashlib.sha256(payload).hexdigest()
+    assert compressed.headers["etag"] == f'"{digest}-gzip"'
+    assert compressed.headers["cache-control"] == "no-cache"
+
+    revalidated = client.get("/build/world_gz/phase0.json", headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+    identity = client.get("/build/world_gz/phase0.json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] == f'"{digest}"'
+
+    voice = client.get("/build/voice_cache/abc123.mp3")
+    assert voice.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+    artifact.write_bytes(b'{"placements":[]}')  # rewritten without its sibling: the stale .gz must not be served
+    assert client.get("/build/world_gz/phase0.json", headers={"Accept-Encoding": "gzip"}).content == b'{"placements":[]}'
+
+
+def test_build_mount_ignores_if_modified_since_when_relinked_to_an_older_blob(tmp_path):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.api.build_static import BuildStaticFiles
+
+    store = ArtifactStore(tmp_path, max_bytes=0)
+    artifact = tmp_path / "world_lm" / "phase0.json"
+    v1 = b'{"placements":[1]}'
+    v2 = b'{"placements":[2]}'
+    store.put(artifact, v1)
+    os.utime(store.blob_path(hashlib.sha256(v1).hexdigest()), (1_000_000_000, 1_000_000_000))
+    store.put(artifact, v2)
+    app = FastAPI()
+    app.mount("/build", BuildStaticFiles(directory=str(tmp_path)), name="build")
+    client = TestClient(app)
+    first = client.get("/build/world_lm/phase0.json")
+    assert first.content == v2
+    assert "last-modified" not in first.headers
+
+    store.put(artifact, v1)  # relinks the older v1 blob; its mtime predates the v2 response
+    revalidated = client.get("/build/world_lm/phase0.json", headers={"If-Modified-Since": "Sun, 01 Jan 2017 00:00:00 GMT"})
+    assert revalidated.status_code == 200
+    assert revalidated.content == v1
+    assert client.get("/build/world_lm/phase0.json", headers={"If-None-Match": first.headers["etag"]}).status_code == 200
+
+
+def test_build_mount_never_pairs_artifact_with_siblings_of_other_content(tmp_path):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.api.build_static import BuildStaticFiles
+
+    store = ArtifactStore(tmp_path, max_bytes=0)
+    artifact = tmp_path / "world_ab" / "phase0.json"
+    v1 = json.dumps({"placements": list(range(2000))}).encode("utf-8")
+    v2 = json.dumps({"placements": list(range(2001))}).encode("utf-8")
+    for payload in (v1, v2, v1):  # back to v1 relinks its older blob, and with it an older mtime
+        store.put(artifact, payload)
+        write_precompressed(artifact, payload, write=store.put)
+
+    assert artifact.read_bytes() == v1
+    assert gzip.decompress((tmp_path / "world_ab" / "phase0.json.gz").read_bytes()) == v1
+    app = FastAPI()
+    app.mount("/build", BuildStaticFiles(directory=str(tmp_path)), name="build")
+    served = TestClient(app).get("/build/world_ab/phase0.json", headers={"Accept-Encoding": "gzip"})
+    assert served.headers["content-encoding"] == "gzip"
+    assert served.content == v1
+    assert served.headers["etag"] == f'"{hashlib.sha256(v1).hexdigest()}-gzip"'
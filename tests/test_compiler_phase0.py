@@ -1,7 +1,24 @@
+import copy
+import hashlib
 import json
+import math
+import os
 import pathlib
+import random
+import struct
+import time
 
+import pytest
+
+from src.compilation import compile_cache
+from src.compilation.artifact_store import ArtifactStore
+from src.compilation.batch import SUMMARY_FILENAME, compile_batch, read_worldspec_lines
 from src.compilation.phase0 import compile_phase0
+from src.compilation.phase0_binary import PHASE0_BINARY_FILENAME, decode_phase0_binary, encode_phase0_binary
+from src.compilation.phase0_placement import FloorOverlapIndex, _repair_overlaps
+from src.compilation.phase0_refinement import NEAR_SLACK, refine_layout
+from src.compilation.serialization import ARTIFACT_JSON_ENV, artifact_json_mode, encode_artifact
+from src.planning import planner
 from tests.semantic_test_utils import approved_surface_material_selection
 
 
@@ -42,6 +59,10 @@ def test_compile_phase0_success_writes_artifact(tmp_path):
     assert "floor" in artifact["shell_material_bindings"]
     assert artifact["template"]["nodes"][0]["surface_material"]["surface_role"] == "floor"
 
+    binary_path = pathlib.Path(result["phase0_binary_artifact"])
+    assert binary_path == artifact_path.with_name(PHASE0_BINARY_FILENAME)
+    assert decode_phase0_binary(binary_path.read_bytes()) == artifact
+
 
 def test_compile_phase0_invalid_worldspec_returns_structured_errors():
     invalid_worldspec = _load("worldspec_invalid_type.json")
@@ -571,3 +592,280 @@ def test_compile_phase0_skips_unsatisfiable_constraints_without_failing_world(tm
     placement_report = result["phase0_data"]["substitution_report"]["placement_execution"]
     assert placement_report["backend"] == "scene_graph_solver"
     assert result["phase0_data"]["constraints"]["placement_constraints_enabled"] is True
+
+
+def test_floor_overlap_index_tracks_pairs_through_repair_and_discard():
+    rng = random.Random(11)
+    placements = [
+        {
+            "placement_id": f"p{index}",
+            "asset_id": f"asset_{index}",
+            "constraint": {"type": "wall" if index % 7 == 0 else "floor"},
+            "geometry_profile": {"footprint_radius": rng.uniform(0.2, 0.6)},
+            "transform": {"pos": [rng.uniform(-2.0, 2.0), 0.0, rng.uniform(-2.0, 2.0)], "rot": [0.0, 0.0, 0.0]},
+        }
+        for index in range(40)
+    ]
+
+    def scanned_pairs(items):
+        floor = [item for item in items if item["constraint"]["type"] == "floor"]
+        found = []
+        for left_index, left in enumerate(floor):
+            for right in floor[left_index + 1 :]:
+                left_pos, right_pos = left["transform"]["pos"], right["transform"]["pos"]
+                threshold = left["geometry_profile"]["footprint_radius"] + right["geometry_profile"]["footprint_radius"]
+                if math.dist((left_pos[0], left_pos[2]), (right_pos[0], right_pos[2])) < threshold:
+                    found.append((left["placement_id"], right["placement_id"]))
+        return found
+
+    index = FloorOverlapIndex(placements)
+    assert [(pair["left_placement_id"], pair["right_placement_id"]) for pair in index.overlap_pairs()] == scanned_pairs(placements)
+
+    repair = _repair_overlaps(placements, {"width": 6.0, "length": 6.0, "height": 3.0}, index)
+    assert repair["repaired_pairs"] > 0
+    assert [(pair["left_placement_id"], pair["right_placement_id"]) for pair in index.overlap_pairs()] == scanned_pairs(placements)
+
+    victim = placements.pop(1)
+    index.discard(victim)
+    assert [(pair["left_placement_id"], pair["right_placement_id"]) for pair in index.overlap_pairs()] == scanned_pairs(placements)
+
+
+def test_refine_layout_improves_objective_without_breaking_constraints():
+    rng = random.Random(2)
+    dimensions = {"width": 8.0, "length": 8.0, "height": 3.0}
+    placements = [
+        {
+            "placement_id": f"p{index}",
+            "asset_id": f"asset_{index}",
+            "role": ["sofa", "chair", "lamp", "plant"][index % 4],
+            "constraint": {"type": "floor"} if index < 4 else {"type": "near", "target": "asset_0", "relation": "near"},
+            "geometry_profile": {"footprint_radius": rng.uniform(0.25, 0.6)},
+            "transform": {"pos": [rng.uniform(-3.0, 3.0), 0.0, rng.uniform(-3.0, 3.0)], "rot": [0.0, 0.0, 0.0], "scale": [1.0, 1.0, 1.0]},
+        }
+        for index in range(10)
+    ]
+    _repair_overlaps(placements, dimensions)
+    scene_program = {"focal_object_role": "sofa", "focal_wall": "back", "circulation_preference": "clear_center"}
+    near_before = {item["placement_id"]: math.dist(item["transform"]["pos"], placements[0]["transform"]["pos"]) for item in placements[4:]}
+
+    expired = copy.deepcopy(placements)
+    assert refine_layout(expired, dimensions, scene_program, deadline=time.monotonic() - 1.0)["stopped"] == "deadline"
+    assert expired == placements
+
+    refined = copy.deepcopy(placements)
+    report = refine_layout(refined, dimensions, scene_program, deadline=time.monotonic() + 60.0, seed=3, max_iterations=300)
+    assert report["iterations"] == 300 or report["stopped"] == "converged"
+    assert report["objective_after"] > report["objective_before"]
+    assert FloorOverlapIndex(refined).overlap_pairs() == []
+    for item in refined[4:]:
+        assert math.dist(item["transform"]["pos"], refined[0]["transform"]["pos"]) <= near_before[item["placement_id"]] + NEAR_SLACK + 1e-9
+
+    again = copy.deepcopy(placements)
+    refine_layout(again, dimensions, scene_program, deadline=time.monotonic() + 60.0, seed=3, max_iterations=300)
+    assert again == refined
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])  # 2 goes through the warm process pool
+def test_compile_batch_writes_artifacts_and_per_world_summary(tmp_path, max_workers):
+    worldspec = _load("worldspec_phase0_valid.json")
+    input_path = tmp_path / "worlds.jsonl"
+    input_path.write_text(
+        "\n".join([json.dumps(worldspec), "", "{not json", json.dumps({"worldspec": {**worldspec, "seed": 7}})]) + "\n",
+        encoding="utf-8",
+    )
+
+    report = compile_batch(read_worldspec_lines(input_path), build_root=tmp_path / "build", max_workers=max_workers)
+
+    assert report["workers"] == max_workers
+    assert report["world_count"] == 3
+    assert report["ok_count"] == 2
+    assert [world["line"] for world in report["worlds"]] == [1, 3, 4]
+    first, bad, enveloped = report["worlds"]
+    assert first["world_id"] == compile_phase0(worldspec, write_artifact=False)["world_id"]
+    assert pathlib.Path(first["phase0_artifact"]).exists()
+    assert first["overlap_count"] == 0 and first["spawn_attempts"] >= 1
+    assert bad["ok"] is False and "invalid JSON" in bad["errors"][0]["message"]
+    assert enveloped["ok"] is True and enveloped["world_id"] != first["world_id"]
+    summary_lines = (tmp_path / "build" / SUMMARY_FILENAME).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["line"] for line in summary_lines] == [1, 3, 4]
+
+
+def test_compile_phase0_cache_reuses_artifact_until_inputs_change(tmp_path, monkeypatch):
+    worldspec = _load("worldspec_phase0_valid.json")
+    uncached = compile_phase0(worldspec, build_root=tmp_path)
+    artifact = pathlib.Path(uncached["phase0_artifact"])
+    written_at = artifact.stat().st_mtime_ns
+    assert "compile_cache" not in uncached
+
+    first = compile_phase0(worldspec, build_root=tmp_path, use_cache=True)
+    assert first["compile_cache"] == "miss"
+    assert artifact.stat().st_mtime_ns == written_at  # identical bytes are not rewritten
+    assert (artifact.parent / compile_cache.CACHE_META_FILENAME).exists()
+
+    hit = compile_phase0(worldspec, build_root=tmp_path, use_cache=True)
+    assert hit["compile_cache"] == "hit"
+    assert {key: hit[key] for key in ("ok", "world_id", "phase0_artifact", "teleportable_surfaces", "errors", "safe_spawn")} == {
+        key: first[key] for key in ("ok", "world_id", "phase0_artifact", "teleportable_surfaces", "errors", "safe_spawn")
+    }
+    assert hit["phase0_data"] == json.loads(json.dumps(first["phase0_data"]))
+
+    monkeypatch.setattr(compile_cache, "COMPILER_VERSION", "phase0-test")
+    assert compile_phase0(worldspec, build_root=tmp_path, use_cache=True)["compile_cache"] == "miss"
+    artifact.write_text(artifact.read_text(encoding="utf-8").replace('"phase0"', '"edited"'), encoding="utf-8")
+    assert compile_phase0(worldspec, build_root=tmp_path, use_cache=True)["compile_cache"] == "miss"
+    assert json.loads(artifact.read_text(encoding="utf-8"))["phase"] == "phase0"
+
+
+def test_encode_artifact_splices_pre_encoded_subtrees(monkeypatch):
+    phase0_data = {"phase": "phase0", "placements": [{"asset_id": "chair_01", "pos": [0.5, 0.0, -1.25]}], "note": "caf\u00e9\n"}
+    manifest = {"world_id": "world_x", "phase0_data": phase0_data, "zones": [], "readiness": {"portal_allowed": True}}
+
+    monkeypatch.delenv(ARTIFACT_JSON_ENV, raising=False)
+    assert artifact_json_mode() == "compact"
+    compact = encode_artifact(manifest, embedded={"phase0_data": encode_artifact(phase0_data)})
+    assert compact == encode_artifact(manifest)
+    assert b"\n" not in compact
+    assert json.loads(compact) == manifest
+
+    monkeypatch.setenv(ARTIFACT_JSON_ENV, "pretty")
+    pretty = encode_artifact(manifest, embedded={"phase0_data": encode_artifact(phase0_data)})
+    assert pretty == json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+
+
+def test_compile_phase0_refinement_keeps_planner_entry_corridor_clear():
+    worldspec = _load("worldspec_phase0_valid.json")
+    worldspec["placements"] = [
+        {
+            "asset_id": "core_table_01",
+            "role": "table",
+            "zone_preference": "front",  # the solver's zone pulls toward the entry wall
+            "constraint": {"type": "floor"},
+            "transform": {"pos": [1.4, 0.0, -2.4], "rot": [0.0, 0.0, 0.0], "scale": [1.0, 1.0, 1.0]},
+        }
+    ]
+    worldspec["planner_policy"] = {"refine_budget_ms": 2000}
+    half_width, half_length = 8.0 / 2.0 - 0.8, 8.0 / 2.0 - 0.8
+
+    def in_entry_corridor(pos):  # the band the solver's walkway penalty covers for keep_entry_clear
+        return abs(pos[0]) < half_width * 0.26 and pos[2] < -half_length * 0.35
+
+    positions = {}
+    for keep_entry_clear in (True, False):
+        scene_program = {"walkway_preservation_intent": {"keep_entry_clear": keep_entry_clear, "keep_central_path_clear": False}, "circulation_preference": "balanced"}
+        planned = copy.deepcopy(worldspec)
+        planned["scene_context"] = planner._scene_context(scene_program, [])
+        result = compile_phase0(planned, write_artifact=False)
+        assert result["ok"] is True
+        refinement = result["phase0_data"]["substitution_report"]["placement_audit"]["refinement"]
+        assert refinement["accepted_moves"] > 0
+        positions[keep_entry_clear] = [placement["transform"]["pos"] for placement in result["phase0_data"]["placements"]]
+
+    assert not any(in_entry_corridor(pos) for pos in positions[True])
+    assert any(in_entry_corridor(pos) for pos in positions[False])  # without the intent the same objective walks into it
+
+
+def test_phase0_binary_round_trips_placements_exactly():
+    placements = []
+    for index in range(6):
+        placements.append(
+            {
+                "placement_id": f"placement_{index:03d}",
+                "asset_id": "chair_01" if index % 2 else "table_02",
+                "requested_asset_id": "chair_01",
+                "role": "chair",
+                "resolution_type": "exact",
+                "substitution_reason": "",
+                "mode": "asset",
+                "tags": ["seating", "wood"] if index != 3 else ["seating", 7],
+                "constraint": {"type": "floor"},
+                "group_id": None,
+                "group_layout": None,
+                "target_height": round(0.8123 + index, 4),
+                "front_yaw_offset_degrees": 90.0,
+                "geometry_profile": {"footprint": [0.5, 0.5]},
+                "vertical_origin_offset_meters": 0.123456789 if index == 4 else 0.0,
+                "transform": {"pos": [1.234, 0.0, -2.5 - index], "rot": [0.0, 37.125, 0.0], "scale": [1.0, 1.0, 1.0]},
+            }
+        )
+    placements[5]["transform"] = {"pos": [1, 0, 2], "rot": [0, 0, 0], "scale": [1, 1, 1]}
+    del placements[2]["role"]
+    placements[1]["constraint"] = None
+    placements[1]["geometry_profile"] = {"footprint_radius": 0.95, "wall_clearance": 0.1234567, "bounds_source": "role_default"}
+    placements[4]["group_layout"] = "pair"
+    template = {
+        "template_id": "room_basic",
+        "dimensions": {"width": 8.0, "length": 8.0, "height": 3},
+        "nodes": [
+            {"id": "floor", "kind": "plane", "size": [8.0, 8.0], "position": [0.0, 0.0, 0.0], "rotation": [0.0, 0.0, 0.0], "collider": True, "teleportable": True,
+             "surface_material": {"surface_role": "floor", "material_id": "oak", "display_name": "Oak", "texture_tags": ["grain"]}},
+            {"id": "pillar", "kind": "box", "size": [0.5, 3.0, 0.5], "position": [1.0, 1.5, 1.0], "rotation": [0.0, 0.0, 0.0], "collider": 1},
+            {"id": "floor"},
+        ],
+    }
+    phase0_data = {"phase": "phase0", "world_id": "world_bin", "placements": placements, "template": template, "safe_spawn": {"pos": [0.0, 0.0, 0.0], "rot": [0.0, 180.0, 0.0]}}
+
+    payload = encode_phase0_binary(phase0_data)
+    assert payload[:4] == b"JIP0"
+    decoded = decode_phase0_binary(payload)
+    assert json.dumps(decoded, sort_keys=True) == json.dumps(phase0_data, sort_keys=True)
+    assert len(payload) < len(json.dumps(phase0_data, sort_keys=True, separators=(",", ":")))
+
+    with pytest.raises(ValueError):
+        decode_phase0_binary(payload[:-1])
+    with pytest.raises(ValueError):
+        decode_phase0_binary(b"NOPE" + payload[4:])
+
+
+def test_phase0_binary_keeps_only_diagnostics_in_the_json_tail():
+    phase0_data = compile_phase0(_load("worldspec_phase0_valid.json"), write_artifact=False)["phase0_data"]
+    payload = encode_phase0_binary(phase0_data)
+    assert decode_phase0_binary(payload) == phase0_data
+
+    tail_length = struct.unpack_from("<I", payload, 24)[0]
+    tail = json.loads(payload[len(payload) - tail_length:])
+    assert set(tail["phase0"]) <= {
+        "constraints",
+        "placement_policy",
+        "reachability",
+        "safe_spawn_meta",
+        "shell_material_bindings",
+        "substitution_report",
+        "surface_material_selection",
+    }
+    assert tail["node_extras"] == [{}] * len(phase0_data["template"]["nodes"])  # nodes, safe_spawn and placement geometry all sit in fixed records
+    assert tail["placement_extras"] == [{}] * len(phase0_data["placements"])
+
+
+
+def test_artifact_store_dedupes_worlds_and_collects_least_recently_used(tmp_path):
+    store = ArtifactStore(tmp_path, max_bytes=0)
+    payload = b'{"phase":"phase0"}' * 100
+    first = tmp_path / "world_aaa" / "phase0.json"
+    second = tmp_path / "world_bbb" / "phase0.json"
+    assert store.put(first, payload) is True
+    assert store.put(second, payload) is True
+    assert store.put(second, payload) is False
+    assert first.stat().st_ino == second.stat().st_ino == store.blob_path(hashlib.sha256(payload).hexdigest()).stat().st_ino
+
+    first.write_bytes(b"edited in place")  # corrupts the shared inode; the next put must not trust the blob
+    assert store.put(second, payload) is True
+    assert second.read_bytes() == payload
+
+    third = tmp_path / "world_ccc" / "phase0.json"
+    store.put(third, b"x" * 5000)
+    (tmp_path / "voice_cache").mkdir()
+    voice = tmp_path / "voice_cache" / "abc.mp3"
+    store.put(voice, b"ID3" * 10)
+    now = time.time()
+    os.utime(tmp_path / "world_aaa", (now - 4000, now - 4000))
+    os.utime(tmp_path / "world_ccc", (now - 3000, now - 3000))
+    os.utime(tmp_path / "world_bbb", (now - 2000, now - 2000))
+
+    report = store.collect(len(payload) + 100)
+    assert report["removed_entries"] == 2
+    assert not (tmp_path / "world_aaa").exists() and not (tmp_path / "world_ccc").exists()
+    assert second.read_bytes() == payload
+    assert voice.exists()  # touched within the grace period
+    assert sorted(path.name for path in (tmp_path / "blobs").glob("*/*")) == sorted(
+        hashlib.sha256(data).hexdigest() for data in (payload, b"ID3" * 10)
+    )
@@ -1,8 +1,10 @@
 from tests.semantic_test_utils import approved_surface_material_selection
 import json
-import urllib.error
+import os
 
-from src.llm import planner as llm_planner
+import httpx
+
+from src.llm import planner as llm_planner, response_cache, transport
 
 
 GEMINI_MODEL = "gemini-2.5-flash"
@@ -10,18 +12,9 @@ OPENROUTER_MODEL = "openai/gpt-5.4-mini"
 
 
 # Keep behavior deterministic so planner/runtime contracts stay stable.
-class _FakeResponse:
-    def __init__(self, payload: str):
-        self._payload = payload
-
-    def read(self):
-        return self._payload.encode("utf-8")
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, exc_type, exc, tb):
-        return False
+def _patch_http(monkeypatch, handler):
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(transport, "http_client", lambda: client)
 
 
 def _base_kwargs():
@@ -159,12 +152,12 @@ def _gemini_response(payload: dict):
             }
         ]
     }
-    return _FakeResponse(json.dumps(body))
+    return httpx.Response(200, text=json.dumps(body))
 
 
 def _openrouter_response(payload: dict):
     body = {"output_text": json.dumps(payload)}
-    return _FakeResponse(json.dumps(body))
+    return httpx.Response(200, text=json.dumps(body))
 
 
 def test_gemini_retry_then_success(monkeypatch):
@@ -172,14 +165,13 @@ def test_gemini_retry_then_success(monkeypatch):
     _set_gemini_env(monkeypatch, api_key="gemini-test-key")
     attempts = {"count": 0}
 
-    def fake_urlopen(_request, timeout=0):
-        _ = timeout
+    def fake_send(_request):
         attempts["count"] += 1
         if attempts["count"] == 1:
-            raise urllib.error.URLError("temporary network")
+            raise httpx.ConnectError("temporary network")
         return _gemini_response({"plan": _semantic_plan()})
 
-    monkeypatch.setattr(llm_planner.urllib.request, "urlopen", fake_urlopen)
+    _patch_http(monkeypatch, fake_send)
 
     result = llm_planner.request_llm_plan(
         **_base_kwargs(),
@@ -195,11 +187,10 @@ def test_gemini_circuit_open_after_repeated_failures(monkeypatch):
     llm_planner._CIRCUIT_STATE.clear()
     _set_gemini_env(monkeypatch, api_key="gemini-test-key")
 
-    def always_fail(_request, timeout=0):
-        _ = timeout
-        raise urllib.error.URLError("offline")
+    def always_fail(_request):
+        raise httpx.ConnectError("offline")
 
-    monkeypatch.setattr(llm_planner.urllib.request, "urlopen", always_fail)
+    _patch_http(monkeypatch, always_fail)
 
     first = llm_planner.request_llm_plan(
         **_base_kwargs(),
@@ -265,15 +256,14 @@ def test_gemini_success(monkeypatch):
     llm_planner._CIRCUIT_STATE.clear()
     _set_gemini_env(monkeypatch, api_key="gemini-test-key")
 
-    def fake_urlopen(request, timeout=0):
-        _ = timeout
-        assert request.full_url == (
+    def fake_send(request):
+        assert str(request.url) == (
             "https://generativelanguage.googleapis.com/v1beta/models/"
             f"{GEMINI_MODEL}:generateContent?key=gemini-test-key"
         )
         return _gemini_response({"plan": _semantic_plan()})
 
-    monkeypatch.setattr(llm_planner.urllib.request, "urlopen", fake_urlopen)
+    _patch_http(monkeypatch, fake_send)
 
     result = llm_planner.request_llm_plan(
         **_base_kwargs(),
@@ -353,12 +343,11 @@ def test_openrouter_success(monkeypatch):
     llm_planner._CIRCUIT_STATE.clear()
     _set_openrouter_env(monkeypatch, api_key="openrouter-test-key")
 
-    def fake_urlopen(request, timeout=0):
-        _ = timeout
-        assert request.full_url == "https://openrouter.ai/api/v1/responses"
+    def fake_send(request):
+        assert str(request.url) == "https://openrouter.ai/api/v1/responses"
         return _openrouter_response({"plan": _semantic_plan()})
 
-    monkeypatch.setattr(llm_planner.urllib.request, "urlopen", fake_urlopen)
+    _patch_http(monkeypatch, fake_send)
 
     result = llm_planner.request_llm_plan(
         **_base_kwargs(),
@@ -376,9 +365,8 @@ def test_stage_specific_models_override_global_openrouter_model(monkeypatch):
     monkeypatch.setenv("PLANNER_LLM_SELECTION_MODEL", "smart-model")
     seen_models = []
 
-    def fake_urlopen(request, timeout=0):
-        _ = timeout
-        body = json.loads(request.data.decode("utf-8"))
+    def fake_send(request):
+        body = json.loads(request.content.decode("utf-8"))
         seen_models.append(body["model"])
         if len(seen_models) == 1:
             return _openrouter_response(
@@ -389,7 +377,7 @@ def test_stage_specific_models_override_global_openrouter_model(monkeypatch):
             )
         return _openrouter_response({"selection": _semantic_plan()["selection"]})
 
-    monkeypatch.setattr(llm_planner.urllib.request, "urlopen", fake_urlopen)
+    _patch_http(monkeypatch, fake_send)
 
     result = llm_planner.request_llm_plan(
         **_base_kwargs(),
@@ -404,12 +392,11 @@ def test_openrouter_selection_can_request_more_reasoning(monkeypatch):
     _set_openrouter_env(monkeypatch, api_key="openrouter-test-key")
     captured = {}
 
-    def fake_urlopen(request, timeout=0):
-        _ = timeout
-        captured.update(json.loads(request.data.decode("utf-8")))
+    def fake_send(request):
+        captured.update(json.loads(request.content.decode("utf-8")))
         return _openrouter_response({"selection": _semantic_plan()["selection"]})
 
-    monkeypatch.setattr(llm_planner.urllib.request, "urlopen", fake_urlopen)
+    _patch_http(monkeypatch, fake_send)
 
     result = llm_planner.request_llm_selection(
         **_base_kwargs(),
@@ -428,12 +415,11 @@ def test_openrouter_defaults_to_medium_reasoning(monkeypatch):
     _set_openrouter_env(monkeypatch, api_key="openrouter-test-key")
     captured = {}
 
-    def fake_urlopen(request, timeout=0):
-        _ = timeout
-        captured.update(json.loads(request.data.decode("utf-8")))
+    def fake_send(request):
+        captured.update(json.loads(request.content.decode("utf-8")))
         return _openrouter_response({"selection": _semantic_plan()["selection"]})
 
-    monkeypatch.setattr(llm_planner.urllib.request, "urlopen", fake_urlopen)
+    _patch_http(monkeypatch, fake_send)
 
     result = llm_planner.request_llm_selection(
         **_base_kwargs(),
@@ -451,9 +437,8 @@ def test_gemini_intent_can_request_thinking_budget(monkeypatch):
     _set_gemini_env(monkeypatch, api_key="gemini-test-key")
     captured = {}
 
-    def fake_urlopen(request, timeout=0):
-        _ = timeout
-        captured.update(json.loads(request.data.decode("utf-8")))
+    def fake_send(request):
+        captured.update(json.loads(request.content.decode("utf-8")))
         return _gemini_response(
             {
                 "intent": _semantic_plan()["intent"],
@@ -461,7 +446,7 @@ def test_gemini_intent_can_request_thinking_budget(monkeypatch):
             }
         )
 
-    monkeypatch.setattr(llm_planner.urllib.request, "urlopen", fake_urlopen)
+    _patch_http(monkeypatch, fake_send)
 
     result = llm_planner.request_llm_intent(
         prompt_plan={"selected_prompt": "small room", "input_prompt": "small room"},
@@ -484,3 +469,97 @@ def test_openrouter_requires_model(monkeypatch):
     assert result["ok"] is False
     assert result["error_code"] == "llm_unavailable"
     assert "OPENROUTER_MODEL" in result["message"]
+
+
+def test_transport_maps_non_retryable_http_status_without_retry(monkeypatch):
+    attempts = {"count": 0}
+
+    def fake_send(request):
+        attempts["count"] += 1
+        return httpx.Response(401)
+
+    _patch_http(monkeypatch, fake_send)
+    result = transport.post_json_with_retries(
+        url="https://example.invalid/llm",
+        headers={},
+        payload={},
+        timeout_s=1.0,
+        retry_count=3,
+        retry_backoff_s=0.0,
+        transport_error_code="llm_transport_error",
+        provider_name="Test",
+    )
+    assert attempts["count"] == 1
+    assert result == {"ok": False, "error_code": "llm_http_error", "message": "Test returned HTTP 401."}
+
+
+def test_llm_response_cache_defaults_outside_the_served_build_tree(monkeypatch):
+    monkeypatch.delenv("PLANNER_LLM_CACHE_DIR", raising=False)
+    cache_dir = transport.resolve_cache_settings({"llm_cache": "use"})["cache_dir"]
+    assert cache_dir == response_cache.DEFAULT_CACHE_DIR
+    assert "build" not in cache_dir.split("/")
+
+
+def test_llm_response_cache_reuses_identical_stage_requests(monkeypatch, tmp_path):
+    llm_planner._CIRCUIT_STATE.clear()
+    _set_gemini_env(monkeypatch, api_key="gemini-test-key")
+    monkeypatch.setenv("PLANNER_LLM_CACHE_DIR", str(tmp_path))
+    calls = {"count": 0}
+
+    def fake_send(request):
+        calls["count"] += 1
+        return _gemini_response({"design_brief": {"concept_statement": f"call {calls['count']}"}})
+
+    _patch_http(monkeypatch, fake_send)
+    prompt_plan = {"selected_prompt": "small room", "input_prompt": "small room"}
+
+    first = llm_planner.request_llm_design_brief(prompt_plan=prompt_plan, user_prefs=_gemini_prefs(llm_cache="use"))
+    second = llm_planner.request_llm_design_brief(prompt_plan=prompt_plan, user_prefs=_gemini_prefs(llm_cache="use"))
+    refreshed = llm_planner.request_llm_design_brief(prompt_plan=prompt_plan, user_prefs=_gemini_prefs(llm_cache="refresh"))
+    bypassed = llm_planner.request_llm_design_brief(prompt_plan=prompt_plan, user_prefs=_gemini_prefs(llm_cache="bypass"))
+
+    assert [first["cache_status"], second["cache_status"], refreshed["cache_status"], bypassed["cache_status"]] == [
+        "miss",
+        "hit",
+        "refresh",
+        "off",
+    ]
+    assert second["design_brief"] == first["design_brief"]
+    assert refreshed["design_brief"]["concept_statement"] == "call 2"
+    assert calls["count"] == 3
+
+
+def test_llm_response_cache_expires_and_evicts_least_recently_used(tmp_path):
+    response_cache.write_entry(tmp_path, "aa" + "0" * 62, {"n": 1}, max_bytes=10_000)
+    assert response_cache.read_entry(tmp_path, "aa" + "0" * 62, ttl_s=60.0) == {"n": 1}
+    assert response_cache.read_entry(tmp_path, "aa" + "0" * 62, ttl_s=-1.0) is None
+
+    sizes = []
+    for index in range(3):
+        key = f"b{index}" + "0" * 62
+        response_cache.write_entry(tmp_path, key, {"n": index}, max_bytes=10_000)
+        entry = tmp_path / key[:2] / f"{key}.json"
+        os.utime(entry, (1000 + index, 1000 + index))
+        sizes.append(entry.stat().st_size)  # created_at repr length varies, so sizes can differ by a byte
+    assert response_cache.evict_to_size(tmp_path, max_bytes=sizes[1] + sizes[2]) == 1
+    assert response_cache.read_entry(tmp_path, "b0" + "0" * 62, ttl_s=1e9) is None
+    assert response_cache.read_entry(tmp_path, "b2" + "0" * 62, ttl_s=1e9) == {"n": 2}
+
+
+def test_llm_response_cache_write_scans_only_when_tracked_size_crosses_cap(tmp_path, monkeypatch):
+    scans = []
+    real_evict = response_cache._evict
+
+    def counting_evict(cache_dir, max_bytes):
+        scans.append(max_bytes)
+        return real_evict(cache_dir, max_bytes)
+
+    monkeypatch.setattr(response_cache, "_evict", counting_evict)
+    for index in range(5):
+        response_cache.write_entry(tmp_path, f"c{index}" + "0" * 62, {"n": index}, max_bytes=100_000)
+    assert scans == [None]  # one seeding scan, then the in-process counter
+
+    for index in range(40):
+        response_cache.write_entry(tmp_path, f"d{index:02d}" + "0" * 61, {"n": index}, max_bytes=600)
+    assert sum(path.stat().st_size for path in tmp_path.glob("*/*.json")) <= 600
+    assert len(scans) < 41  # trimming to the low-water mark leaves room for several writes between scans
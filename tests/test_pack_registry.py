@@ -1,6 +1,8 @@
+import json
 import pathlib
 
-from src.catalog.pack_registry import load_pack_registry
+from src.catalog import pack_registry
+from src.catalog.pack_registry import clear_pack_registry_cache, load_pack_registry
 
 
 FIXTURES_DIR = pathlib.Path(__file__).resolve().parent / "fixtures"
@@ -61,3 +63,44 @@ def test_invalid_pack_manifest_reports_readable_error_path(tmp_path):
     assert registry.packs_by_id == {}
     assert registry.errors
     assert registry.errors[0]["path"].endswith("$.assets[0]")
+
+
+def _write_pack(pack_dir, pack_id, asset_id):
+    pack_dir.mkdir(parents=True, exist_ok=True)
+    (pack_dir / "pack.json").write_text(
+        json.dumps(
+            {
+                "pack_id": pack_id,
+                "version": "0.1.0",
+                "tags": ["indoor"],
+                "assets": [{"asset_id": asset_id, "label": asset_id, "tags": ["chair"]}],
+            }
+        ),
+        encoding="utf-8",
+    )
+
+
+def test_pack_registry_cache_reuses_registry_until_a_manifest_changes(tmp_path, monkeypatch):
+    _write_pack(tmp_path / "a", "pack_a", "chair_a")
+    _write_pack(tmp_path / "b", "pack_b", "chair_b")
+    clear_pack_registry_cache()
+
+    first = load_pack_registry(tmp_path)
+    assert load_pack_registry(tmp_path) is first
+    assert first.fingerprint
+
+    parsed = []
+    original_load_manifest = pack_registry._load_manifest
+    monkeypatch.setattr(
+        pack_registry,
+        "_load_manifest",
+        lambda path, validator, stat_key: parsed.append(path.parent.name) or original_load_manifest(path, validator, stat_key),
+    )
+    _write_pack(tmp_path / "b", "pack_b", "chair_b_renamed")
+    second = load_pack_registry(tmp_path)
+
+    assert second is not first
+    assert parsed == ["b"]
+    assert "chair_b_renamed" in second.assets_by_id
+    assert second.fingerprint != first.fingerprint
+    assert load_pack_registry(tmp_path, use_cache=False).fingerprint == second.fingerprint
@@ -1,3 +1,9 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
 from src.placement.constraints import default_constraint_for_role
 from src.placement.geometry import (
     derive_near_distance,
@@ -6,6 +12,18 @@ from src.placement.geometry import (
     normalize_layout_mood,
     room_capacity_summary,
 )
+from src.placement.multistart import MAX_LAYOUT_STARTS, _start_pool, audit_layout, layout_start_seeds, solve_scene_layout_multistart
+from src.placement.occupancy import FloorOccupancy
+from src.placement.scene_solver import (
+    _batched_candidate_scores,
+    _candidate_score,
+    _candidate_variants,
+    _clamp_floor_position,
+    _clearance_score,
+    _is_clear,
+    _resolve_scored_position,
+    solve_scene_layout,
+)
 from src.world.templates import ROOM_BASIC_DIMENSIONS
 
 
@@ -74,3 +92,176 @@ def test_density_and_layout_normalization_are_strict():
     assert normalize_density_profile("bad-value") == "normal"
     assert normalize_layout_mood("crowded", "cluttered") == "crowded"
     assert normalize_layout_mood("", "minimal") == "open"
+
+
+def test_floor_occupancy_queries_match_brute_force_scan():
+    rng = random.Random(9)
+    placements = [
+        {
+            "group_id": rng.choice(["", "Group_A", "group_b"]),
+            "constraint": {"type": rng.choice(["floor", "near", "wall", "surface"])},
+            "geometry_profile": {"footprint_radius": rng.choice([0.0, 0.3, 0.6, 1.1])},
+            "transform": {"pos": [rng.uniform(-6, 6), 0.0, rng.uniform(-6, 6)]},
+        }
+        for _ in range(60)
+    ]
+    occupancy = FloorOccupancy(placements[:40])
+    layered = occupancy.layered()
+    for placement in placements[40:]:
+        layered.add(placement)
+
+    def brute_force(position, radius, skip_group_id):
+        floor = [
+            placement
+            for placement in placements
+            if placement["constraint"]["type"] not in {"wall", "surface"}
+            and not (skip_group_id and placement["group_id"].lower() == skip_group_id)
+        ]
+
+        def gap(placement):
+            pos = placement["transform"]["pos"]
+            return math.dist((position[0], position[2]), (pos[0], pos[2])) - (radius + placement["geometry_profile"]["footprint_radius"])
+
+        clear = all(gap(placement) >= 0.08 for placement in floor if placement["geometry_profile"]["footprint_radius"] > 0.0)
+        clearance = max(min(min([10.0] + [gap(placement) for placement in floor]), 1.5), -1.5)
+        return clear, clearance
+
+    assert len(layered) == 60 and len(occupancy) == 40
+    for _ in range(200):
+        position = [rng.uniform(-7, 7), 0.0, rng.uniform(-7, 7)]
+        radius = rng.uniform(0.2, 1.0)
+        skip_group_id = rng.choice(["", "group_a"])
+        clear, clearance = brute_force(position, radius, skip_group_id)
+        assert _is_clear(position, radius, layered, skip_group_id=skip_group_id) is clear
+        assert _clearance_score(position, radius, layered, skip_group_id=skip_group_id) == clearance
+        assert _is_clear(position, radius, placements, skip_group_id=skip_group_id) is clear
+
+
+def test_batched_position_scoring_picks_the_scalar_best_candidate():
+    rng = random.Random(4)
+    dimensions = {"width": 8.0, "length": 10.0}
+    scene_program = {
+        "focal_object_role": "sofa",
+        "focal_wall": "back",
+        "circulation_preference": "clear_center",
+        "walkway_preservation_intent": {"keep_entry_clear": True},
+    }
+    for _ in range(40):
+        placements = [
+            {
+                "group_id": "",
+                "constraint": {"type": "floor"},
+                "geometry_profile": {"footprint_radius": rng.choice([0.3, 0.6, 0.9])},
+                "transform": {"pos": [round(rng.uniform(-3, 3), 3), 0.0, round(rng.uniform(-4, 4), 3)]},
+            }
+            for _ in range(rng.randint(0, 12))
+        ]
+        kwargs = {
+            "yaw": rng.choice([0.0, 90.0, 180.0]),
+            "role": rng.choice(["sofa", "chair", "lamp"]),
+            "footprint_radius": rng.choice([0.4, 0.7]),
+            "dimensions": dimensions,
+            "scene_program": scene_program,
+            "zone_preference": rng.choice(["center", "edge", "corner"]),
+        }
+        desired = [rng.uniform(-3, 3), 0.0, rng.uniform(-4, 4)]
+        anchor = [rng.uniform(-3, 3), 0.0, rng.uniform(-4, 4)] if rng.random() < 0.5 else None
+
+        expected = None
+        for candidate in _candidate_variants(desired, anchor_pos=anchor, footprint_radius=kwargs["footprint_radius"]):
+            clamped = _clamp_floor_position(candidate, dimensions)
+            if not _is_clear(clamped, kwargs["footprint_radius"], placements):
+                continue
+            score = _candidate_score(position=clamped, existing=placements, **kwargs)
+            if expected is None or score > expected[1]:
+                expected = (clamped, score)
+
+        assert _resolve_scored_position(desired_pos=desired, anchor_pos=anchor, existing=FloorOccupancy(placements), **kwargs) == expected
+
+
+def test_batched_scores_match_scalar_scoring_for_every_candidate_row():
+    # The batched kernel restates the clearance, zone, focal and walkway terms
+    # in array form; every row, not just the winner, must match the scalar code.
+    rng = random.Random(11)
+    roles = ["sofa", "chair", "lamp", "wall", "surface"]
+    for _ in range(200):
+        dimensions = {"width": rng.uniform(3.0, 12.0), "length": rng.uniform(3.0, 12.0)}
+        scene_program = {
+            "focal_object_role": rng.choice(roles + [""]),
+            "focal_wall": rng.choice(["back", "front", "left", "right", ""]),
+            "circulation_preference": rng.choice(["clear_center", "clear_entry", ""]),
+            "walkway_preservation_intent": {"keep_central_path_clear": rng.random() < 0.3, "keep_entry_clear": rng.random() < 0.3},
+        }
+        placements = [
+            {
+                "group_id": rng.choice(["", "g1"]),
+                "constraint": {"type": "floor"},
+                "geometry_profile": {"footprint_radius": rng.choice([0.0, 0.3, 0.6, 0.9])},
+                "transform": {"pos": [rng.uniform(-5, 5), 0.0, rng.uniform(-5, 5)]},
+            }
+            for _ in range(rng.randint(0, 10))
+        ]
+        occupancy = FloorOccupancy(placements)
+        kwargs = {
+            "yaw": rng.uniform(-360.0, 360.0),
+            "role": rng.choice(roles),
+            "footprint_radius": rng.choice([0.3, 0.5, 0.8]),
+            "dimensions": dimensions,
+            "scene_program": scene_program,
+            "zone_preference": rng.choice(["center", "corner", "front", "back", "left", "right", "edge", ""]),
+            "skip_group_id": rng.choice(["", "g1"]),
+        }
+        candidates = [[rng.uniform(-6, 6), 0.0, rng.uniform(-6, 6)] for _ in range(rng.randint(1, 48))]
+        if rng.random() < 0.2:
+            candidates.append([0.0, 0.0, 0.0])  # the focal term special-cases the room origin
+        clear, scores, borderline = _batched_candidate_scores(
+            np.array([(candidate[0], candidate[2]) for candidate in candidates], dtype=np.float64),
+            occupancy=occupancy,
+            **kwargs,
+        )
+        for row, candidate in enumerate(candidates):
+            expected = _candidate_score(position=candidate, existing=occupancy, **kwargs)
+            assert scores[row] == pytest.approx(expected, abs=1e-9)
+            if not borderline[row]:
+                assert bool(clear[row]) is _is_clear(candidate, kwargs["footprint_radius"], occupancy, skip_group_id=kwargs["skip_group_id"])
+
+
+def test_multistart_layout_keeps_best_audited_start_deterministically():
+    def grouped(asset, group_role):
+        return {**asset, "role": asset["label"], "group_id": "dining", "group_role": group_role}
+
+    assets = [grouped(_asset("table", "table", 1.6, 1.0), "anchor")]
+    assets += [grouped(_asset(f"chair_{index}", "chair", 0.6, 0.6), "member") for index in range(4)]
+    assets += [{**_asset(asset_id, role, size_x, size_z), "role": role} for asset_id, role, size_x, size_z in [
+        ("sofa", "sofa", 2.2, 0.9), ("lamp", "lamp", 0.4, 0.4), ("plant", "plant", 0.5, 0.5), ("cabinet", "cabinet", 1.2, 0.5),
+    ]]
+    scene_program = {
+        "groups": [{"group_id": "dining", "group_type": "dining_set", "layout_pattern": "paired_long_sides", "facing_rule": "toward_anchor", "anchor_role": "table", "zone_preference": "center"}],
+        "focal_object_role": "sofa",
+        "focal_wall": "back",
+        "circulation_preference": "clear_center",
+    }
+    kwargs = {
+        "scene_program": scene_program,
+        "placement_intent": {"density_profile": "normal"},
+        "room_dimensions": {"width": 6.0, "length": 6.0, "height": 3.0},
+    }
+    seeds = layout_start_seeds(7, 4)
+    assert seeds == [None, 8, 9, 10]
+    assert len(layout_start_seeds(7, 10_000)) == MAX_LAYOUT_STARTS
+
+    pooled = solve_scene_layout_multistart(assets, seeds=seeds, max_workers=2, **kwargs)
+    serial = solve_scene_layout_multistart(assets, seeds=seeds, max_workers=1, **kwargs)
+    assert pooled == serial
+    pool = _start_pool()
+    assert pool._mp_context.get_start_method() != "fork"  # never forked from a threaded server
+    assert solve_scene_layout_multistart(assets, seeds=seeds, max_workers=2, **kwargs) == pooled
+    assert _start_pool() is pool  # later requests reuse the warm pool
+
+    placements, layout_program = pooled
+    summary = layout_program["multi_start"]
+    greedy_placements, _ = solve_scene_layout(assets, **kwargs)
+    assert summary["audits"][0] == audit_layout(greedy_placements, scene_program=scene_program, room_dimensions=kwargs["room_dimensions"])
+    best = summary["audits"][summary["best_start"]]
+    assert (-best["placed_count"], best["objective"]) <= (-summary["audits"][0]["placed_count"], summary["audits"][0]["objective"])
+    assert placements == solve_scene_layout(assets, seed=summary["best_seed"], **kwargs)[0]
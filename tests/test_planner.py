@@ -5,7 +5,20 @@ from src.catalog.style_material_pool import build_surface_material_candidates
 from src.placement.geometry import canonicalize_semantic_concept, canonicalize_semantic_role, map_semantic_concept_to_runtime_role
 from src.planning.planner import plan_worldspec
 from src.planning.scene_program import complete_scene_program, ground_scene_program
-from src.planning.assets import build_layout_from_selected_assets, build_semantic_candidate_shortlist, collect_assets
+from src.placement.semantic_taxonomy import clear_semantic_taxonomy_caches
+from src.planning import asset_catalog, asset_features, asset_shortlist
+from src.planning.assets import (
+    asset_matches_pack,
+    build_layout_from_selected_assets,
+    build_semantic_candidate_shortlist,
+    clear_planner_asset_index_cache,
+    collect_assets,
+    load_planner_pool,
+    planner_asset_index,
+)
+from src.planning.asset_features import precomputed_asset_features
+from src.planning.asset_shortlist import filter_candidate_assets
+from src.planning.compile_catalog import derive_asset_features, write_asset_feature_sidecar
 from src.planning.semantics import apply_stylekit_colors, validate_semantic_intent, validate_semantic_plan
 from src.catalog.stylekit_registry import StyleKitRegistry, load_stylekit_registry
 from src.world.validation import validate_worldspec
@@ -386,6 +399,80 @@ def test_planner_known_prompt_yields_valid_worldspec_with_semantic_selection():
     assert validation["ok"] is True
 
 
+def test_planner_asset_index_serves_lookups_and_reloads_on_change(tmp_path, monkeypatch):
+    pool_path = tmp_path / "planner_asset_pool_v1.json"
+    assets = [
+        {**_candidate("core_chair_01", classification="prop", semantic_confidence=0.8), "source_pack": "core_pack"},
+        {**_candidate("other_chair_01", classification="prop", semantic_confidence=0.7), "source_pack": "other_pack"},
+        {**_candidate("core_lamp_01", classification="prop", semantic_confidence=0.9), "label": "lamp", "tags": ["lamp"], "source_pack": "core_pack"},
+        {"label": "missing id"},
+        {**_candidate("core_chair_01", classification="prop", semantic_confidence=0.5), "source_pack": "other_pack"},
+    ]
+    pool_path.write_text(json.dumps({"assets": assets}), encoding="utf-8")
+    monkeypatch.setattr(asset_catalog, "PLANNER_POOL_PATH", pool_path)
+    clear_planner_asset_index_cache()
+    registry = PackRegistry(packs_by_id={"core_pack": {"pack_id": "core_pack"}, "other_pack": {"pack_id": "other_pack"}})
+
+    index = planner_asset_index()
+    assert planner_asset_index() is index
+    assert list(index.by_id) == ["core_chair_01", "other_chair_01", "core_lamp_01"]
+    assert index.by_id["core_chair_01"]["source_pack"] == "core_pack"  # lookups by id see the first record
+    assert [asset["asset_id"] for asset in index.assets] == ["core_chair_01", "other_chair_01", "core_lamp_01", "core_chair_01"]
+    assert index.by_source_pack["core_pack"] == [0, 2]
+    assert load_planner_pool() == [asset for asset in assets if asset.get("asset_id")]  # duplicates stay, as the pool file lists them
+    assert [asset["semantic_confidence"] for asset in collect_assets(["other_pack"], registry)] == [0.7, 0.5]
+
+    collected = collect_assets(["core_pack"], registry)
+    expected = [asset for asset in load_planner_pool() if asset_matches_pack(asset, ["core_pack"], registry)]
+    assert collected == expected
+    assert [asset["asset_id"] for asset in collected] == ["core_chair_01", "core_lamp_01"]
+    collected[0]["label"] = "mutated"
+    assert index.by_id["core_chair_01"]["label"] == "chair"
+
+    pool_path.write_text(json.dumps({"assets": assets[:1]}), encoding="utf-8")
+    reloaded = planner_asset_index()
+    assert reloaded is not index
+    assert list(reloaded.by_id) == ["core_chair_01"]
+    clear_planner_asset_index_cache()
+
+
+def test_compiled_catalog_sidecar_serves_features_for_unmodified_pool_records(tmp_path, monkeypatch):
+    pool_path = tmp_path / "planner_asset_pool_v1.json"
+    sidecar_path = tmp_path / "planner_asset_features_v1.json"
+    assets = [
+        {**_candidate("core_chair_01", classification="prop", semantic_confidence=0.8), "bounds": {"size": {"x": 0.6, "y": 0.9, "z": 0.6}}},
+        {**_candidate("tiny_chair_01", classification="prop", semantic_confidence=0.8), "bounds": {"size": {"x": 0.1, "y": 0.05, "z": 0.1}}},
+        {**_candidate("core_lamp_01", classification="prop", semantic_confidence=0.9), "label": "lamp", "tags": ["lamp", "warm"]},
+    ]
+    pool_path.write_text(json.dumps({"assets": assets}), encoding="utf-8")
+    monkeypatch.setattr(asset_catalog, "PLANNER_POOL_PATH", pool_path)
+    monkeypatch.setattr(asset_features, "ASSET_FEATURES_PATH", sidecar_path)
+    clear_planner_asset_index_cache()
+    expected_filter = [asset["asset_id"] for asset in filter_candidate_assets(load_planner_pool())]
+
+    summary = write_asset_feature_sidecar(sidecar_path, pool_path=pool_path, packs_root=tmp_path / "no_packs")
+    clear_planner_asset_index_cache()
+    index = planner_asset_index()
+
+    assert summary["asset_count"] == 3
+    assert index.features.pool_fingerprint == index.fingerprint
+    pool = load_planner_pool()
+    for asset in pool:
+        features = precomputed_asset_features(asset)
+        assert features is not None
+        assert features["role_key"] == derive_asset_features(asset)["role_key"]
+        assert features["geometry_profile"] == derive_asset_features(asset)["geometry_profile"]
+    assert [asset["asset_id"] for asset in filter_candidate_assets(pool)] == expected_filter == ["core_chair_01", "core_lamp_01"]
+    assert [precomputed_asset_features(asset)["role_key"] for asset in pool[:2]] == ["chair", "chair"]
+
+    pool[0]["label"] = "lamp"
+    assert precomputed_asset_features(pool[0]) is None
+
+    pool_path.write_text(json.dumps({"assets": assets[:1]}), encoding="utf-8")
+    assert planner_asset_index().features.assets == {}
+    clear_planner_asset_index_cache()
+
+
 def test_shortlist_excludes_unapproved_and_excluded_assets():
     shortlist = build_semantic_candidate_shortlist(
         [
@@ -411,6 +498,88 @@ def test_shortlist_excludes_unapproved_and_excluded_assets():
     assert [asset["asset_id"] for asset in shortlist] == ["approved_chair"]
 
 
+def test_shortlist_backfills_token_disjoint_assets_by_confidence_then_asset_id():
+    def plain(asset_id, confidence, family=None):
+        return {
+            **_candidate(asset_id, classification="prop", semantic_confidence=confidence),
+            "label": "crate",
+            "tags": ["crate"],
+            "runtime_role": "decor",
+            "coherence_family_id": family,
+        }
+
+    candidates = [
+        plain("crate_b", 0.7),
+        plain("crate_a", 0.7),
+        plain("crate_family", 0.6, family="fam_1"),
+        {**_candidate("lamp_01", classification="prop", semantic_confidence=0.6), "label": "lamp", "tags": ["lamp"], "runtime_role": "lamp"},
+    ]
+    shortlist = build_semantic_candidate_shortlist(
+        candidates,
+        "",
+        limit=3,
+        intent_spec={"semantic_slots": [{"slot_id": "lamp_1", "concept": "lamp", "priority": "must", "count": 1}]},
+    )
+
+    assert shortlist[0]["asset_id"] == "lamp_01"
+    assert [asset["asset_id"] for asset in shortlist[1:]] == ["crate_a", "crate_b"]
+
+
+def test_shortlist_backfill_fills_limit_past_duplicate_asset_ids():
+    duplicates = [
+        {**_candidate("aaa_dup", classification="prop", semantic_confidence=0.9), "label": "crate", "tags": ["crate"], "runtime_role": "decor"}
+        for _ in range(6)
+    ]
+    chairs = [
+        {**_candidate(f"chair_{index:02d}", classification="prop", semantic_confidence=0.8), "label": "chair", "tags": ["chair"]}
+        for index in range(4)
+    ]
+    shortlist = build_semantic_candidate_shortlist(duplicates + chairs, "spaceship", limit=4)
+
+    assert [asset["asset_id"] for asset in shortlist] == ["aaa_dup", "chair_00", "chair_01", "chair_02"]
+
+
+def test_shortlist_gathers_pool_candidates_from_catalog_columns_built_once(tmp_path, monkeypatch):
+    def plain(asset_id, confidence):
+        return {**_candidate(asset_id, classification="prop", semantic_confidence=confidence), "label": "crate", "tags": ["crate"], "runtime_role": "decor"}
+
+    assets = [
+        plain("crate_b", 0.7),
+        plain("crate_a", 0.7),
+        {**_candidate("lamp_01", classification="prop", semantic_confidence=0.6), "label": "lamp", "tags": ["lamp", "warm"], "runtime_role": "lamp"},
+        {**_candidate("lamp_02", classification="prop", semantic_confidence=0.8), "label": "lamp", "tags": ["lamp"], "runtime_role": "lamp"},
+    ]
+    pool_path = tmp_path / "planner_asset_pool_v1.json"
+    pool_path.write_text(json.dumps({"assets": assets}), encoding="utf-8")
+    monkeypatch.setattr(asset_catalog, "PLANNER_POOL_PATH", pool_path)
+    clear_planner_asset_index_cache()
+    index = planner_asset_index()
+    intent = {"semantic_slots": [{"slot_id": "lamp_1", "concept": "lamp", "priority": "must", "count": 1}]}
+
+    pool = load_planner_pool()
+    gathered = [asset["asset_id"] for asset in build_semantic_candidate_shortlist(pool, "warm", limit=3, intent_spec=intent)]
+    columns = asset_shortlist._catalog_columns(index.fingerprint)
+    assert columns is not None
+    assert asset_shortlist._CandidateColumns(load_planner_pool()).tokens._local_positions.size == 0  # copies of pool records reuse pool rows
+    build_semantic_candidate_shortlist(load_planner_pool(), "warm", limit=3, intent_spec=intent)
+    assert asset_shortlist._catalog_columns(index.fingerprint) is columns
+
+    edited = load_planner_pool()
+    edited[1]["tags"] = ["crate", "warm"]
+    mixed = asset_shortlist._CandidateColumns(edited)
+    assert list(mixed.tokens._local_positions) == [1]
+    assert list(mixed.tokens.overlap({"warm"})) == [0, 1, 1, 0]
+
+    asset_shortlist.activate_catalog_pool("", [])
+    assert [asset["asset_id"] for asset in build_semantic_candidate_shortlist(pool, "warm", limit=3, intent_spec=intent)] == gathered
+
+    assert asset_shortlist._token_sets_for_key.cache_info().currsize > 0
+    clear_semantic_taxonomy_caches()
+    assert asset_shortlist._token_sets_for_key.cache_info().currsize == 0
+    assert asset_shortlist._catalog_columns.cache_info().currsize == 0
+    clear_planner_asset_index_cache()
+
+
 def test_shortlist_prefers_prompt_matched_assets_when_no_slots_are_available():
     shortlist = build_semantic_candidate_shortlist(
         [
@@ -0,0 +1,61 @@
+import json
+import pathlib
+
+from src.compilation.phase0 import compile_phase0
+from src.runtime.reachability import analyze_reachability
+
+
+FIXTURES_DIR = pathlib.Path(__file__).resolve().parent / "fixtures"
+
+
+def _load(name: str):
+    return json.loads((FIXTURES_DIR / name).read_text(encoding="utf-8"))
+
+
+def _base_phase0_data():
+    worldspec = _load("worldspec_phase0_valid.json")
+    compiled = compile_phase0(worldspec, write_artifact=False)
+    assert compiled["ok"] is True
+    return compiled["phase0_data"]
+
+
+def _floor_placement(placement_id: str, x: float, z: float, radius: float):
+    return {
+        "placement_id": placement_id,
+        "asset_id": placement_id,
+        "constraint": {"type": "floor"},
+        "geometry_profile": {"footprint_radius": radius},
+        "transform": {"pos": [x, 0.0, z], "rot": [0.0, 0.0, 0.0], "scale": [1.0, 1.0, 1.0]},
+    }
+
+
+def test_compile_phase0_reports_reachability_from_spawn():
+    phase0_data = _base_phase0_data()
+
+    report = phase0_data["reachability"]
+    assert report["ok"] is True
+    assert report["region_count"] >= 1
+    assert report["unreachable_placement_ids"] == []
+    assert [entry["placement_id"] for entry in report["objects"]] == [
+        placement["placement_id"] for placement in phase0_data["placements"]
+    ]
+    assert all(entry["path_length_meters"] is not None for entry in report["objects"])
+
+
+def test_reachability_flags_objects_walled_off_from_spawn():
+    phase0_data = _base_phase0_data()
+    phase0_data["safe_spawn"] = {"pos": [-3.0, 0.0, 0.0], "rot": [0.0, 180.0, 0.0]}
+    wall = [_floor_placement(f"divider_{index}", 0.0, -4.0 + (index * 0.5), 0.4) for index in range(17)]
+    phase0_data["placements"] = wall + [
+        _floor_placement("near_chair", -2.0, 2.0, 0.3),
+        _floor_placement("far_chair", 3.0, 2.0, 0.3),
+    ]
+
+    report = analyze_reachability(phase0_data)
+    assert report["ok"] is False
+    assert report["region_count"] == 2
+    assert report["unreachable_placement_ids"] == ["far_chair"]
+    objects = {entry["placement_id"]: entry for entry in report["objects"]}
+    assert objects["near_chair"]["reachable"] is True
+    assert 0.0 < objects["near_chair"]["path_length_meters"] < 5.0
+    assert objects["far_chair"]["path_length_meters"] is None
@@ -1,8 +1,9 @@
 import json
+import math
 import pathlib
 
 from src.compilation.phase0 import compile_phase0
-from src.runtime.safe_spawn import find_safe_spawn
+from src.runtime.safe_spawn import PLAYER_CAPSULE_RADIUS, find_max_clearance_spawn, find_safe_spawn
 
 
 FIXTURES_DIR = pathlib.Path(__file__).resolve().parent / "fixtures"
@@ -87,3 +88,46 @@ def test_find_safe_spawn_returns_failure_when_all_candidates_are_blocked():
     assert result["spawn"] is None
     assert result["reason"] == "no_safe_spawn_found"
     assert result["attempts"] > 0
+
+
+def test_max_clearance_spawn_prefers_center_when_unblocked():
+    phase0_data = _base_phase0_data()
+    phase0_data["placements"] = []
+
+    result = find_max_clearance_spawn(phase0_data)
+    assert result["ok"] is True
+    assert result["spawn"]["pos"] == [0.0, 0.0, 0.0]
+    assert result["clearance"] > 0.0
+    assert result["attempts"] == 1
+    assert result["cells_evaluated"] > 1
+
+
+def test_max_clearance_spawn_clears_placements_with_more_room_than_ring_search():
+    phase0_data = _base_phase0_data()
+    phase0_data["placements"] = [
+        {"asset_id": "core_blocker", "transform": {"pos": [0.0, 0.0, 0.0], "rot": [0.0, 0.0, 0.0], "scale": [4.0, 1.0, 4.0]}},
+        {"asset_id": "side_blocker", "transform": {"pos": [1.6, 0.0, 0.0], "rot": [0.0, 0.0, 0.0], "scale": [1.0, 1.0, 1.0]}},
+    ]
+
+    ring = find_safe_spawn(phase0_data)
+    result = find_max_clearance_spawn(phase0_data)
+    assert result["ok"] is True
+    assert result["clearance"] >= ring["clearance"]
+    x, _, z = result["spawn"]["pos"]
+    for placement, radius in zip(phase0_data["placements"], (1.0, 0.35)):
+        pos = placement["transform"]["pos"]
+        assert math.hypot(x - pos[0], z - pos[2]) >= radius + PLAYER_CAPSULE_RADIUS
+    assert find_max_clearance_spawn(phase0_data) == result
+
+
+def test_max_clearance_spawn_returns_failure_when_floor_is_covered():
+    phase0_data = _base_phase0_data()
+    phase0_data["placements"] = [
+        {"asset_id": "core_blocker", "transform": {"pos": [0.0, 0.0, 0.0], "rot": [0.0, 0.0, 0.0], "scale": [80.0, 1.0, 80.0]}},
+    ]
+
+    result = find_max_clearance_spawn(phase0_data)
+    assert result["ok"] is False
+    assert result["spawn"] is None
+    assert result["reason"] == "no_safe_spawn_found"
+    assert result["attempts"] == 1
@@ -3,6 +3,8 @@ from __future__ import annotations
 import pytest
 
 from src.placement.semantic_taxonomy import (
+    compile_semantic_taxonomy,
+    compiled_semantic_taxonomy,
     expand_semantic_aliases,
     ground_concept,
     load_semantic_taxonomy,
@@ -64,3 +66,28 @@ def test_taxonomy_validation_rejects_bad_role_alias():
     payload["role_aliases"] = {**payload["role_aliases"], "bad_alias": "not_a_role"}
     with pytest.raises(ValueError):
         validate_semantic_taxonomy(payload)
+
+
+def test_compiled_taxonomy_rule_index_keeps_first_match_order():
+    payload = dict(load_semantic_taxonomy())
+    payload["token_grounding_rules"] = [
+        {"match_all": ["reading", "chair"], "runtime_role": "chair", "default_subtype": "reading_chair"},
+        {"match_any": ["chair", "stool"], "runtime_role": "chair", "default_subtype": "$token_except_role"},
+        {"runtime_role": "decor", "default_subtype": "catch_all"},
+    ]
+    compiled = compile_semantic_taxonomy(payload)
+
+    assert compiled.rule_candidates({"reading", "chair"}) == [0, 1, 2]
+    assert compiled.rule_candidates({"stool"}) == [1, 2]
+    assert compiled.rule_candidates({"vase"}) == [2]
+    first = next(index for index in compiled.rule_candidates({"reading", "chair"}) if compiled.grounding_rules[index].matches({"reading", "chair"}))
+    assert first == 0
+
+
+def test_compiled_taxonomy_matches_payload_aliases():
+    compiled = compiled_semantic_taxonomy()
+    payload = load_semantic_taxonomy()
+
+    assert compiled.supported_roles == set(payload["supported_runtime_roles"])
+    assert ground_concept("Reading Chair") == ground_concept("reading_chair")
+    assert ground_concept(None) == ("", "")
@@ -1,5 +1,7 @@
+import random
+
 from src.catalog.pack_registry import load_pack_registry
-from src.selection.substitution import PLACEHOLDER_ASSET_ID, resolve_asset_or_substitute
+from src.selection.substitution import PLACEHOLDER_ASSET_ID, _deterministic_substitution_selection, resolve_asset_or_substitute
 
 
 # Keep behavior deterministic so planner/runtime contracts stay stable.
@@ -32,7 +34,7 @@ def test_resolve_asset_exact_respects_selected_packs():
 
 
 def test_resolve_asset_exact_respects_coherence_hard_constraints():
-    registry = load_pack_registry()
+    registry = load_pack_registry(use_cache=False)  # mutated below, so keep it off the shared cached registry
     registry.assets_by_id["core_table_01"]["asset"]["quest_compatible"] = False
     result = _resolve("core_table_01", ["table_only_token"], ["core_pack"], registry=registry)
     assert result["resolution_type"] == "placeholder"
@@ -77,3 +79,59 @@ def test_resolve_asset_can_passthrough_approved_planner_asset_when_compile_regis
     assert result["resolution_type"] == "exact"
     assert result["resolved_asset_id"] == "furniture_mega_pack/chair03-cf781b8c"
     assert result["selection_backend"] == "passthrough"
+
+
+def test_deterministic_substitution_ranking_matches_tuple_sort_with_asset_id_tie_break():
+    rng = random.Random(3)
+    vocab = ["oak", "walnut", "modern", "rustic", "red", "blue", "chair", "table", "seat"]
+    candidates = [
+        {
+            "asset_id": f"asset_{rng.randint(0, 40):02d}_{index}",
+            "tags": rng.sample(vocab, rng.randint(0, 3)),
+            "category": rng.choice(["chair", "table"]),
+            "style_tags": rng.sample(vocab, rng.randint(0, 2)),
+            "era_tags": rng.sample(vocab, rng.randint(0, 1)),
+            "color_tags": rng.sample(vocab, rng.randint(0, 2)),
+            "texture_tier": rng.randint(0, 2),
+            "perf_rank": rng.randint(0, 2),
+        }
+        for index in range(200)
+    ]
+    requested = {"tags": ["chair", "oak"], "category": "chair", "style_tags": ["modern"], "era_tags": [], "color_tags": ["red"]}
+    room_theme = {"style_tags": ["rustic"], "color_tags": ["blue"]}
+
+    def reference_key(candidate):
+        def overlap(a, b):
+            return len(set(a) & set(b))
+
+        return (
+            -overlap(candidate["tags"], requested["tags"]),
+            -(1 if candidate["category"] == requested["category"] else 0),
+            -(overlap(candidate["style_tags"], requested["style_tags"]) + overlap(candidate["style_tags"], room_theme["style_tags"]) + overlap(candidate["era_tags"], [])),
+            -(overlap(candidate["color_tags"], requested["color_tags"]) + overlap(candidate["color_tags"], room_theme["color_tags"])),
+            candidate["texture_tier"],
+            candidate["perf_rank"],
+            candidate["asset_id"],
+        )
+
+    result = _deterministic_substitution_selection(candidates, requested, room_theme)
+    expected = [candidate["asset_id"] for candidate in sorted(candidates, key=reference_key)[:3]]
+    assert result["alternatives"] == expected
+    assert result["selected"]["asset_id"] == expected[0]
+
+
+def test_resolve_asset_memo_returns_independent_results_per_registry():
+    registry = load_pack_registry()
+    first = _resolve("core_unknown_chair_99", ["chair", "indoor"], ["core_pack"], registry=registry)
+    first["alternatives"].append("mutated")
+    first["coherence_checks"]["visual_style_match"] = False
+
+    second = _resolve("core_unknown_chair_99", ["chair", "indoor"], ["core_pack"], registry=registry)
+    assert second["resolved_asset_id"] == "core_chair_01"
+    assert second["alternatives"] == ["core_chair_01"]
+    assert second["coherence_checks"]["visual_style_match"] is True
+
+    private = load_pack_registry(use_cache=False)
+    private.assets_by_id["core_table_01"]["asset"]["quest_compatible"] = False
+    assert _resolve("core_table_01", ["table_only_token"], ["core_pack"], registry=registry)["resolution_type"] == "exact"
+    assert _resolve("core_table_01", ["table_only_token"], ["core_pack"], registry=private)["resolution_type"] == "placeholder"